@@ -0,0 +1,168 @@
+import threading
+
+from eth_utils import event_signature_to_log_topic
+from web3 import Web3
+
+APPROVAL_TOPIC = event_signature_to_log_topic("Approval(address,address,uint256)")
+
+MAX_UINT256 = 2 ** 256 - 1
+
+
+def _as_bytes(value):
+    return bytes(value) if not isinstance(value, str) else bytes.fromhex(value[2:] if value.startswith('0x') else value)
+
+
+class AllowanceCache:
+    """
+    Known token allowances per (owner, spender), so a swap only touches the
+    allowance when it actually runs out.
+
+    ensure() answers from memory when the cached allowance covers the
+    amount; otherwise it re-reads allowance() once and, if that is still
+    short, sends an approve() sized by `policy` ('max' for an unlimited
+    approval, or N to cover N more swaps of this size). The approval is not
+    waited for: the swap takes the next nonce and lands right behind it.
+
+    spend() debits a sent swap and settles it from the receipt: the
+    Approval event the token emits on transferFrom (and on approve) resets
+    the entry to the exact on-chain value, a failed or dropped tx drops the
+    entry so the next ensure() reads it again.
+    """
+
+    def __init__(self, web3, token_contract, nonce_manager, gas_oracle, pipeline, policy='max'):
+        self.web3 = web3
+        self.token = token_contract
+        self.nonce_manager = nonce_manager
+        self.gas_oracle = gas_oracle
+        self.pipeline = pipeline
+        self.policy = self._parse_policy(policy)
+
+        self.lock = threading.Lock()
+        # (owner, spender) -> {'amount': wei, 'pending': spends in flight, 'seen': (block, log index) of last event}
+        self.entries = {}
+
+    @staticmethod
+    def _key(owner, spender):
+        return Web3.to_checksum_address(owner), Web3.to_checksum_address(spender)
+
+    @staticmethod
+    def _parse_policy(policy):
+        """'max' or a number of swaps >= 1; raises ValueError for anything else"""
+        if str(policy).strip().lower() == 'max':
+            return 'max'
+        try:
+            swaps = int(policy)
+        except (TypeError, ValueError):
+            swaps = 0
+        if swaps < 1:
+            raise ValueError(f"Approval policy must be 'max' or a number of swaps >= 1, got {policy!r}")
+        return swaps
+
+    def approval_amount(self, amount_wei):
+        """How much to approve for a swap of amount_wei under the policy"""
+        if self.policy == 'max':
+            return MAX_UINT256
+        return amount_wei * self.policy
+
+    def cached(self, owner, spender):
+        """Cached allowance, or None if it has not been read yet"""
+        entry = self.entries.get(self._key(owner, spender))
+        return entry['amount'] if entry else None
+
+    def allowance(self, owner, spender, refresh=False):
+        """Allowance from the cache, read on-chain the first time (or when refresh)"""
+        key = self._key(owner, spender)
+        if not refresh:
+            amount = self.cached(*key)
+            if amount is not None:
+                return amount
+
+        amount = self.token.functions.allowance(*key).call()
+        with self.lock:
+            entry = self.entries.setdefault(key, {'amount': amount, 'pending': 0, 'seen': None})
+            entry['amount'] = amount
+        return amount
+
+    def ensure(self, owner, private_key, spender, amount_wei, gas_tier='standard', wait=False):
+        """
+        Make sure spender may pull amount_wei from owner. Returns the approval
+        tx hash if one had to be sent (waited for if wait), else None.
+        """
+        key = self._key(owner, spender)
+        cached = self.cached(*key)
+        if cached is not None and cached >= amount_wei:
+            return None
+        if self.allowance(*key, refresh=True) >= amount_wei:
+            return None
+
+        approve_amount = self.approval_amount(amount_wei)
+        approve_tx = self.token.functions.approve(key[1], approve_amount).build_transaction({
+            'from': key[0],
+            **self.gas_oracle.params('approve', gas_tier),
+            'chainId': 56
+        })
+        self.gas_oracle.estimate(approve_tx, 'approve')
+        tx_hash = self.nonce_manager.send_transaction(approve_tx, private_key)
+
+        # Assume it goes through; the receipt confirms or drops the entry
+        with self.lock:
+            entry = self.entries.setdefault(key, {'amount': approve_amount, 'pending': 0, 'seen': None})
+            entry['amount'] = approve_amount
+        future = self.pipeline.track(tx_hash, 'approve')
+        future.add_done_callback(lambda f: self._settle(key, f))
+        if wait:
+            future.result()
+        return tx_hash
+
+    def spend(self, owner, spender, amount_wei, tx_hash):
+        """Debit a sent swap of amount_wei and settle the entry once tx_hash is mined"""
+        key = self._key(owner, spender)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                entry['amount'] = max(entry['amount'] - amount_wei, 0)
+                entry['pending'] += 1
+        self.pipeline.track(tx_hash, 'swap').add_done_callback(lambda f: self._settle(key, f, spent=True))
+
+    def invalidate(self, owner=None, spender=None):
+        """Forget cached allowances (all, one owner's, or one pair)"""
+        with self.lock:
+            for key in list(self.entries):
+                if (owner is None or key[0] == Web3.to_checksum_address(owner)) and \
+                        (spender is None or key[1] == Web3.to_checksum_address(spender)):
+                    del self.entries[key]
+
+    def _settle(self, key, future, spent=False):
+        try:
+            receipt = future.result()
+        except Exception:
+            receipt = None
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return
+            if spent:
+                entry['pending'] = max(entry['pending'] - 1, 0)
+            if receipt is None or receipt.status != 1:
+                # Unknown or reverted: read it again next time
+                del self.entries[key]
+                return
+            event = self._approval_event(key, receipt)
+            # Newer than what we applied, and no other spend still debiting the entry
+            if event is not None and entry['pending'] == 0 and (entry['seen'] is None or event[0] > entry['seen']):
+                entry['seen'], entry['amount'] = event
+
+    def _approval_event(self, key, receipt):
+        """((block, log index), value) of the last Approval(owner, spender) the token logged in receipt"""
+        token = self.token.address.lower()
+        found = None
+        for log in receipt.logs:
+            topics = log['topics']
+            if log['address'].lower() != token or len(topics) < 3 or _as_bytes(topics[0]) != _as_bytes(APPROVAL_TOPIC):
+                continue
+            owner = Web3.to_checksum_address(_as_bytes(topics[1])[-20:])
+            spender = Web3.to_checksum_address(_as_bytes(topics[2])[-20:])
+            if (owner, spender) == key:
+                found = ((log['blockNumber'], log['logIndex']), int.from_bytes(_as_bytes(log['data']), 'big'))
+        return found
@@ -0,0 +1,226 @@
+import collections
+import json
+import os
+import threading
+import time
+
+import requests
+
+BINANCE_KLINES_URL = "https://api.binance.com/api/v3/klines"
+BINANCE_KLINES_LIMIT = 1000  # max klines per request
+
+INTERVALS = ('1m', '5m', '15m', '1h', '4h', '1d')
+
+
+class WilderATR:
+    """
+    Wilder's Average True Range, one candle at a time.
+    Same recurrence as ta.volatility.AverageTrueRange: the first value is the
+    mean of the first `period` true ranges, then
+    atr = (atr * (period - 1) + tr) / period.
+    """
+
+    def __init__(self, period):
+        self.period = period
+        self.count = 0
+        self.tr_sum = 0.0
+        self.atr = None
+        self.prev_close = None
+
+    def true_range(self, high, low):
+        if self.prev_close is None:
+            return high - low
+        return max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+
+    def _next(self, tr):
+        """(count, tr_sum, atr) after one more true range"""
+        count = self.count + 1
+        if count < self.period:
+            return count, self.tr_sum + tr, None
+        if count == self.period:
+            tr_sum = self.tr_sum + tr
+            return count, tr_sum, tr_sum / self.period
+        return count, self.tr_sum, (self.atr * (self.period - 1) + tr) / self.period
+
+    def update(self, high, low, close):
+        """Add a closed candle (O(1))"""
+        self.count, self.tr_sum, self.atr = self._next(self.true_range(high, low))
+        self.prev_close = close
+        return self.atr
+
+    def peek(self, high, low):
+        """ATR including a still-open candle, without committing it"""
+        return self._next(self.true_range(high, low))[2]
+
+
+class ATREngine:
+    """
+    In-memory BNB/USDT kline cache with incremental ATRs for every interval.
+
+    Each refresh of an interval asks Binance only for candles from the last
+    cached (still open) candle onwards. Closed candles are folded into the
+    per-period WilderATR states once; the open candle is applied on the fly.
+    Answers come from memory while the interval's data is younger than
+    `max_age` seconds.
+
+    Offline: with `fixtures_dir` (or ATR_FIXTURES_DIR) klines are read from
+    recorded Binance responses (klines_<SYMBOL>_<interval>.json) instead of
+    the API; record_fixtures() writes them.
+    """
+
+    def __init__(self, symbol="BNBUSDT", history=1000, max_age=5, fixtures_dir=None, session=None):
+        self.symbol = symbol
+        self.history = history  # closed candles kept per interval
+        self.max_age = max_age
+        self.fixtures_dir = fixtures_dir or os.getenv("ATR_FIXTURES_DIR")
+        self.session = session or requests.Session()
+        self.candles = {interval: collections.deque(maxlen=history) for interval in INTERVALS}  # closed
+        self.live = {}  # interval -> open candle
+        self.atrs = {interval: {} for interval in INTERVALS}  # interval -> period -> WilderATR
+        self.updated_at = {}
+        self.lock = threading.RLock()
+
+    # === Klines ===
+
+    def _fetch(self, interval, start_time=None, limit=BINANCE_KLINES_LIMIT):
+        if self.fixtures_dir:
+            path = os.path.join(self.fixtures_dir, f"klines_{self.symbol}_{interval}.json")
+            with open(path, 'r') as f:
+                rows = json.load(f)
+            if start_time is not None:
+                rows = [row for row in rows if int(row[0]) >= start_time]
+            return rows[-limit:]
+
+        params = {'symbol': self.symbol, 'interval': interval, 'limit': limit}
+        if start_time is not None:
+            params['startTime'] = start_time
+        response = self.session.get(BINANCE_KLINES_URL, params=params, timeout=10)
+        response.raise_for_status()
+        return response.json()
+
+    def refresh(self, interval, force=False):
+        """Pull new candles for interval (no-op while the cached data is fresh)"""
+        with self.lock:
+            if not force and time.time() - self.updated_at.get(interval, 0) < self.max_age:
+                return
+
+            live = self.live.get(interval)
+            closed = self.candles[interval]
+            if live:
+                start_time = live[0]  # re-read the open candle, plus anything newer
+            elif closed:
+                start_time = closed[-1][0] + 1
+            else:
+                start_time = None
+            rows = self._fetch(interval, start_time=start_time,
+                               limit=BINANCE_KLINES_LIMIT if start_time else min(self.history + 1, BINANCE_KLINES_LIMIT))
+
+            last_closed = closed[-1][0] if closed else -1
+            for row in rows:
+                # (open time, open, high, low, close, close time)
+                candle = (int(row[0]), float(row[1]), float(row[2]), float(row[3]), float(row[4]), int(row[6]))
+                if candle[0] <= last_closed:
+                    continue
+                live = self.live.get(interval)
+                if live and candle[0] > live[0]:
+                    self._close_candle(interval, live)
+                if not live or candle[0] >= live[0]:
+                    self.live[interval] = candle
+
+            # The newest row is closed once its close time has passed
+            live = self.live.get(interval)
+            if live and live[5] < time.time() * 1000 and not self.fixtures_dir:
+                self._close_candle(interval, live)
+                del self.live[interval]
+
+            self.updated_at[interval] = time.time()
+
+    def _close_candle(self, interval, candle):
+        self.candles[interval].append(candle)
+        for atr in self.atrs[interval].values():
+            atr.update(candle[2], candle[3], candle[4])
+
+    def refresh_all(self, force=False):
+        for interval in INTERVALS:
+            try:
+                self.refresh(interval, force)
+            except Exception as e:
+                print(f"⚠️ Error refreshing {interval} klines: {e}")
+
+    # === ATR ===
+
+    def _atr_state(self, interval, period):
+        atrs = self.atrs[interval]
+        if period not in atrs:
+            # First request for this period: fold the cached candles once
+            atr = WilderATR(period)
+            for candle in self.candles[interval]:
+                atr.update(candle[2], candle[3], candle[4])
+            atrs[period] = atr
+        return atrs[period]
+
+    def get(self, interval='1h', period=14):
+        """{'atr', 'atr_percentage', 'current_price'} for interval, or None if not enough candles"""
+        if interval not in INTERVALS:
+            raise ValueError(f"Unsupported interval {interval}")
+
+        with self.lock:
+            self.refresh(interval)
+            atr_state = self._atr_state(interval, period)
+            live = self.live.get(interval)
+
+            if live:
+                current_atr = atr_state.peek(live[2], live[3])
+                current_price = live[4]
+            else:
+                current_atr = atr_state.atr
+                current_price = self.candles[interval][-1][4] if self.candles[interval] else None
+
+            if current_atr is None or not current_price:
+                return None
+
+            return {
+                'atr': current_atr,
+                'atr_percentage': current_atr / current_price * 100,
+                'current_price': current_price
+            }
+
+    def start(self, every=15):
+        """Keep every interval warm in a daemon thread"""
+        def loop():
+            while True:
+                self.refresh_all(force=True)
+                time.sleep(every)
+
+        threading.Thread(target=loop, daemon=True).start()
+        return self
+
+    def record_fixtures(self, directory):
+        """Save the current Binance responses for every interval (for offline use)"""
+        os.makedirs(directory, exist_ok=True)
+        for interval in INTERVALS:
+            rows = self._fetch(interval, limit=min(self.history + 1, BINANCE_KLINES_LIMIT))
+            with open(os.path.join(directory, f"klines_{self.symbol}_{interval}.json"), 'w') as f:
+                json.dump(rows, f)
+            print(f"💾 Recorded {len(rows)} {interval} klines")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="BNB ATR for every interval")
+    parser.add_argument("--fixtures", help="Read klines from recorded fixtures in this directory")
+    parser.add_argument("--record", help="Record Binance klines into this directory")
+    parser.add_argument("--period", type=int, default=14)
+    args = parser.parse_args()
+
+    if args.record:
+        ATREngine().record_fixtures(args.record)
+    else:
+        engine = ATREngine(fixtures_dir=args.fixtures)
+        for interval in INTERVALS:
+            data = engine.get(interval, args.period)
+            if data:
+                print(f"{interval:<4} ATR({args.period}): ${data['atr']:.4f} ({data['atr_percentage']:.2f}%) @ ${data['current_price']:.2f}")
+            else:
+                print(f"{interval:<4} not enough candles")
@@ -0,0 +1,283 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from eth_utils import event_signature_to_log_topic
+from web3 import Web3
+
+from bet_stream import BET_BULL_TOPIC, BET_BEAR_TOPIC, EpochBets, _as_bytes
+from multicall import Multicall
+
+CLAIM_TOPIC = event_signature_to_log_topic("Claim(address,uint256,uint256)")
+
+
+def round_info_from_tuple(epoch, round_data, epoch_bets=None, claims=None):
+    """rounds(epoch) tuple (+ scanned bets / claims) -> round dict for the RoundStore"""
+    lock_price = round_data[4] / 1e8
+    close_price = round_data[5] / 1e8
+    total_amount = round_data[8] / 1e18
+    bull_amount = round_data[9] / 1e18
+    bear_amount = round_data[10] / 1e18
+    claimed_amount, claim_count = claims or (0, 0)
+
+    return {
+        'epoch': epoch,
+        'start_ts': round_data[1],
+        'lock_ts': round_data[2],
+        'close_ts': round_data[3],
+        'lock_price_usdt': lock_price,
+        'close_price_usdt': close_price,
+        'total_amount': total_amount,
+        'bull_amount': bull_amount,
+        'bear_amount': bear_amount,
+        'bull_payout': total_amount / bull_amount if bull_amount > 0 else 0,
+        'bear_payout': total_amount / bear_amount if bear_amount > 0 else 0,
+        'winner': "BULL" if close_price > lock_price else "BEAR",
+        'reward_base_cal_amount': round_data[11] / 1e18,
+        'reward_amount': round_data[12] / 1e18,
+        'max_bull_bet': epoch_bets.max_bet_on_bull if epoch_bets else 0,
+        'max_bear_bet': epoch_bets.max_bet_on_bear if epoch_bets else 0,
+        'bull_bets': sum(1 for bet in epoch_bets.all_bets if bet['side'] == "Bull") if epoch_bets else 0,
+        'bear_bets': sum(1 for bet in epoch_bets.all_bets if bet['side'] == "Bear") if epoch_bets else 0,
+        'claimed_amount': claimed_amount,
+        'claims': claim_count
+    }
+
+
+class RoundBackfiller:
+    """
+    Bulk historical backfill of prediction rounds into a RoundStore.
+
+    Epochs are processed in segments. For each segment:
+      - rounds(epoch) for every epoch via Multicall3, batches run on a worker pool
+      - BetBull/BetBear/Claim logs for the segment's block range with one
+        OR-topic getLogs per chunk, chunks fetched concurrently; the chunk size
+        halves when the node rejects a range and grows while responses are small
+      - the finished rounds are appended to the store in one write and the
+        checkpoint file is updated, so an interrupted run resumes where it stopped
+
+    Claims are only counted when they fall inside the segment's block range
+    (up to the close of its last round); later claims are not tracked.
+    """
+
+    def __init__(self, web3, contract, round_store, block_index, multicall=None, workers=8,
+                 rounds_batch=200, chunk_blocks=2000, min_chunk=20, max_chunk=50000, target_logs=3000,
+                 checkpoint_file="backfill_checkpoint.json"):
+        self.web3 = web3
+        self.contract = contract
+        self.contract_address = Web3.to_checksum_address(contract.address)
+        self.round_store = round_store
+        self.block_index = block_index
+        self.multicall = multicall or Multicall(web3)
+        self.workers = workers
+        self.rounds_batch = rounds_batch
+        self.chunk_blocks = chunk_blocks
+        self.min_chunk = min_chunk
+        self.max_chunk = max_chunk
+        self.target_logs = target_logs  # grow the chunk while responses stay below this
+        self.checkpoint_file = checkpoint_file
+        self.rpc_calls = 0
+
+    # === Checkpoint ===
+
+    def load_checkpoint(self):
+        if not os.path.exists(self.checkpoint_file):
+            return None
+        try:
+            with open(self.checkpoint_file, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"⚠️ Error reading checkpoint: {e}")
+            return None
+
+    def save_checkpoint(self, from_epoch, to_epoch, done_through):
+        checkpoint = {
+            'from_epoch': from_epoch,
+            'to_epoch': to_epoch,
+            'done_through': done_through,
+            'chunk_blocks': self.chunk_blocks,
+            'updated_at': int(time.time())
+        }
+        tmp_path = self.checkpoint_file + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp_path, self.checkpoint_file)
+
+    # === RPC ===
+
+    def fetch_rounds(self, epochs, pool):
+        """epoch -> rounds() tuple for every finished round among epochs"""
+        batches = [epochs[i:i + self.rounds_batch] for i in range(0, len(epochs), self.rounds_batch)]
+
+        def fetch(batch):
+            _, results = self.multicall.aggregate([self.contract.functions.rounds(epoch) for epoch in batch])
+            return zip(batch, results)
+
+        rounds = {}
+        for batch_results in pool.map(fetch, batches):
+            self.rpc_calls += 1
+            for epoch, round_data in batch_results:
+                # Skip unknown / cancelled / not yet closed rounds (closePrice 0 or oracle not called)
+                if round_data and round_data[3] and round_data[5] and round_data[13]:
+                    rounds[epoch] = round_data
+        return rounds
+
+    def _get_logs(self, from_block, to_block):
+        return self.web3.eth.get_logs({
+            "fromBlock": from_block,
+            "toBlock": to_block,
+            "address": self.contract_address,
+            "topics": [[BET_BULL_TOPIC, BET_BEAR_TOPIC, CLAIM_TOPIC]]
+        })
+
+    def fetch_logs(self, from_block, to_block, pool):
+        """All bet/claim logs in [from_block, to_block], adaptively chunked across the pool"""
+        logs = []
+        cursor = from_block
+        retry = []  # ranges to fetch again (split after a rejected range)
+        attempts = {}
+        running = {}
+
+        while cursor <= to_block or retry or running:
+            while len(running) < self.workers and (retry or cursor <= to_block):
+                if retry:
+                    lo, hi = retry.pop()
+                else:
+                    lo, hi = cursor, min(to_block, cursor + self.chunk_blocks - 1)
+                    cursor = hi + 1
+                running[pool.submit(self._get_logs, lo, hi)] = (lo, hi)
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                lo, hi = running.pop(future)
+                self.rpc_calls += 1
+                try:
+                    result = future.result()
+                except Exception as e:
+                    span = hi - lo + 1
+                    if span > self.min_chunk:
+                        # Range too large for the node (or too many results): halve it
+                        self.chunk_blocks = max(self.min_chunk, min(self.chunk_blocks, span // 2))
+                        mid = lo + span // 2 - 1
+                        retry.extend([(lo, mid), (mid + 1, hi)])
+                        continue
+                    attempts[(lo, hi)] = attempts.get((lo, hi), 0) + 1
+                    if attempts[(lo, hi)] >= 3:
+                        raise RuntimeError(f"getLogs {lo}-{hi} failed 3 times: {e}")
+                    time.sleep(1)
+                    retry.append((lo, hi))
+                    continue
+
+                logs.extend(result)
+                if len(result) < self.target_logs and hi - lo + 1 >= self.chunk_blocks:
+                    self.chunk_blocks = min(self.max_chunk, int(self.chunk_blocks * 1.5))
+
+        return logs
+
+    # === Backfill ===
+
+    def backfill_segment(self, epochs, pool):
+        """Fetch, aggregate and store one segment; returns number of rounds stored"""
+        rounds = self.fetch_rounds(epochs, pool)
+        if not rounds:
+            return 0
+
+        start_block = self.block_index.block_at(min(r[1] for r in rounds.values()), before=False)
+        end_block = self.block_index.block_at(max(r[3] for r in rounds.values()), before=False)
+        logs = self.fetch_logs(start_block, end_block, pool)
+
+        bets = {}
+        claims = {}
+        claim_topic = _as_bytes(CLAIM_TOPIC)
+        for log in logs:
+            if _as_bytes(log['topics'][0]) == claim_topic:
+                # Claim(address indexed sender, uint256 indexed epoch, uint256 amount)
+                epoch = int.from_bytes(_as_bytes(log['topics'][2]), 'big')
+                amount, count = claims.get(epoch, (0, 0))
+                claims[epoch] = (amount + int.from_bytes(_as_bytes(log['data']), 'big') / 1e18, count + 1)
+            else:
+                epoch = int.from_bytes(_as_bytes(log['topics'][2]), 'big')
+                if epoch not in bets:
+                    bets[epoch] = EpochBets(epoch)
+                bets[epoch].add((_as_bytes(log['transactionHash']), log['logIndex']),
+                                "Bull" if _as_bytes(log['topics'][0]) == _as_bytes(BET_BULL_TOPIC) else "Bear",
+                                None, int.from_bytes(_as_bytes(log['data']), 'big') / 1e18)
+
+        self.round_store.extend(
+            round_info_from_tuple(epoch, rounds[epoch], bets.get(epoch), claims.get(epoch))
+            for epoch in sorted(rounds)
+        )
+        return len(rounds)
+
+    def run(self, from_epoch, to_epoch, segment_size=500):
+        """Backfill every finished epoch in [from_epoch, to_epoch] that is not stored yet"""
+        missing = self.round_store.missing(range(from_epoch, to_epoch + 1))
+        print(f"📊 Epochs {from_epoch}-{to_epoch}: {len(missing)} to backfill "
+              f"({to_epoch - from_epoch + 1 - len(missing)} already stored)")
+        if not missing:
+            return 0
+
+        started_at = time.time()
+        stored = 0
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for i in range(0, len(missing), segment_size):
+                segment = missing[i:i + segment_size]
+                segment_started = time.time()
+                try:
+                    count = self.backfill_segment(segment, pool)
+                except Exception as e:
+                    print(f"❌ Segment {segment[0]}-{segment[-1]} failed: {e}")
+                    print("💾 Progress is saved, re-run with --resume to continue")
+                    break
+
+                stored += count
+                self.save_checkpoint(from_epoch, to_epoch, segment[-1])
+                elapsed = time.time() - segment_started
+                total_elapsed = time.time() - started_at
+                print(f"✅ {segment[0]}-{segment[-1]}: {count} rounds in {elapsed:.1f}s "
+                      f"({count / elapsed if elapsed > 0 else 0:.1f} epochs/s) | "
+                      f"Total {stored}/{len(missing)} @ {stored / total_elapsed if total_elapsed > 0 else 0:.1f} epochs/s | "
+                      f"chunk {self.chunk_blocks} blocks | {self.rpc_calls} RPC calls")
+
+        total_elapsed = time.time() - started_at
+        print(f"🏁 Stored {stored} rounds in {total_elapsed:.1f}s "
+              f"({stored / total_elapsed if total_elapsed > 0 else 0:.1f} epochs/s, {self.rpc_calls} RPC calls)")
+        return stored
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill prediction round history into the round store")
+    parser.add_argument("--days", type=float, help="Backfill this many days back from the current epoch (288 rounds/day)")
+    parser.add_argument("--from-epoch", type=int)
+    parser.add_argument("--to-epoch", type=int, help="Defaults to the last finished epoch")
+    parser.add_argument("--resume", action="store_true", help="Continue the range of the last checkpoint")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--segment", type=int, default=500, help="Epochs per checkpointed segment")
+    parser.add_argument("--chunk", type=int, default=2000, help="Initial getLogs chunk size in blocks")
+    args = parser.parse_args()
+
+    from combiviewer import web3, contract, round_store, block_index
+
+    backfiller = RoundBackfiller(web3, contract, round_store, block_index,
+                                 workers=args.workers, chunk_blocks=args.chunk)
+    last_epoch = contract.functions.currentEpoch().call() - 2  # current is live, the one before is not closed yet
+
+    if args.resume:
+        checkpoint = backfiller.load_checkpoint()
+        if not checkpoint:
+            raise SystemExit("❌ No checkpoint to resume from")
+        from_epoch, to_epoch = checkpoint['from_epoch'], checkpoint['to_epoch']
+        backfiller.chunk_blocks = checkpoint.get('chunk_blocks', backfiller.chunk_blocks)
+        print(f"♻️ Resuming {from_epoch}-{to_epoch} (done through {checkpoint['done_through']})")
+    else:
+        to_epoch = args.to_epoch or last_epoch
+        if args.from_epoch is not None:
+            from_epoch = args.from_epoch
+        elif args.days:
+            from_epoch = max(1, to_epoch - int(args.days * 288) + 1)
+        else:
+            raise SystemExit("❌ Pass --days, --from-epoch or --resume")
+
+    backfiller.run(from_epoch, to_epoch, segment_size=args.segment)
@@ -0,0 +1,90 @@
+import time
+from web3 import Web3
+
+from multicall import Multicall
+
+
+class BalanceSnapshot:
+    """
+    BNB / USDT / WBNB balances of many wallets read at one block.
+    A balance whose read failed (or an address that wasn't read) is None,
+    never 0, so an unknown balance can't pass for an empty wallet.
+    """
+
+    def __init__(self, block_number, balances):
+        self.block_number = block_number
+        self.balances = balances  # checksum address -> {'bnb_wei', 'usdt_wei', 'wbnb_wei'}, None if the read failed
+        self.taken_at = time.time()
+
+    def get(self, address):
+        return self.balances.get(Web3.to_checksum_address(address))
+
+    def _wei(self, address, key):
+        entry = self.get(address)
+        return entry[key] if entry else None
+
+    def complete(self, address):
+        """True if every balance of address was read"""
+        entry = self.get(address)
+        return entry is not None and None not in entry.values()
+
+    def bnb_wei(self, address):
+        return self._wei(address, 'bnb_wei')
+
+    def bnb(self, address):
+        wei = self.bnb_wei(address)
+        return wei / 1e18 if wei is not None else None
+
+    def usdt(self, address):
+        wei = self._wei(address, 'usdt_wei')
+        return wei / 1e18 if wei is not None else None
+
+    def wbnb(self, address):
+        wei = self._wei(address, 'wbnb_wei')
+        return wei / 1e18 if wei is not None else None
+
+    def apply_to(self, wallet_info):
+        """Copy the balances that were read into a wallet dict (same keys as get_wallet_balances)"""
+        address = wallet_info['address']
+        for key, value in (('balance_bnb', self.bnb(address)),
+                           ('balance_usdt', self.usdt(address)),
+                           ('balance_wbnb', self.wbnb(address))):
+            if value is not None:
+                wallet_info[key] = value
+        return wallet_info
+
+
+class BalanceEngine:
+    """Reads balances for any number of wallets in a few Multicall3 eth_calls"""
+
+    def __init__(self, web3, usdt_contract, wbnb_address, multicall=None):
+        self.web3 = web3
+        self.usdt_contract = usdt_contract
+        self.multicall = multicall or Multicall(web3)
+        self.wbnb_contract = web3.eth.contract(
+            address=Web3.to_checksum_address(wbnb_address),
+            abi=usdt_contract.abi
+        )
+
+    def snapshot(self, addresses, block_identifier=None):
+        """Read native, USDT and WBNB balances for all addresses at one block (None where a subcall failed)"""
+        addresses = list(dict.fromkeys(Web3.to_checksum_address(a) for a in addresses))
+
+        calls = []
+        for address in addresses:
+            calls.append(self.multicall.eth_balance(address))
+            calls.append(self.usdt_contract.functions.balanceOf(address))
+            calls.append(self.wbnb_contract.functions.balanceOf(address))
+
+        block_number, results = self.multicall.aggregate(calls, block_identifier=block_identifier)
+
+        balances = {}
+        for i, address in enumerate(addresses):
+            bnb_wei, usdt_wei, wbnb_wei = results[i * 3:i * 3 + 3]
+            balances[address] = {
+                'bnb_wei': bnb_wei,
+                'usdt_wei': usdt_wei,
+                'wbnb_wei': wbnb_wei
+            }
+
+        return BalanceSnapshot(block_number, balances)
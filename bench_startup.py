@@ -0,0 +1,63 @@
+"""
+Startup benchmark: import time of the bot modules in a fresh interpreter,
+with outgoing connections blocked (any network access at import fails the
+run).
+
+    python bench_startup.py            # mv5, telegram_handler, limit_orders
+    python bench_startup.py mv5 -n 5
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+PROBE = r"""
+import json, socket, sys, time
+
+def blocked(*args, **kwargs):
+    raise RuntimeError("network access during import")
+
+socket.socket.connect = blocked
+socket.create_connection = blocked
+
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "web3_imported": "web3" in sys.modules}}))
+"""
+
+
+def measure(module, runs):
+    samples = []
+    web3_imported = False
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-c", PROBE.format(module=module)],
+                                capture_output=True, text=True)
+        if result.returncode != 0:
+            print(f"❌ import {module} failed:\n{result.stderr.strip()}")
+            return None
+        data = json.loads(result.stdout.strip().splitlines()[-1])
+        samples.append(data['seconds'])
+        web3_imported = web3_imported or data['web3_imported']
+    return samples, web3_imported
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure module import time with the network blocked")
+    parser.add_argument("modules", nargs="*", default=["mv5", "telegram_handler", "limit_orders"])
+    parser.add_argument("-n", "--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    failed = False
+    for module in args.modules:
+        measured = measure(module, args.runs)
+        if measured is None:
+            failed = True
+            continue
+        samples, web3_imported = measured
+        emoji = "✅" if statistics.median(samples) < 1 else "⚠️"
+        print(f"{emoji} import {module:<18} median {statistics.median(samples) * 1000:7.1f} ms | "
+              f"min {min(samples) * 1000:7.1f} ms | web3 loaded: {'yes' if web3_imported else 'no'}")
+
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,310 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from eth_utils import to_checksum_address
+
+
+class BurstReport:
+    """Per-wallet results of one burst, timed against the round's lockTimestamp"""
+
+    def __init__(self, epoch, lock_timestamp, results):
+        self.epoch = epoch
+        self.lock_timestamp = lock_timestamp
+        self.results = results
+
+    @property
+    def placed(self):
+        return [r for r in self.results if r['status'] == 'confirmed']
+
+    @property
+    def failed(self):
+        return [r for r in self.results if r['status'] != 'confirmed']
+
+    def print_summary(self):
+        print("\n" + "=" * 80)
+        print(f"🎯 BET BURST - ROUND {self.epoch} (lock {time.strftime('%H:%M:%S', time.localtime(self.lock_timestamp))})")
+        print("=" * 80)
+        for r in self.results:
+            emoji = "✅" if r['status'] == 'confirmed' else "❌"
+            # Positive = sent / mined before lock
+            sent = f"T-{r['lead']:.3f}s" if r['lead'] is not None else "-"
+            mined = f"T-{r['block_lead']}s" if r['block_lead'] is not None else "-"
+            line = f"{emoji} {r['label']:<15} {r['direction']:<5} {r['amount_bnb']:.6f} BNB  {r['status']:<12} sent {sent:>10}  mined {mined:>6}"
+            if r['error']:
+                line += f"\n   ⚠️ {r['error']}"
+            print(line)
+
+        leads = sorted(r['lead'] for r in self.results if r['lead'] is not None)
+        print("-" * 80)
+        print(f"✅ Placed: {len(self.placed)}/{len(self.results)}")
+        if leads:
+            print(f"⏱️ Sent before lock: closest {leads[0]:.3f}s | furthest {leads[-1]:.3f}s | "
+                  f"spread {(leads[-1] - leads[0]) * 1000:.0f} ms")
+        print("=" * 80)
+
+
+class PreArmedBet:
+    """
+    A wallet's bull and bear bets for one round, already signed with the same
+    nonce. fire() is the hot path: a lock-time check and one
+    send_raw_transaction. `timing` holds decision -> broadcast latency and
+    how long before lockTimestamp the bet went out.
+    """
+
+    def __init__(self, web3, nonce_manager, label, address, nonce, epoch, lock_timestamp, amount_wei, signed):
+        self.web3 = web3
+        self.nonce_manager = nonce_manager
+        self.label = label
+        self.address = address
+        self.nonce = nonce  # reserved in the NonceManager until fired / disarmed
+        self.epoch = epoch
+        self.lock_timestamp = lock_timestamp
+        self.amount_bnb = web3.from_wei(amount_wei, 'ether')
+        self.signed = signed  # 'up' / 'down' -> signed tx
+        self.fired = None
+        self.timing = None
+
+    @property
+    def expired(self):
+        return time.time() >= self.lock_timestamp
+
+    def fire(self, direction, decided_at=None):
+        """
+        Broadcast the pre-signed bet for direction ('up'/'down'); returns the tx hash.
+        decided_at: time.perf_counter() of the decision (defaults to now)
+        """
+        decided_at = decided_at or time.perf_counter()
+        if self.fired:
+            raise RuntimeError(f"Already fired {self.fired.upper()} for round {self.epoch}")
+        if self.expired:
+            self.disarm()
+            raise RuntimeError(f"Round {self.epoch} is locked, re-arm for the next round")
+
+        signed_tx = self.signed[direction.lower()]
+        try:
+            self.web3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        except Exception as e:
+            if 'already known' not in str(e).lower():
+                self.nonce_manager.release(self.address, self.nonce, sent=False)
+                raise
+        self.nonce_manager.release(self.address, self.nonce)
+        sent_at = time.time()
+
+        self.fired = direction.lower()
+        self.timing = {
+            'hot_path_ms': (time.perf_counter() - decided_at) * 1000,
+            'lead': self.lock_timestamp - sent_at
+        }
+        return signed_tx.hash
+
+    def disarm(self):
+        """Drop an unfired bet (its reserved nonce is handed out again)"""
+        if not self.fired:
+            self.nonce_manager.release(self.address, self.nonce, sent=False)
+            self.fired = 'disarmed'
+
+
+class BetBurst:
+    """
+    Bet from many wallets into the same round at once.
+
+    prepare() does all the slow work up front: one currentEpoch / rounds()
+    snapshot for the round, every wallet's balance in one multicall, all
+    nonces reserved in parallel and every bet signed. fire() then waits
+    until `lead` seconds before lockTimestamp and broadcasts the signed
+    transactions concurrently, recording when each one left relative to
+    the lock (and, from the receipts, the block it landed in).
+    arm() does the same for a single wallet, signing both directions.
+    """
+
+    def __init__(self, web3, prediction_contract, nonce_manager, balance_engine,
+                 gas_oracle, pipeline, gas_tier='fast', max_workers=16, receipt_timeout=60):
+        self.web3 = web3
+        self.contract = prediction_contract
+        self.nonce_manager = nonce_manager
+        self.pipeline = pipeline
+        self.balance_engine = balance_engine
+        self.gas_oracle = gas_oracle
+        self.gas_tier = gas_tier
+        self.max_workers = max_workers
+        self.receipt_timeout = receipt_timeout
+
+    def round_snapshot(self):
+        """(epoch, lockTimestamp) of the round open for bets"""
+        epoch = self.contract.functions.currentEpoch().call()
+        return epoch, self.contract.functions.rounds(epoch).call()[2]
+
+    def _sign_bet(self, epoch, direction, amount_wei, nonce, private_key, gas):
+        tx = {
+            'to': self.contract.address,
+            'value': amount_wei,
+            'data': self.contract.encode_abi('betBull' if direction == 'up' else 'betBear', args=[epoch]),
+            **gas,
+            'nonce': nonce,
+            'chainId': 56
+        }
+        return self.web3.eth.account.sign_transaction(tx, private_key)
+
+    def _bet_amount(self, balance, amount_bnb, fraction, gas_fee):
+        if amount_bnb is not None:
+            return self.web3.to_wei(amount_bnb, 'ether')
+        return int((balance - gas_fee) * fraction)
+
+    def arm(self, wallet_info, amount_bnb=None, fraction=0.95, snapshot=None):
+        """
+        Sign both the bull and the bear bet of wallet_info for the current
+        round ahead of time (amount_bnb, or `fraction` of the balance).
+        Returns a PreArmedBet whose fire() only has to broadcast.
+        """
+        epoch, lock_timestamp = snapshot or self.round_snapshot()
+        if time.time() >= lock_timestamp:
+            raise RuntimeError(f"Round {epoch} is already locked")
+
+        address = to_checksum_address(wallet_info['address'])
+        balance = self.balance_engine.snapshot([address]).bnb_wei(address)
+        if balance is None:
+            raise RuntimeError(f"Could not read the balance of {address}")
+        gas = self.gas_oracle.params('bet', self.gas_tier)
+        gas_fee = gas['gas'] * gas['gasPrice']
+        amount_wei = self._bet_amount(balance, amount_bnb, fraction, gas_fee)
+        if amount_wei <= 0 or balance < amount_wei + gas_fee:
+            raise RuntimeError(f"Insufficient balance: {self.web3.from_wei(balance, 'ether'):.6f} BNB")
+
+        # Same nonce for both: whichever is sent, the other can never be mined.
+        # Reserved, so other txs from the wallet can't take it before fire()
+        nonce = self.nonce_manager.reserve(address)
+        try:
+            signed = {direction: self._sign_bet(epoch, direction, amount_wei, nonce, wallet_info['private_key'], gas)
+                      for direction in ('up', 'down')}
+        except Exception:
+            self.nonce_manager.release(address, nonce, sent=False)
+            raise
+        return PreArmedBet(self.web3, self.nonce_manager, wallet_info['name'], address, nonce,
+                           epoch, lock_timestamp, amount_wei, signed)
+
+    def prepare(self, bets, snapshot=None):
+        """
+        bets: list of {'wallet': wallet dict, 'direction': 'up'/'down',
+        'amount': BNB or None, 'fraction': share of the balance when amount is None}
+        Returns (epoch, lock_timestamp, results) with a signed tx in every result that can go out.
+        """
+        epoch, lock_timestamp = snapshot or self.round_snapshot()
+        if time.time() >= lock_timestamp:
+            raise RuntimeError(f"Round {epoch} is already locked")
+
+        addresses = [to_checksum_address(bet['wallet']['address']) for bet in bets]
+        balances = self.balance_engine.snapshot(addresses)
+        gas = self.gas_oracle.params('bet', self.gas_tier)
+        gas_fee = gas['gas'] * gas['gasPrice']
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            # Held in the NonceManager until fire() broadcasts them (possibly minutes later)
+            nonces = list(pool.map(self.nonce_manager.reserve, addresses))
+
+        results = []
+        for bet, address, nonce in zip(bets, addresses, nonces):
+            direction = bet['direction'].lower()
+            balance = balances.bnb_wei(address)
+            amount_wei = self._bet_amount(balance or 0, bet.get('amount'), bet.get('fraction', 0.95), gas_fee)
+
+            result = {'label': bet['wallet']['name'], 'address': address, 'direction': direction.upper(),
+                      'amount_bnb': self.web3.from_wei(max(amount_wei, 0), 'ether'), 'status': 'signed',
+                      'nonce': nonce, 'signed_tx': None, 'tx_hash': None, 'lead': None, 'block_lead': None,
+                      'error': None}
+            results.append(result)
+
+            if balance is None:
+                result['status'] = 'read_failed'
+                result['error'] = "balance read failed"
+                self.nonce_manager.release(address, nonce, sent=False)
+                continue
+
+            if amount_wei <= 0 or balance < amount_wei + gas_fee:
+                result['status'] = 'insufficient'
+                result['error'] = f"balance {self.web3.from_wei(balance, 'ether'):.6f} BNB"
+                self.nonce_manager.release(address, nonce, sent=False)
+                continue
+
+            try:
+                result['signed_tx'] = self._sign_bet(epoch, direction, amount_wei, nonce, bet['wallet']['private_key'], gas)
+            except Exception as e:
+                result['status'] = 'sign_failed'
+                result['error'] = str(e)
+                self.nonce_manager.release(address, nonce, sent=False)
+
+        return epoch, lock_timestamp, results
+
+    def fire(self, epoch, lock_timestamp, results, lead=None):
+        """
+        Broadcast the signed bets at lock_timestamp - lead (right away if lead
+        is None), then wait for receipts. If the round has locked by then the
+        bets are disarmed instead.
+        """
+        if lead is not None:
+            delay = lock_timestamp - lead - time.time()
+            if delay > 0:
+                print(f"⏳ Firing {len(results)} bets in {delay:.1f}s (T-{lead}s)...")
+                time.sleep(delay)
+        if time.time() >= lock_timestamp:
+            self.disarm(results, f"round {epoch} locked before fire")
+            return BurstReport(epoch, lock_timestamp, results)
+
+        signed = [r for r in results if r['signed_tx'] is not None]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            list(pool.map(lambda r: self._broadcast(r, lock_timestamp), signed))
+
+        tracked = [(r, self.pipeline.track(r['tx_hash'], r['label'], timeout=self.receipt_timeout))
+                   for r in signed if r['status'] == 'sent']
+        wait([future for _, future in tracked])
+        block_times = {}
+        for r, future in tracked:
+            self._record_receipt(r, future, lock_timestamp, block_times)
+
+        for r in results:
+            r['signed_tx'] = None
+        return BurstReport(epoch, lock_timestamp, results)
+
+    def disarm(self, results, reason="disarmed"):
+        """Drop prepared bets that were never broadcast (their reserved nonces are handed out again)"""
+        for r in results:
+            if r['signed_tx'] is None or r['status'] != 'signed':
+                continue
+            self.nonce_manager.release(r['address'], r['nonce'], sent=False)
+            r['signed_tx'] = None
+            r['status'] = 'disarmed'
+            r['error'] = reason
+
+    def run(self, bets, lead=None):
+        """prepare() + fire() for the current round"""
+        epoch, lock_timestamp, results = self.prepare(bets)
+        try:
+            return self.fire(epoch, lock_timestamp, results, lead=lead)
+        except BaseException:
+            self.disarm(results)
+            raise
+
+    def _broadcast(self, result, lock_timestamp):
+        signed_tx = result['signed_tx']
+        try:
+            self.web3.eth.send_raw_transaction(signed_tx.raw_transaction)
+            result['status'] = 'sent'
+        except Exception as e:
+            if 'already known' in str(e).lower():
+                result['status'] = 'sent'
+            else:
+                result['status'] = 'send_failed'
+                result['error'] = str(e)
+        self.nonce_manager.release(result['address'], result['nonce'], sent=result['status'] == 'sent')
+        result['lead'] = lock_timestamp - time.time()
+        result['tx_hash'] = signed_tx.hash
+
+    def _record_receipt(self, result, future, lock_timestamp, block_times):
+        try:
+            receipt = future.result()
+            result['status'] = 'confirmed' if receipt.status == 1 else 'reverted'
+            if receipt.blockNumber not in block_times:
+                block_times[receipt.blockNumber] = self.web3.eth.get_block(receipt.blockNumber).timestamp
+            result['block_lead'] = lock_timestamp - block_times[receipt.blockNumber]
+        except Exception as e:
+            result['status'] = 'timeout'
+            result['error'] = str(e)
+        result['tx_hash'] = self.web3.to_hex(result['tx_hash'])
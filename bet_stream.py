@@ -0,0 +1,134 @@
+import threading
+
+from eth_utils import event_signature_to_log_topic
+from web3 import Web3
+
+BET_BULL_TOPIC = event_signature_to_log_topic("BetBull(address,uint256,uint256)")
+BET_BEAR_TOPIC = event_signature_to_log_topic("BetBear(address,uint256,uint256)")
+
+WHALE_BET_BNB = 0.84
+
+
+def _as_bytes(value):
+    return bytes(value) if not isinstance(value, str) else bytes.fromhex(value[2:] if value.startswith('0x') else value)
+
+
+class EpochBets:
+    """Running totals of the BetBull / BetBear events of one round"""
+
+    def __init__(self, epoch):
+        self.epoch = epoch
+        self.bull_amount = 0
+        self.bear_amount = 0
+        self.max_bet_on_bull = 0
+        self.max_bet_on_bear = 0
+        self.bull_whales = 0
+        self.bear_whales = 0
+        self.all_bets = []
+        self.seen = set()  # (tx_hash, log_index) - overlapping polls never double count
+
+    def add(self, key, side, user, amount_bnb):
+        if key in self.seen:
+            return
+        self.seen.add(key)
+        self.all_bets.append({"side": side, "amount_bnb": amount_bnb, "user": user, "epoch": self.epoch})
+
+        if side == "Bull":
+            self.bull_amount += amount_bnb
+            self.max_bet_on_bull = max(self.max_bet_on_bull, amount_bnb)
+            if amount_bnb >= WHALE_BET_BNB:
+                self.bull_whales += 1
+        else:
+            self.bear_amount += amount_bnb
+            self.max_bet_on_bear = max(self.max_bet_on_bear, amount_bnb)
+            if amount_bnb >= WHALE_BET_BNB:
+                self.bear_whales += 1
+
+    def summary(self):
+        """Same dict fetch_bets has always returned"""
+        total_amount = self.bull_amount + self.bear_amount
+        return {
+            "bull_amount": self.bull_amount,
+            "bear_amount": self.bear_amount,
+            "total_amount": total_amount,
+            "bull_payout": total_amount / self.bull_amount if self.bull_amount > 0 else 0,
+            "bear_payout": total_amount / self.bear_amount if self.bear_amount > 0 else 0,
+            "bull_percent": (self.bull_amount / total_amount) * 100 if total_amount > 0 else 0,
+            "bear_percent": (self.bear_amount / total_amount) * 100 if total_amount > 0 else 0,
+            "max_bet_on_bull": self.max_bet_on_bull,
+            "max_bet_on_bear": self.max_bet_on_bear,
+            "bull_whales": self.bull_whales,
+            "bear_whales": self.bear_whales,
+            "all_bets": self.all_bets
+        }
+
+
+class BetStream:
+    """
+    Incremental reader of prediction bets.
+    One eth_getLogs per poll (BetBull OR BetBear topic filter), covering only
+    blocks not seen yet, and each log decoded once straight from its topics.
+    """
+
+    def __init__(self, web3, contract_address, overlap=2, keep_epochs=50):
+        self.web3 = web3
+        self.contract_address = Web3.to_checksum_address(contract_address)
+        self.overlap = overlap  # re-read the last few blocks in case the node was behind
+        self.keep_epochs = keep_epochs
+        self.next_block = None
+        self.epochs = {}  # epoch -> EpochBets
+        self.lock = threading.RLock()  # logs may also be pushed from a live subscription thread
+
+    def ingest(self, log, epochs=None):
+        """Decode one BetBull/BetBear log into the per-epoch aggregate"""
+        epochs = self.epochs if epochs is None else epochs
+        topics = log['topics']
+        # BetBull/BetBear(address indexed sender, uint256 indexed epoch, uint256 amount)
+        side = "Bull" if _as_bytes(topics[0]) == _as_bytes(BET_BULL_TOPIC) else "Bear"
+        user = Web3.to_checksum_address(_as_bytes(topics[1])[-20:])
+        epoch = int.from_bytes(_as_bytes(topics[2]), 'big')
+        amount_bnb = int.from_bytes(_as_bytes(log['data']), 'big') / 1e18
+        key = (_as_bytes(log['transactionHash']), log['logIndex'])
+
+        with self.lock:
+            if epoch not in epochs:
+                epochs[epoch] = EpochBets(epoch)
+            epochs[epoch].add(key, side, user, amount_bnb)
+
+    def read_range(self, from_block, to_block, epochs=None):
+        """Fetch and aggregate all bets in [from_block, to_block] with one getLogs call"""
+        epochs = {} if epochs is None else epochs
+        if from_block > to_block:
+            return epochs
+
+        logs = self.web3.eth.get_logs({
+            "fromBlock": from_block,
+            "toBlock": to_block,
+            "address": self.contract_address,
+            "topics": [[BET_BULL_TOPIC, BET_BEAR_TOPIC]]
+        })
+
+        for log in logs:
+            self.ingest(log, epochs)
+
+        return epochs
+
+    def poll(self, start_block, latest_block):
+        """Read the blocks added since the last poll (from start_block on the first call)"""
+        if self.next_block is None or self.next_block < start_block:
+            from_block = start_block
+        else:
+            from_block = max(start_block, self.next_block - self.overlap)
+
+        self.read_range(from_block, latest_block, self.epochs)
+        self.next_block = max(self.next_block or 0, latest_block + 1)
+
+        # Keep memory bounded for long sessions
+        with self.lock:
+            if len(self.epochs) > self.keep_epochs:
+                for epoch in sorted(self.epochs)[:-self.keep_epochs]:
+                    del self.epochs[epoch]
+
+    def get(self, epoch):
+        with self.lock:
+            return self.epochs.get(epoch) or EpochBets(epoch)
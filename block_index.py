@@ -0,0 +1,140 @@
+import bisect
+import os
+import struct
+import threading
+
+
+class BlockIndex:
+    """
+    On-disk block number -> timestamp index.
+
+    Every block header we ever fetch is kept as an anchor (appended to a small
+    binary file, 16 bytes per block). Timestamp lookups interpolate between the
+    two nearest anchors and only fetch a block when the bracket is still wide,
+    so repeated lookups around the same time cost 0 RPC calls and new ones
+    usually cost 1.
+    """
+
+    MAGIC = b"BLKIDX1\0"
+    RECORD = struct.Struct("<QQ")  # block number, timestamp
+
+    def __init__(self, web3, path="block_index.bin", tolerance=4, max_rpc=4, default_block_time=0.75):
+        self.web3 = web3
+        self.path = path
+        self.tolerance = tolerance  # bracket width (blocks) we accept without another RPC
+        self.max_rpc = max_rpc
+        self.default_block_time = default_block_time
+        self.blocks = []
+        self.timestamps = []
+        self.lock = threading.Lock()
+        self.rpc_calls = 0
+        self._load()
+
+    def __len__(self):
+        return len(self.blocks)
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            with open(self.path, 'wb') as f:
+                f.write(self.MAGIC)
+            return
+
+        with open(self.path, 'rb') as f:
+            data = f.read()
+
+        if not data.startswith(self.MAGIC):
+            print(f"⚠️ {self.path} is not a block index, starting fresh")
+            with open(self.path, 'wb') as f:
+                f.write(self.MAGIC)
+            return
+
+        body = data[len(self.MAGIC):]
+        usable = len(body) - len(body) % self.RECORD.size
+        anchors = dict(self.RECORD.iter_unpack(body[:usable]))
+        for block_number in sorted(anchors):
+            self.blocks.append(block_number)
+            self.timestamps.append(anchors[block_number])
+
+        # Drop a torn trailing record so the next append stays aligned
+        if usable != len(body):
+            with open(self.path, 'r+b') as f:
+                f.truncate(len(self.MAGIC) + usable)
+
+    def add(self, block_number, timestamp):
+        """Record one block header (no-op if already known)"""
+        with self.lock:
+            i = bisect.bisect_left(self.blocks, block_number)
+            if i < len(self.blocks) and self.blocks[i] == block_number:
+                return
+            self.blocks.insert(i, block_number)
+            self.timestamps.insert(i, timestamp)
+            with open(self.path, 'ab') as f:
+                f.write(self.RECORD.pack(block_number, timestamp))
+
+    def _fetch(self, block_identifier):
+        block = self.web3.eth.get_block(block_identifier)
+        self.rpc_calls += 1
+        self.add(block.number, block.timestamp)
+        return block.number, block.timestamp
+
+    def sync_head(self):
+        """Anchor the latest block (extends the index as the chain advances)"""
+        return self._fetch('latest')
+
+    def _bracket(self, timestamp):
+        """(lo, hi) anchors with lo.ts < timestamp <= hi.ts; either side may be None"""
+        with self.lock:
+            i = bisect.bisect_left(self.timestamps, timestamp)
+            lo = (self.blocks[i - 1], self.timestamps[i - 1]) if i > 0 else None
+            hi = (self.blocks[i], self.timestamps[i]) if i < len(self.blocks) else None
+            return lo, hi
+
+    def _block_time(self):
+        with self.lock:
+            if len(self.blocks) >= 2 and self.blocks[-1] > self.blocks[-2]:
+                return (self.timestamps[-1] - self.timestamps[-2]) / (self.blocks[-1] - self.blocks[-2]) or self.default_block_time
+        return self.default_block_time
+
+    def block_at(self, timestamp, before=True):
+        """
+        First block with block.timestamp >= timestamp, or the block just
+        before it when before=True (same contract as the old binary search).
+        If the index can't pin it down within `tolerance` blocks after
+        `max_rpc` fetches, the wider (safer) end of the bracket is returned.
+        """
+        rpc_used = 0
+        lo, hi = self._bracket(timestamp)
+
+        if hi is None:
+            hi = self.sync_head()
+            rpc_used += 1
+            if hi[1] < timestamp:
+                # Target is in the future: the head is the best we have
+                return hi[0]
+            lo, hi = self._bracket(timestamp)
+
+        while rpc_used < self.max_rpc:
+            if lo is None:
+                # Older than anything indexed: jump back by the estimated block time
+                guess = max(1, hi[0] - int((hi[1] - timestamp) / self._block_time()) - 1)
+                if guess >= hi[0]:
+                    guess = hi[0] - 1
+                if guess < 1:
+                    break
+            else:
+                if hi[0] - lo[0] <= self.tolerance:
+                    break
+                # Interpolate inside the bracket
+                span = hi[1] - lo[1]
+                guess = lo[0] + int((timestamp - lo[1]) * (hi[0] - lo[0]) / span) if span else lo[0] + 1
+                guess = min(max(guess, lo[0] + 1), hi[0] - 1)
+
+            self._fetch(guess)
+            rpc_used += 1
+            lo, hi = self._bracket(timestamp)
+
+        if before:
+            # Last block with timestamp < target (latest possible if the bracket is still wide)
+            return max(1, hi[0] - 1)
+        # First block with timestamp >= target (earliest possible if the bracket is still wide)
+        return lo[0] + 1 if lo is not None else hi[0]
@@ -0,0 +1,229 @@
+import json
+import os
+import threading
+import time
+
+from eth_utils import to_checksum_address
+
+BULL = 0  # ledger / BetInfo position
+BEAR = 1
+
+
+class ClaimScanner:
+    """
+    Portfolio-wide reward scanner for the prediction contract.
+
+    Every wallet's bets come from getUserRoundsLength / getUserRounds (paged,
+    all wallets in the same Multicall3 batch), so no epoch range has to be
+    guessed. Only bets that are not claimed yet are looked at: their rounds()
+    are read in one batch across all wallets, winners and refunds are
+    decided locally, and the claimable / refundable flags of just those bets
+    are confirmed in one more batch.
+
+    Finalized rounds (oracle called, or past closeTimestamp + bufferSeconds
+    and therefore refundable) never change again: they are kept in memory
+    and appended to `cache_file` (one JSON line per round), so later scans
+    only read rounds that were still open. Bets already seen are kept too;
+    a rescan pages in only the bets placed since.
+    """
+
+    def __init__(self, web3, prediction_contract, multicall, cache_file="claim_rounds.jsonl", page_size=500):
+        self.web3 = web3
+        self.contract = prediction_contract
+        self.multicall = multicall
+        self.cache_file = cache_file
+        self.page_size = page_size
+        self.buffer_seconds = None
+        self.rounds = {}  # epoch -> (close_ts, lock_price, close_price, reward_base, reward_amount, oracle_called)
+        self.bets = {}  # address -> [[epoch, position, amount, claimed], ...] in getUserRounds order
+        self.lock = threading.RLock()
+        self._load_cache()
+
+    # === Finalized round cache ===
+
+    def _load_cache(self):
+        if not os.path.exists(self.cache_file):
+            return
+        with open(self.cache_file, 'r') as f:
+            for line in f:
+                try:
+                    epoch, *fields = json.loads(line)
+                except ValueError:
+                    break  # torn last line
+                self.rounds[epoch] = tuple(fields)
+
+    def _save_rounds(self, epochs):
+        if not epochs:
+            return
+        with open(self.cache_file, 'a') as f:
+            f.write("".join(json.dumps([epoch, *self.rounds[epoch]]) + "\n" for epoch in epochs))
+
+    def is_finalized(self, epoch, now=None):
+        data = self.rounds.get(epoch)
+        if not data:
+            return False
+        close_ts, _, _, _, _, oracle_called = data
+        if oracle_called:
+            return True
+        return close_ts > 0 and self.buffer_seconds is not None and (now or time.time()) > close_ts + self.buffer_seconds
+
+    def _read_rounds(self, epochs):
+        """rounds() for epochs not finalized yet, one batch; newly finalized ones are cached"""
+        now = time.time()
+        epochs = sorted({epoch for epoch in epochs if not self.is_finalized(epoch, now)})
+        if not epochs:
+            return
+
+        _, results = self.multicall.aggregate(self.contract.functions.rounds(epoch) for epoch in epochs)
+        finalized = []
+        for epoch, data in zip(epochs, results):
+            if data is None:
+                continue
+            # (close ts, lock price, close price, rewardBaseCalAmount, rewardAmount, oracleCalled)
+            self.rounds[epoch] = (data[3], data[4], data[5], data[11], data[12], data[13])
+            if self.is_finalized(epoch, now):
+                finalized.append(epoch)
+        self._save_rounds(finalized)
+
+    # === Bets ===
+
+    def _read_bets(self, addresses):
+        """Page in bets placed since the last scan, for every wallet at once"""
+        calls = [self.contract.functions.getUserRoundsLength(address) for address in addresses]
+        if self.buffer_seconds is None:
+            calls.append(self.contract.functions.bufferSeconds())
+        block_number, results = self.multicall.aggregate(calls)
+        if self.buffer_seconds is None:
+            self.buffer_seconds = results.pop()
+
+        pages = []
+        for address, length in zip(addresses, results):
+            known = len(self.bets.setdefault(address, []))
+            for cursor in range(known, length or 0, self.page_size):
+                pages.append((address, cursor))
+
+        _, results = self.multicall.aggregate(
+            (self.contract.functions.getUserRounds(address, cursor, self.page_size) for address, cursor in pages),
+            block_identifier=block_number
+        )
+        for (address, cursor), page in zip(pages, results):
+            if page is None:
+                raise RuntimeError(f"getUserRounds failed for {address} at cursor {cursor}")
+            epochs, infos, _ = page
+            self.bets[address].extend([epoch, info[0], info[1], info[2]] for epoch, info in zip(epochs, infos))
+
+    def _reward(self, epoch, position, amount):
+        """(reward wei, is_refund) if the bet pays out, else None (round open or bet lost)"""
+        if not self.is_finalized(epoch):
+            return None
+        _, lock_price, close_price, reward_base, reward_amount, oracle_called = self.rounds[epoch]
+        if not oracle_called:
+            return amount, True
+        won = (close_price > lock_price and position == BULL) or (close_price < lock_price and position == BEAR)
+        if not won or not reward_base:
+            return None
+        return amount * reward_amount // reward_base, False
+
+    # === Scans ===
+
+    def scan(self, addresses):
+        """
+        {address: [claim dicts]} for every wallet, each dict:
+        epoch, position ('BULL'/'BEAR'), bet_amount / reward (BNB), refund (bool), claimed (False)
+        """
+        addresses = [to_checksum_address(address) for address in addresses]
+        with self.lock:
+            self._read_bets(addresses)
+            self._read_rounds(epoch for address in addresses
+                              for epoch, _, amount, claimed in self.bets[address] if amount and not claimed)
+
+            candidates = []
+            for address in addresses:
+                for bet in self.bets[address]:
+                    epoch, position, amount, claimed = bet
+                    if not amount or claimed:
+                        continue
+                    payout = self._reward(epoch, position, amount)
+                    if payout:
+                        candidates.append((address, bet, payout))
+
+            # Confirm with the contract (also catches claims made elsewhere)
+            _, flags = self.multicall.aggregate(
+                (self.contract.functions.refundable if payout[1] else self.contract.functions.claimable)(bet[0], address)
+                for address, bet, payout in candidates
+            )
+
+            found = {address: [] for address in addresses}
+            for (address, bet, (reward, refund)), ok in zip(candidates, flags):
+                if not ok:
+                    if ok is False:
+                        bet[3] = True  # paid-out round that is no longer claimable: claimed
+                    continue
+                found[address].append({
+                    'epoch': bet[0],
+                    'position': 'BULL' if bet[1] == BULL else 'BEAR',
+                    'bet_amount': self.web3.from_wei(bet[2], 'ether'),
+                    'reward': self.web3.from_wei(reward, 'ether'),
+                    'refund': refund,
+                    'claimed': False,
+                })
+            return found
+
+    def scan_wallet(self, address):
+        return self.scan([address])[to_checksum_address(address)]
+
+    def mark_claimed(self, address, epochs):
+        """Record epochs claimed by our own claim txs"""
+        address = to_checksum_address(address)
+        epochs = set(epochs)
+        with self.lock:
+            for bet in self.bets.get(address, []):
+                if bet[0] in epochs:
+                    bet[3] = True
+
+    def estimate_reward(self, address, epoch):
+        """Reward (BNB) for one unclaimed bet: ledger + rounds in one batch (rounds cached once final)"""
+        address = to_checksum_address(address)
+        with self.lock:
+            calls = [self.contract.functions.ledger(epoch, address)]
+            if not self.is_finalized(epoch):
+                calls.append(self.contract.functions.rounds(epoch))
+            if self.buffer_seconds is None:
+                calls.append(self.contract.functions.bufferSeconds())
+            _, results = self.multicall.aggregate(calls)
+
+            if self.buffer_seconds is None:
+                self.buffer_seconds = results.pop()
+            if len(results) == 2 and results[1] is not None:
+                data = results[1]
+                self.rounds[epoch] = (data[3], data[4], data[5], data[11], data[12], data[13])
+                if self.is_finalized(epoch):
+                    self._save_rounds([epoch])
+
+            ledger = results[0]
+            if not ledger or not ledger[1] or ledger[2]:
+                return 0
+            payout = self._reward(epoch, ledger[0], ledger[1])
+            return self.web3.from_wei(payout[0], 'ether') if payout else 0
+
+    def audit(self, wallets):
+        """Print claimable rewards for every wallet ({'name', 'address'} dicts); returns the scan"""
+        started = time.time()
+        found = self.scan([wallet['address'] for wallet in wallets])
+
+        print("\n" + "=" * 80)
+        print(f"💎 REWARD AUDIT ({len(wallets)} wallets)")
+        print("=" * 80)
+        grand_total = 0
+        for wallet in wallets:
+            address = to_checksum_address(wallet['address'])
+            claims = found[address]
+            total = sum(claim['reward'] for claim in claims)
+            grand_total += total
+            refunds = sum(1 for claim in claims if claim['refund'])
+            print(f"👤 {wallet['name']:<15} bets: {len(self.bets[address]):<6} claimable: {len(claims):<4} "
+                  f"(refunds {refunds}) 💰 {total:.6f} BNB")
+        print("-" * 80)
+        print(f"💰 TOTAL CLAIMABLE: {grand_total:.6f} BNB | ⏱️ {time.time() - started:.2f}s")
+        print("=" * 80)
+        return found
@@ -5,11 +5,16 @@ import math
 from datetime import datetime
 from web3 import Web3
 from web3.middleware import ExtraDataToPOAMiddleware
-from eth_utils import event_signature_to_log_topic
 from dotenv import load_dotenv, find_dotenv
 import requests
 import sys
 
+from bet_stream import BetStream
+from block_index import BlockIndex
+from live_stream import LiveRoundStream
+from round_analytics import RoundAnalytics
+from round_store import RoundStore
+
 # === Config ===
 
 load_dotenv(find_dotenv())
@@ -46,16 +51,21 @@ CHAINLINK_ABI = [
 
 price_feed = web3.eth.contract(address=CHAINLINK_BNB_USD, abi=CHAINLINK_ABI)
 
+# === Block number <-> timestamp index (block_index.bin) ===
+block_index = BlockIndex(web3)
+
 # === Price Caching Variables ===
 last_price_fetch = 0
 cached_price = 0
 
-# Topics for events
-bet_bull_topic = event_signature_to_log_topic("BetBull(address,uint256,uint256)")
-bet_bear_topic = event_signature_to_log_topic("BetBear(address,uint256,uint256)")
+# Live bets: one getLogs per poll over new blocks only (BetBull OR BetBear)
+bet_stream = BetStream(web3, CONTRACT_ADDRESS)
+
+# Optional WebSocket streaming mode (--ws URL or VIEWER_WS_URL): bets pushed via eth_subscribe
+live_stream = None
 
 # Global variables
-rounds_history = []  # Store last 24 rounds info
+rounds_history = []  # Rounds of the last 24 epochs (display window over round_store)
 first_timer_print = True
 last_round_close_price = 0
 
@@ -64,8 +74,11 @@ current_streak = 0
 current_streak_type = None  # 'BULL' or 'BEAR'
 last_notified_streak = 0  # Track last streak we notified about
 
-# Cache file for storing rounds data
+# Every finished round, append-only columnar file (old JSON cache is imported once)
+ROUND_STORE_FILE = "rounds.bin"
 CACHE_FILE = "rounds_cache.json"
+round_store = RoundStore(ROUND_STORE_FILE)
+round_analytics = RoundAnalytics(round_store, window=24)  # streak / 24-round counters, updated incrementally
 
 # ML INSIGHTS INTEGRATION
 HOURLY_BULL_RATES = {
@@ -95,20 +108,17 @@ price_history = []
 
 def get_24_round_summary():
     """Get 24-round summary for notifications"""
-    if not rounds_history:
+    summary = round_analytics.window_summary()
+    if not summary:
         return "📊 No rounds data available"
-    
-    # Count wins
-    bull_wins = sum(1 for r in rounds_history if r['winner'] == 'BULL')
-    bear_wins = sum(1 for r in rounds_history if r['winner'] == 'BEAR')
-    
+
     # Price trend (first round open vs last round close)
-    first_price = rounds_history[0]['lock_price_usdt']
-    last_price = rounds_history[-1]['close_price_usdt']
+    first_price = summary['first_price']
+    last_price = summary['last_price']
     price_diff = last_price - first_price
     trend_emoji = "📈" if price_diff >= 0 else "📉"
-    
-    return f"📊 24-Round Summary:\n🟢 BULL: {bull_wins} | 🔴 BEAR: {bear_wins}\n{trend_emoji} Trend: ${first_price:.4f} → ${last_price:.4f} ({price_diff:+.4f})"
+
+    return f"📊 24-Round Summary:\n🟢 BULL: {summary['bull_wins']} | 🔴 BEAR: {summary['bear_wins']}\n{trend_emoji} Trend: ${first_price:.4f} → ${last_price:.4f} ({price_diff:+.4f})"
 
 
 def get_current_price_info():
@@ -174,26 +184,17 @@ def check_streak_and_notify():
     """Check for streaks of 7+ and send Telegram notification"""
     global current_streak, current_streak_type, last_notified_streak
 
-    if len(rounds_history) < 4:
+    if len(round_store) < 4:
         return
 
-    # Get all 24 rounds to analyze streaks
     recent_rounds = rounds_history
 
     # Store previous values for comparison
     prev_streak_type = current_streak_type
     prev_streak = current_streak
 
-    # Reset streak tracking
-    current_streak = 1
-    current_streak_type = recent_rounds[-1]['winner']
-
-    # Count consecutive wins from the end
-    for i in range(len(recent_rounds) - 2, -1, -1):
-        if recent_rounds[i]['winner'] == current_streak_type:
-            current_streak += 1
-        else:
-            break
+    # Streak over the whole stored history (running counters, no rescan)
+    current_streak_type, current_streak = round_analytics.current_streak
 
     # Reset notification counter if streak type changed or streak broke
     if (current_streak_type != prev_streak_type or
@@ -264,61 +265,13 @@ def get_max_bets_for_round(epoch, start_ts, lock_ts):
     """Get max bull and bear bets for a specific round"""
     try:
         # Get block range for this round
-        def get_block_by_timestamp(target_timestamp, before=True):
-            latest_block = web3.eth.block_number
-            low = max(1, latest_block - 50000)  # Limit search range
-            high = latest_block
-            while low < high:
-                mid = (low + high) // 2
-                try:
-                    block = web3.eth.get_block(mid)
-                    block_time = block.timestamp
-                    if block_time < target_timestamp:
-                        low = mid + 1
-                    else:
-                        high = mid
-                except:
-                    break
-            return (low - 1) if before and low > 1 else low
-
         start_block = get_block_by_timestamp(start_ts, before=False)
         end_block = get_block_by_timestamp(lock_ts, before=True)
 
-        # Get bet events for this round
-        bet_bull_logs = web3.eth.get_logs({
-            "fromBlock": start_block,
-            "toBlock": end_block,
-            "address": CONTRACT_ADDRESS,
-            "topics": [bet_bull_topic]
-        })
-        bet_bear_logs = web3.eth.get_logs({
-            "fromBlock": start_block,
-            "toBlock": end_block,
-            "address": CONTRACT_ADDRESS,
-            "topics": [bet_bear_topic]
-        })
-
-        # Process bull bets
-        max_bull_bet = 0
-        for log in bet_bull_logs:
-            try:
-                event = contract.events.BetBull().process_log(log)
-                if event['args']['epoch'] == epoch:
-                    amount_bnb = event['args']['amount'] / 1e18
-                    max_bull_bet = max(max_bull_bet, amount_bnb)
-            except:
-                continue
-
-        # Process bear bets
-        max_bear_bet = 0
-        for log in bet_bear_logs:
-            try:
-                event = contract.events.BetBear().process_log(log)
-                if event['args']['epoch'] == epoch:
-                    amount_bnb = event['args']['amount'] / 1e18
-                    max_bear_bet = max(max_bear_bet, amount_bnb)
-            except:
-                continue
+        # Get bet events for this round (single getLogs, each log decoded once)
+        round_bets = bet_stream.read_range(start_block, end_block).get(epoch)
+        max_bull_bet = round_bets.max_bet_on_bull if round_bets else 0
+        max_bear_bet = round_bets.max_bet_on_bear if round_bets else 0
 
         return max_bull_bet, max_bear_bet
 
@@ -328,35 +281,16 @@ def get_max_bets_for_round(epoch, start_ts, lock_ts):
 
 
 def load_cached_rounds():
-    """Load rounds data from cache file"""
+    """Refresh the 24-round display window from the round store"""
     global rounds_history
 
-    try:
-        if os.path.exists(CACHE_FILE):
-            with open(CACHE_FILE, 'r') as f:
-                cached_data = json.load(f)
-                rounds_history = cached_data.get('rounds_history', [])
-                print(f"📂 Loaded {len(rounds_history)} rounds from cache")
-        else:
-            print("📂 No cache file found, starting fresh")
-            rounds_history = []
-    except Exception as e:
-        print(f"⚠️ Error loading cache: {e}")
-        rounds_history = []
-
+    if len(round_store) == 0:
+        imported = round_store.import_json_cache(CACHE_FILE)
+        if imported:
+            print(f"📂 Imported {imported} rounds from {CACHE_FILE}")
 
-def save_rounds_to_cache():
-    """Save rounds data to cache file"""
-    try:
-        cache_data = {
-            'rounds_history': rounds_history,
-            'last_updated': datetime.now().isoformat()
-        }
-        with open(CACHE_FILE, 'w') as f:
-            json.dump(cache_data, f, indent=2)
-        print(f"💾 Saved {len(rounds_history)} rounds to cache")
-    except Exception as e:
-        print(f"⚠️ Error saving cache: {e}")
+    round_analytics.sync()
+    rounds_history = round_store.to_dicts(round_store.recent(24))
 
 
 def fetch_single_round_data(epoch):
@@ -372,6 +306,8 @@ def fetch_single_round_data(epoch):
         total_amount = round_data[8] / 1e18
         bull_amount = round_data[9] / 1e18
         bear_amount = round_data[10] / 1e18
+        reward_base_cal_amount = round_data[11] / 1e18
+        reward_amount = round_data[12] / 1e18
 
         if close_price == 0 or close_ts == 0:
             return None  # Skip incomplete rounds
@@ -393,6 +329,9 @@ def fetch_single_round_data(epoch):
 
         round_info = {
             'epoch': epoch,
+            'start_ts': start_ts,
+            'lock_ts': lock_ts,
+            'close_ts': close_ts,
             'lock_price': lock_price,
             'close_price': close_price,
             'lock_price_usdt': lock_price_usdt,
@@ -402,6 +341,10 @@ def fetch_single_round_data(epoch):
             'bear_payout': bear_payout,
             'winner': winner,
             'total_amount': total_amount,
+            'bull_amount': bull_amount,
+            'bear_amount': bear_amount,
+            'reward_base_cal_amount': reward_base_cal_amount,
+            'reward_amount': reward_amount,
             'max_bull_bet': max_bull_bet,
             'max_bear_bet': max_bear_bet
         }
@@ -414,51 +357,41 @@ def fetch_single_round_data(epoch):
 
 
 def fetch_round_history():
-    """Fetch the last 24 completed rounds data with caching"""
-    global rounds_history
-
+    """Fetch the last 24 completed rounds into the round store (only epochs not stored yet)"""
     try:
-        # Load existing cache
         load_cached_rounds()
 
         current_epoch = contract.functions.currentEpoch().call()
-        target_epochs = list(range(current_epoch - 24, current_epoch))  # Last 24 epochs
-
-        # Get epochs we already have cached
-        cached_epochs = {round_info['epoch'] for round_info in rounds_history}
+        target_epochs = [epoch for epoch in range(current_epoch - 24, current_epoch) if epoch > 0]  # Last 24 epochs
 
         # Find which epochs we need to fetch
-        epochs_to_fetch = [epoch for epoch in target_epochs if epoch not in cached_epochs and epoch > 0]
+        epochs_to_fetch = round_store.missing(target_epochs)
 
         print(f"📊 Current epoch: {current_epoch}")
-        print(f"📂 Cached rounds: {len(cached_epochs)}")
+        print(f"📂 Stored rounds: {len(round_store)}")
         print(f"🔄 Need to fetch: {len(epochs_to_fetch)} new rounds")
 
-        # Fetch missing rounds
+        # Fetch missing rounds (each one appended to the store as it arrives)
         new_rounds_fetched = 0
         for epoch in epochs_to_fetch:
             print(f"🔄 Fetching round {epoch}...")
             round_info = fetch_single_round_data(epoch)
             if round_info:
-                rounds_history.append(round_info)
+                round_store.append(round_info)
                 new_rounds_fetched += 1
 
-        # Sort by epoch and keep only last 24
-        rounds_history.sort(key=lambda x: x['epoch'])
-        rounds_history = rounds_history[-24:]  # Keep only last 24
+        load_cached_rounds()
 
-        # Save updated cache
         if new_rounds_fetched > 0:
-            save_rounds_to_cache()
             print(f"✅ Fetched {new_rounds_fetched} new rounds")
 
             # Check for streaks and price movements after fetching new data
             check_streak_and_notify()
             check_price_movement_and_notify()
         else:
-            print("✅ All rounds up to date from cache")
+            print("✅ All rounds up to date from the round store")
 
-        print(f"📋 Total rounds in history: {len(rounds_history)}")
+        print(f"📋 Total rounds in history: {len(round_store)}")
 
     except Exception as e:
         print(f"⚠️ Error in fetch_round_history: {e}")
@@ -501,14 +434,14 @@ def display_rounds_history():
     print("=" * 140)
     
     # ADHD-FRIENDLY SUMMARY BOX
-    if len(rounds_history) >= 1:
-        # Count wins
-        bull_wins = sum(1 for r in rounds_history if r['winner'] == 'BULL')
-        bear_wins = sum(1 for r in rounds_history if r['winner'] == 'BEAR')
-        
+    summary = round_analytics.window_summary()
+    if summary:
+        bull_wins = summary['bull_wins']
+        bear_wins = summary['bear_wins']
+
         # Price trend (first round open vs last round close)
-        first_price = rounds_history[0]['lock_price_usdt']
-        last_price = rounds_history[-1]['close_price_usdt']
+        first_price = summary['first_price']
+        last_price = summary['last_price']
         price_diff = last_price - first_price
         trend_emoji = "📈" if price_diff >= 0 else "📉"
         
@@ -573,65 +506,11 @@ def calculate_ml_prediction_score(bet_data):
 
 
 def fetch_bets(start_block, end_block, current_epoch):
-    """Fetch live bet data for current round"""
+    """Fetch live bet data for current round (only blocks added since the last call)"""
     try:
-        bet_bull_logs = web3.eth.get_logs({
-            "fromBlock": start_block,
-            "toBlock": end_block,
-            "address": CONTRACT_ADDRESS,
-            "topics": [bet_bull_topic]
-        })
-        bet_bear_logs = web3.eth.get_logs({
-            "fromBlock": start_block,
-            "toBlock": end_block,
-            "address": CONTRACT_ADDRESS,
-            "topics": [bet_bear_topic]
-        })
-        
-        bet_bull_events = [
-            contract.events.BetBull().process_log(log)
-            for log in bet_bull_logs
-            if contract.events.BetBull().process_log(log)['args']['epoch'] == current_epoch
-        ]
-        bet_bear_events = [
-            contract.events.BetBear().process_log(log)
-            for log in bet_bear_logs
-            if contract.events.BetBear().process_log(log)['args']['epoch'] == current_epoch
-        ]
-
-        all_bets = []
-        for event in bet_bull_events:
-            amount_bnb = event['args']['amount'] / 1e18
-            all_bets.append({
-                "side": "Bull",
-                "amount_bnb": amount_bnb,
-                "user": event['args']['sender'],
-                "epoch": event['args']['epoch']
-            })
-        for event in bet_bear_events:
-            amount_bnb = event['args']['amount'] / 1e18
-            all_bets.append({
-                "side": "Bear",
-                "amount_bnb": amount_bnb,
-                "user": event['args']['sender'],
-                "epoch": event['args']['epoch']
-            })
-
-        bull_amount = sum(bet["amount_bnb"] for bet in all_bets if bet["side"] == "Bull")
-        bear_amount = sum(bet["amount_bnb"] for bet in all_bets if bet["side"] == "Bear")
-        total_amount = bull_amount + bear_amount
-
-        bull_whales = sum(1 for b in all_bets if b["side"] == "Bull" and b["amount_bnb"] >= 0.84)
-        bear_whales = sum(1 for b in all_bets if b["side"] == "Bear" and b["amount_bnb"] >= 0.84)
-
-        bull_payout = total_amount / bull_amount if bull_amount > 0 else 0
-        bear_payout = total_amount / bear_amount if bear_amount > 0 else 0
-
-        bull_percent = (bull_amount / total_amount) * 100 if total_amount > 0 else 0
-        bear_percent = (bear_amount / total_amount) * 100 if total_amount > 0 else 0
-
-        max_bet_on_bull = max([bet["amount_bnb"] for bet in all_bets if bet["side"] == "Bull"], default=0)
-        max_bet_on_bear = max([bet["amount_bnb"] for bet in all_bets if bet["side"] == "Bear"], default=0)
+        bet_stream.poll(start_block, end_block)
+        bet_data = bet_stream.get(current_epoch).summary()
+        total_amount = bet_data["total_amount"]
 
         # Update price history (simplified - using total pool as price proxy)
         if total_amount > 0:
@@ -639,20 +518,7 @@ def fetch_bets(start_block, end_block, current_epoch):
             if len(price_history) > 20:
                 price_history.pop(0)
 
-        return {
-            "bull_amount": bull_amount,
-            "bear_amount": bear_amount,
-            "total_amount": total_amount,
-            "bull_payout": bull_payout,
-            "bear_payout": bear_payout,
-            "bull_percent": bull_percent,
-            "bear_percent": bear_percent,
-            "max_bet_on_bull": max_bet_on_bull,
-            "max_bet_on_bear": max_bet_on_bear,
-            "bull_whales": bull_whales,
-            "bear_whales": bear_whales,
-            "all_bets": all_bets
-        }
+        return bet_data
     except Exception as e:
         # Return default values if fetching fails
         return {
@@ -663,24 +529,11 @@ def fetch_bets(start_block, end_block, current_epoch):
 
 
 def get_block_by_timestamp(target_timestamp, before=True):
-    """Get block number by timestamp"""
+    """Get block number by timestamp (local index, at most a few RPC calls on a miss)"""
     try:
-        latest_block = web3.eth.block_number
-        low = max(1, latest_block - 50000)  # Limit search range
-        high = latest_block
-        while low < high:
-            mid = (low + high) // 2
-            try:
-                block = web3.eth.get_block(mid)
-                block_time = block.timestamp
-                if block_time < target_timestamp:
-                    low = mid + 1
-                else:
-                    high = mid
-            except:
-                break
-        return (low - 1) if before and low > 1 else low
-    except:
+        return block_index.block_at(target_timestamp, before=before)
+    except Exception as e:
+        print(f"⚠️ Block index lookup failed: {e}")
         return web3.eth.block_number
 
 
@@ -706,6 +559,12 @@ def main_loop():
 
     start_block = get_block_by_timestamp(start_ts, before=False)
 
+    streaming = live_stream is not None and live_stream.connected
+    if streaming:
+        # Subscription only sees new bets: backfill the round so far once, overlap is de-duplicated
+        live_stream.round_locked.clear()
+        fetch_bets(start_block, web3.eth.block_number, current_epoch)
+
     first_timer_print = True
 
     while True:
@@ -736,11 +595,14 @@ def main_loop():
         else:
             timer_color = "🟢"
 
-        # Only fetch bet data when time_left <= 25 to save RPC calls
-        if time_left <= 25:
+        # Streaming: bets are pushed for the whole round. Polling: only fetch when time_left <= 25 to save RPC calls
+        if streaming or time_left <= 25:
             try:
-                latest_block = web3.eth.block_number
-                bet_data = fetch_bets(start_block, latest_block, current_epoch)
+                if streaming:
+                    bet_data = bet_stream.get(current_epoch).summary()
+                else:
+                    latest_block = web3.eth.block_number
+                    bet_data = fetch_bets(start_block, latest_block, current_epoch)
                 bull_percent = bet_data["bull_percent"]
                 bear_percent = bet_data["bear_percent"]
                 total_amount = bet_data["total_amount"]
@@ -781,13 +643,29 @@ def main_loop():
         if time_left <= 0:
             break
 
+        if streaming and current_epoch in live_stream.lock_prices:
+            print("\n🔴 ROUND LOCKED - Waiting for next round...")
+            break
+
         time.sleep(1)
 
 
 if __name__ == "__main__":
+    ws_url = os.getenv("VIEWER_WS_URL")
+    if "--ws" in sys.argv and sys.argv.index("--ws") + 1 < len(sys.argv):
+        ws_url = sys.argv[sys.argv.index("--ws") + 1]
+
+    if ws_url:
+        live_stream = LiveRoundStream(ws_url, CONTRACT_ADDRESS, bet_stream).start()
+        if not live_stream.wait_until_subscribed(timeout=10):
+            print(f"⚠️ Could not subscribe on {ws_url}, falling back to polling")
+
     print("🚀 PANCAKESWAP PREDICTION VIEWER")
     print("👀 View-Only Mode: Monitor rounds, streaks & price movements!")
-    print("📊 Live bet data: Shows ONLY in last 25 seconds (saves RPC calls)")
+    if live_stream is not None and live_stream.connected:
+        print(f"📡 Live bet data: Streaming the whole round over {ws_url}")
+    else:
+        print("📊 Live bet data: Shows ONLY in last 25 seconds (saves RPC calls)")
     print("🚨 Streak + price movement notifications enabled!")
     print("💰 Live BNB price with 10-second caching!")
     print("⏰ Telegram notifications delayed 3 seconds!")
@@ -801,5 +679,8 @@ if __name__ == "__main__":
 
         print("\n⏳ Waiting 170 seconds before checking next round...\n")
         for i in range(170, 0, -1):
+            # Streaming: the LockRound event tells us the next round is open
+            if live_stream is not None and live_stream.round_locked.is_set():
+                break
             print(f"\r⏳ Next round check in {i} seconds...", end="")
             time.sleep(1)
\ No newline at end of file
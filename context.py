@@ -0,0 +1,50 @@
+import threading
+
+
+class ChainContext:
+    """
+    Lazily built chain client, contracts and services.
+
+    Each attribute is made by its registered factory the first time it is
+    read and then cached on the instance, so holding a context costs
+    nothing: web3 is only imported, and the node only contacted, once
+    something actually needs the chain. Building is thread-safe (one
+    factory call per attribute even if several threads ask at once).
+    """
+
+    def __init__(self):
+        self._factories = {}
+        self._lock = threading.RLock()
+
+    def register(self, name, factory):
+        """factory() -> value of ctx.<name>, called on first access"""
+        self._factories[name] = factory
+
+    def __contains__(self, name):
+        return name in self._factories
+
+    def is_built(self, name):
+        return name in self.__dict__
+
+    def __getattr__(self, name):
+        # Only called while the attribute is not cached yet
+        factories = self.__dict__.get('_factories', {})
+        if name not in factories:
+            raise AttributeError(f"{type(self).__name__} has no attribute {name!r}")
+        with self._lock:
+            if name not in self.__dict__:
+                self.__dict__[name] = factories[name]()
+            return self.__dict__[name]
+
+    def warm_up(self, *names):
+        """Build the given attributes in a daemon thread (errors are reported, not raised)"""
+        def build():
+            for name in names:
+                try:
+                    getattr(self, name)
+                except Exception as e:
+                    print(f"⚠️ Could not initialise {name}: {e}")
+
+        thread = threading.Thread(target=build, daemon=True)
+        thread.start()
+        return thread
@@ -0,0 +1,169 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+
+class FanoutReport:
+    """Per-transfer results plus throughput / latency of one fan-out batch"""
+
+    def __init__(self, results, started_at, finished_at):
+        self.results = results
+        self.started_at = started_at
+        self.finished_at = finished_at
+
+    @property
+    def confirmed(self):
+        return [r for r in self.results if r['status'] == 'confirmed']
+
+    @property
+    def failed(self):
+        return [r for r in self.results if r['status'] != 'confirmed']
+
+    def print_summary(self):
+        elapsed = self.finished_at - self.started_at
+        latencies = sorted(r['latency'] for r in self.results if r['latency'] is not None)
+
+        print("\n" + "=" * 70)
+        print("📊 BATCH RESULTS")
+        print("=" * 70)
+        for r in self.results:
+            emoji = "✅" if r['status'] == 'confirmed' else "❌"
+            tx = r['tx_hash'] or "-"
+            latency = f"{r['latency']:.2f}s" if r['latency'] is not None else "-"
+            line = f"{emoji} {r['label']:<20} {r['status']:<12} {latency:>8}  {tx}"
+            if r['error']:
+                line += f"\n   ⚠️ {r['error']}"
+            print(line)
+
+        print("-" * 70)
+        print(f"✅ Confirmed: {len(self.confirmed)}/{len(self.results)}")
+        print(f"⏱️ Total time: {elapsed:.2f}s")
+        if elapsed > 0:
+            print(f"🚀 Throughput: {len(self.confirmed) / elapsed:.2f} tx/s")
+        if latencies:
+            p50 = latencies[len(latencies) // 2]
+            print(f"⏳ Latency (send → receipt): avg {sum(latencies) / len(latencies):.2f}s | "
+                  f"p50 {p50:.2f}s | max {latencies[-1]:.2f}s")
+        print("=" * 70)
+
+
+class TransferFanout:
+    """
+    Sign a batch of transactions up front, broadcast them concurrently and
+    collect receipts through the TxPipeline (one batched poll per block for
+    the whole batch instead of a polling thread per tx).
+    Several txs from the same wallet (main wallet distribution) get
+    consecutive nonces from the NonceManager, so their order of arrival at
+    the node does not matter.
+    """
+
+    def __init__(self, web3, nonce_manager, pipeline, max_workers=16, receipt_timeout=120):
+        self.web3 = web3
+        self.nonce_manager = nonce_manager
+        self.pipeline = pipeline
+        self.max_workers = max_workers
+        self.receipt_timeout = receipt_timeout
+
+    def run(self, jobs):
+        """
+        jobs: list of {'label': str, 'tx': tx dict without nonce, 'private_key': str}
+        Returns a FanoutReport.
+        """
+        started_at = time.time()
+        results = []
+        signed = []
+
+        # 1. Sign everything first (nonces handed out in job order)
+        for job in jobs:
+            result = {'label': job['label'], 'status': 'pending', 'tx_hash': None,
+                      'latency': None, 'error': None, 'sent_at': None}
+            results.append(result)
+            tx = dict(job['tx'])
+            try:
+                address = self.nonce_manager.address_for(job['private_key'])
+                tx['nonce'] = self.nonce_manager.next_nonce(address)
+                signed_tx = self.web3.eth.account.sign_transaction(tx, job['private_key'])
+                signed.append((result, address, tx, job['private_key'], signed_tx))
+            except Exception as e:
+                if 'nonce' in tx:
+                    # Not signed: give the nonce back so later txs don't queue behind a hole
+                    self.nonce_manager.release(address, tx['nonce'], sent=False)
+                result['status'] = 'sign_failed'
+                result['error'] = str(e)
+
+        # 2. Broadcast concurrently, 3. track every receipt in the pipeline
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            list(pool.map(lambda item: self._broadcast(*item), signed))
+        self._fill_nonce_gaps(signed)
+
+        tracked = [(result, self.pipeline.track(result['tx_hash'], result['label'], timeout=self.receipt_timeout))
+                   for result, *_ in signed if result['status'] == 'sent']
+        wait([future for _, future in tracked])
+        for result, future in tracked:
+            self._record_receipt(result, future)
+
+        return FanoutReport(results, started_at, time.time())
+
+    def _broadcast(self, result, address, tx, private_key, signed_tx):
+        for attempt in range(2):
+            try:
+                result['sent_at'] = time.time()
+                self.web3.eth.send_raw_transaction(signed_tx.raw_transaction)
+                result['tx_hash'] = signed_tx.hash
+                result['status'] = 'sent'
+                result['error'] = None
+                return
+            except Exception as e:
+                if 'already known' in str(e).lower():
+                    result['tx_hash'] = signed_tx.hash
+                    result['status'] = 'sent'
+                    result['error'] = None
+                    return
+                result['error'] = str(e)
+        result['status'] = 'send_failed'
+
+    def _fill_nonce_gaps(self, signed):
+        """
+        A failed send leaves a hole in that wallet's nonce sequence and every
+        later tx from it would sit in the mempool forever. Plug each hole with
+        a 0-value self-transfer at the same nonce.
+        """
+        for result, address, tx, private_key, _ in signed:
+            if result['status'] != 'send_failed':
+                continue
+
+            later_sent = any(
+                other_address == address and other_tx['nonce'] > tx['nonce'] and other['status'] == 'sent'
+                for other, other_address, other_tx, _, _ in signed
+            )
+            if not later_sent:
+                self.nonce_manager.resync(address)
+                continue
+
+            filler = {
+                'to': address,
+                'value': 0,
+                'gas': 21000,
+                'gasPrice': tx['gasPrice'],
+                'nonce': tx['nonce'],
+                'chainId': tx['chainId']
+            }
+            try:
+                # Signed and sent as is: the filler is only useful at exactly this nonce
+                signed_filler = self.web3.eth.account.sign_transaction(filler, private_key)
+                self.web3.eth.send_raw_transaction(signed_filler.raw_transaction)
+                print(f"🩹 Filled nonce gap {tx['nonce']} for {address}")
+            except Exception as e:
+                if 'already known' in str(e).lower():
+                    continue
+                print(f"⚠️ Could not fill nonce gap {tx['nonce']} for {address}: {e}")
+                self.nonce_manager.resync(address)
+
+    def _record_receipt(self, result, future):
+        try:
+            receipt = future.result()
+            result['latency'] = future.resolved_at - result['sent_at']
+            result['status'] = 'confirmed' if receipt.status == 1 else 'reverted'
+        except Exception as e:
+            result['status'] = 'timeout'
+            result['error'] = str(e)
+        result['tx_hash'] = self.web3.to_hex(result['tx_hash'])
@@ -0,0 +1,133 @@
+import statistics
+import threading
+import time
+
+# Reward percentiles sampled from eth_feeHistory for each tier
+TIERS = {'cheap': 10, 'standard': 50, 'fast': 90}
+
+# Fallback gas limits per operation (used when an estimate is not possible)
+DEFAULT_GAS = {
+    'transfer': 21000,
+    'approve': 50000,
+    'unwrap': 50000,
+    'token_transfer': 100000,
+    'wrap': 100000,
+    'bet': 200000,
+    'claim': 200000,
+    'v2_swap': 200000,  # V2 router swap (Smart Router routes: SwapRouter.gas_params)
+    'swap': 300000,
+}
+
+# Plain BNB transfers to wallets always cost exactly this
+FIXED_GAS = {'transfer': 21000}
+
+
+class GasOracle:
+    """
+    Shared gas price / gas limit source for every transaction builder.
+
+    Prices: eth_feeHistory over the last `blocks` blocks is read once per
+    new block; each tier is the median over those blocks of base fee +
+    the tier's priority-fee percentile (never below `floor_gwei`). Falls
+    back to eth_gasPrice if the node has no fee history.
+
+    Limits: params() gives the operation's last measured limit (or a
+    default) without any RPC, which is what latency-critical builders use;
+    estimate() re-measures a built tx with estimate_gas times `margin` and
+    remembers the result for the next params(). Operations whose cost
+    depends on their shape (swaps, see SwapRouter.gas_operation) are keyed
+    per shape and pass their own rough default.
+    """
+
+    def __init__(self, web3, blocks=20, floor_gwei='0.05', margin=1.25, min_poll_interval=1.0):
+        self.web3 = web3
+        self.blocks = blocks
+        self.floor = web3.to_wei(floor_gwei, 'gwei')
+        self.margin = margin
+        self.min_poll_interval = min_poll_interval  # seconds between eth_blockNumber checks
+
+        self.lock = threading.RLock()
+        self.block_number = None
+        self.prices = {}  # tier -> wei, for block_number
+        self.last_block_check = 0
+        self.learned_gas = {}  # operation -> last estimate (without margin)
+
+    def refresh(self, force=False):
+        """Re-sample the fee history if a new block was produced since the last read"""
+        with self.lock:
+            now = time.time()
+            if not force and self.prices and now - self.last_block_check < self.min_poll_interval:
+                return
+
+            self.last_block_check = now
+            block_number = self.web3.eth.block_number
+            if not force and block_number == self.block_number:
+                return
+
+            percentiles = list(TIERS.values())
+            prices = {}
+            try:
+                history = self.web3.eth.fee_history(self.blocks, block_number, percentiles)
+                base_fees = history['baseFeePerGas'][:len(history['reward'])]
+                for i, tier in enumerate(TIERS):
+                    samples = [base_fee + reward[i] for base_fee, reward in zip(base_fees, history['reward'])]
+                    prices[tier] = max(int(statistics.median(samples)), self.floor) if samples else self.floor
+            except Exception as e:
+                print(f"⚠️ Fee history unavailable ({e}), using eth_gasPrice")
+                gas_price = max(self.web3.eth.gas_price, self.floor)
+                prices = {tier: gas_price for tier in TIERS}
+
+            # Tiers never cross (a quiet block range can give p90 == p10)
+            prices['standard'] = max(prices['standard'], prices['cheap'])
+            prices['fast'] = max(prices['fast'], prices['standard'])
+
+            self.block_number = block_number
+            self.prices = prices
+
+    def gas_price(self, tier='standard'):
+        """Recommended gasPrice (wei) for tier: 'cheap', 'standard' or 'fast'"""
+        if tier not in TIERS:
+            raise ValueError(f"Unknown gas tier {tier}")
+        try:
+            self.refresh()
+        except Exception as e:
+            if not self.prices:
+                raise
+            print(f"⚠️ Gas oracle refresh failed, using block {self.block_number} prices: {e}")
+        return self.prices[tier]
+
+    def gas_limit(self, operation, default=None):
+        """Gas limit for operation without an RPC: its last estimate + margin, else default + margin, else DEFAULT_GAS"""
+        if operation in FIXED_GAS:
+            return FIXED_GAS[operation]
+        if operation in self.learned_gas:
+            return int(self.learned_gas[operation] * self.margin)
+        if default is not None:
+            return int(default * self.margin)
+        return DEFAULT_GAS.get(operation, 300000)
+
+    def params(self, operation, tier='standard', default=None):
+        """{'gas', 'gasPrice'} for a tx dict / build_transaction (no estimate RPC)"""
+        return {'gas': self.gas_limit(operation, default), 'gasPrice': self.gas_price(tier)}
+
+    def estimate(self, tx, operation):
+        """
+        Replace tx['gas'] with estimate_gas(tx) + margin and remember the
+        estimate for operation. If the estimate reverts (e.g. the tx waits
+        on an approval still in the mempool) tx keeps its gas limit.
+        """
+        if operation in FIXED_GAS:
+            tx['gas'] = FIXED_GAS[operation]
+            return tx
+        call = {key: tx[key] for key in ('from', 'to', 'value', 'data') if key in tx}
+        try:
+            estimated = self.web3.eth.estimate_gas(call)
+        except Exception:
+            return tx
+        self.learned_gas[operation] = estimated
+        tx['gas'] = int(estimated * self.margin)
+        return tx
+
+    def fee(self, operation, tier='standard'):
+        """Expected max fee in wei of operation (limit x price), e.g. to leave room when sending a whole balance"""
+        return self.gas_limit(operation) * self.gas_price(tier)
@@ -1,97 +1,113 @@
-import json
 import os
+import threading
 import time
 from datetime import datetime
-from web3 import Web3
+from eth_utils import to_checksum_address
+
+from order_index import OrderTriggerIndex
+from order_journal import OrderJournal
 
 
 class LimitOrderManager:
-    def __init__(self, swap_manager, betting_manager, wallet_manager, web3, chainlink_contract, usdt_address,
-                 wbnb_address):
+    def __init__(self, swap_manager, betting_manager, wallet_manager, context, usdt_address, wbnb_address):
         self.orders_file = "limit_orders.json"
+        self.journal = OrderJournal(self.orders_file)
         self.orders = self.load_orders()
         self.swap_manager = swap_manager
         self.betting_manager = betting_manager
         self.wallet_manager = wallet_manager
-        self.web3 = web3
-        self.chainlink = chainlink_contract
+        self.context = context  # ChainContext: web3 / price oracle / nonces are built on first use
         self.usdt_address = usdt_address
         self.wbnb = wbnb_address
+        self.orders_by_id = {order['id']: order for order in self.orders}
+        self.next_order_id = max(self.orders_by_id, default=0) + 1  # ids are never reused
+        self.trigger_index = OrderTriggerIndex(self.orders)
+        # Order state + persistence: the monitor thread, Telegram workers and TX pipeline callbacks all change orders
+        self.lock = threading.RLock()
+        self.in_flight = set()  # ids of 'executing' orders whose swap this process is waiting on
+
+        for order in self.orders:
+            if order['status'] == 'executing':
+                print(f"⚠️ Order #{order['id']} was executing when the bot stopped - check its swap, "
+                      f"then cancel it if nothing was swapped")
+
+    @property
+    def web3(self):
+        return self.context.web3
+
+    @property
+    def chainlink(self):
+        return self.context.chainlink_contract
+
+    @property
+    def price_oracle(self):
+        return self.context.price_oracle
+
+    @property
+    def nonce_manager(self):
+        return self.context.nonce_manager
+
+    @property
+    def gas_oracle(self):
+        return self.context.gas_oracle
+
+    @property
+    def tx_pipeline(self):
+        return self.context.tx_pipeline
 
     def load_orders(self):
-        """Load pending orders from file"""
+        """Load orders from the last snapshot and replay the journal on top"""
         try:
-            if os.path.exists(self.orders_file):
-                with open(self.orders_file, 'r') as f:
-                    return json.load(f)
-            return []
+            return self.journal.load()
         except Exception as e:
             print(f"⚠️ Error loading orders:  {e}")
             return []
 
-    def save_orders(self):
-        """Save orders to file"""
+    def save_orders(self, *changed_orders):
+        """
+        Persist order changes: one journal line per changed order.
+        With no arguments, write a full snapshot instead.
+        """
         try:
-            with open(self.orders_file, 'w') as f:
-                json.dump(self.orders, f, indent=2)
+            with self.lock:
+                if not changed_orders:
+                    self.journal.compact(self.orders)
+                    return
+                for order in changed_orders:
+                    self.journal.record(order, self.orders)
         except Exception as e:
             print(f"⚠️ Error saving orders: {e}")
 
-    def get_bnb_price(self):
-        """Get current BNB/USD price using V3 0.05% pool (most accurate)"""
-        try:
-            # Method 1: Use V3 0.05% pool (actual swap price)
-            try:
-                one_bnb_wei = int(1 * 1e18)
-
-                # Import the quoter from mv5
-                from mv5 import quoter_v2_contract, WBNB, USDT_CONTRACT
-
-                params = {
-                    'tokenIn': self.web3.to_checksum_address(WBNB),
-                    'tokenOut': self.web3.to_checksum_address(USDT_CONTRACT),
-                    'amountIn': one_bnb_wei,
-                    'fee': 500,  # 0.05% fee pool (most accurate)
-                    'sqrtPriceLimitX96': 0
-                }
-
-                result = quoter_v2_contract.functions.quoteExactInputSingle(params).call()
-                usdt_out = result[0] / 1e18
-
-                # This is the ACTUAL BNB price from V3 pool
-                return float(usdt_out)
-
-            except Exception as e:
-                print(f"⚠️ V3 price check failed: {e}")
-
-                # Fallback to Chainlink oracle
-                latest_data = self.chainlink.functions.latestRoundData().call()
-                price = latest_data[1] / 1e8
-                print(f"⚠️ Using Chainlink fallback: ${price:.2f}")
-                return float(price)
+    def add_order(self, order):
+        """Give a new order the next id, store it, index it if pending and persist. Returns the id."""
+        with self.lock:
+            order['id'] = self.next_order_id
+            self.next_order_id += 1
+            self.orders.append(order)
+            self.orders_by_id[order['id']] = order
+            self.trigger_index.add(order)
+            self.save_orders(order)
+            return order['id']
 
-        except Exception as e:
-            print(f"⚠️ Error getting BNB price: {e}")
+    def get_bnb_price(self):
+        """Get current BNB/USD price using V3 0.05% pool (Chainlink fallback), cached per block"""
+        price = self.price_oracle.get_price()
+        if price is None:
+            print(f"⚠️ Error getting BNB price: no price source available")
             return None
+        return float(price)
 
-    def get_locked_balances(self, wallet_address):
-        """Calculate BNB and USDT locked in PENDING orders only"""
+    def get_all_locked_balances(self):
+        """BNB and USDT locked in PENDING orders for every wallet, in one pass"""
+        locked = {}
         try:
-            from web3 import Web3
-            wallet_address = Web3.to_checksum_address(wallet_address)
-
-            locked_bnb = 0
-            locked_usdt = 0
-
             for order in self.orders:
-                # Only count PENDING orders (not waiting_for_execution, executed, or cancelled)
-                if order['status'] != 'pending':
+                # Only count PENDING / EXECUTING orders (not waiting_for_execution, executed, or cancelled)
+                if order['status'] not in ('pending', 'executing'):
                     continue
 
-                # Check if this order belongs to this wallet
-                order_wallet = Web3.to_checksum_address(order['wallet_address'])
-                if order_wallet != wallet_address:
-                    continue
+                order_wallet = to_checksum_address(order['wallet_address'])
+                locked_bnb, locked_usdt = locked.get(order_wallet, (0, 0))
 
                 # Add to locked balance based on swap direction
                 if order['swap_direction'] == 'bnb_to_usdt':
@@ -99,7 +115,19 @@ class LimitOrderManager:
                 elif order['swap_direction'] == 'usdt_to_bnb':
                     locked_usdt += order['amount']
 
-            return locked_bnb, locked_usdt
+                locked[order_wallet] = (locked_bnb, locked_usdt)
+
+            return locked
+
+        except Exception as e:
+            print(f"⚠️ Error calculating locked balances: {e}")
+            return {}
+
+    def get_locked_balances(self, wallet_address):
+        """Calculate BNB and USDT locked in PENDING orders only"""
+        try:
+            wallet_address = to_checksum_address(wallet_address)
+            return self.get_all_locked_balances().get(wallet_address, (0, 0))
 
         except Exception as e:
             print(f"⚠️ Error calculating locked balances: {e}")
@@ -304,10 +332,7 @@ class LimitOrderManager:
                 return False
 
             # Create the order (save locally)
-            order_id = len(self.orders) + 1
-
             order = {
-                'id': order_id,
                 'wallet_idx': wallet_idx,
                 'wallet_name': wallet['name'],
                 'wallet_address': wallet_address,
@@ -322,8 +347,7 @@ class LimitOrderManager:
                 'status': 'pending'
             }
 
-            self.orders.append(order)
-            self.save_orders()
+            order_id = self.add_order(order)
 
             print(f"\n✅ LIMIT ORDER #{order_id} CREATED!")
             print(f"⚡ Monitoring in background...")
@@ -361,10 +385,7 @@ class LimitOrderManager:
                 receive_label = f"~{expected_receive:.2f} USDT"
 
             # Create the order
-            order_id = len(self.orders) + 1
-
             order = {
-                'id': order_id,
                 'wallet_idx': wallet_idx,
                 'wallet_name': wallet_name,
                 'wallet_address': wallet_address,
@@ -379,8 +400,7 @@ class LimitOrderManager:
                 'status':  'pending'
             }
 
-            self.orders.append(order)
-            self.save_orders()
+            order_id = self.add_order(order)
 
             print(f"✅ LIMIT ORDER #{order_id} CREATED!")
             print(f"⚡ Monitoring in background...")
@@ -441,48 +461,53 @@ class LimitOrderManager:
     def cancel_order(self, order_id):
         """Cancel a pending order by ID and any related take-profit orders"""
         try:
-            cancelled_orders = []
+            with self.lock:
+                cancelled_orders = []
 
-            # Find and cancel the main order
-            main_order = None
-            for order in self.orders:
-                if order['id'] == order_id:
-                    if order['status'] not in ['pending', 'waiting_for_execution']:
-                        print(f"❌ Order #{order_id} cannot be cancelled (Status: {order['status']})")
-                        return False
-
-                    main_order = order
-                    order['status'] = 'cancelled'
-                    order['cancelled_at'] = datetime.now().isoformat()
-                    cancelled_orders.append(order_id)
-                    break
-
-            if not main_order:
-                print(f"❌ Order #{order_id} not found")
-                return False
+                # Find and cancel the main order
+                main_order = None
+                for order in self.orders:
+                    if order['id'] == order_id:
+                        # 'executing' is only cancellable once no swap of ours is in flight (e.g. after a restart)
+                        if order['status'] not in ['pending', 'waiting_for_execution', 'executing'] or \
+                                order_id in self.in_flight:
+                            print(f"❌ Order #{order_id} cannot be cancelled (Status: {order['status']})")
+                            return False
+
+                        main_order = order
+                        order['status'] = 'cancelled'
+                        order['cancelled_at'] = datetime.now().isoformat()
+                        self.trigger_index.remove(order_id)
+                        cancelled_orders.append(order_id)
+                        break
+
+                if not main_order:
+                    print(f"❌ Order #{order_id} not found")
+                    return False
 
-            # Check if this order has any linked take-profit orders
-            for order in self.orders:
-                if (order.get('linked_order_id') == order_id and
-                        order['status'] == 'waiting_for_execution'):
-                    order['status'] = 'cancelled'
-                    order['cancelled_at'] = datetime.now().isoformat()
-                    order['cancelled_reason'] = f"Parent order #{order_id} was cancelled"
-                    cancelled_orders.append(order['id'])
+                # Check if this order has any linked take-profit orders
+                for order in self.orders:
+                    if (order.get('linked_order_id') == order_id and
+                            order['status'] == 'waiting_for_execution'):
+                        order['status'] = 'cancelled'
+                        order['cancelled_at'] = datetime.now().isoformat()
+                        order['cancelled_reason'] = f"Parent order #{order_id} was cancelled"
+                        self.trigger_index.remove(order['id'])
+                        cancelled_orders.append(order['id'])
 
-                    print(f"🔗 Also cancelled linked TP order #{order['id']}")
+                        print(f"🔗 Also cancelled linked TP order #{order['id']}")
 
-            # Check if this order IS a take-profit order linked to another order
-            if main_order.get('linked_order_id'):
-                parent_id = main_order.get('linked_order_id')
-                print(f"⚠️ This was a take-profit order linked to Order #{parent_id}")
+                # Check if this order IS a take-profit order linked to another order
+                if main_order.get('linked_order_id'):
+                    parent_id = main_order.get('linked_order_id')
+                    print(f"⚠️ This was a take-profit order linked to Order #{parent_id}")
 
-                # Check if parent is still pending
-                for order in self.orders:
-                    if order['id'] == parent_id and order['status'] == 'pending':
-                        print(f"ℹ️ Parent Order #{parent_id} is still active")
+                    # Check if parent is still pending
+                    for order in self.orders:
+                        if order['id'] == parent_id and order['status'] == 'pending':
+                            print(f"ℹ️ Parent Order #{parent_id} is still active")
 
-            self.save_orders()
+                self.save_orders(*[self.orders_by_id[cancelled_id] for cancelled_id in cancelled_orders])
 
             # Send notifications
             for cancelled_id in cancelled_orders:
@@ -503,117 +528,6 @@ class LimitOrderManager:
             traceback.print_exc()
             return False
 
-    def execute_swap(self, wallet, swap_direction, amount):
-        """
-        Execute swap using V3 0. 05% pool (Smart Router)
-        Auto-unwraps WBNB to native BNB for USDT→BNB swaps
-        """
-        try:
-            wallet_address = Web3.to_checksum_address(wallet['address'])
-            private_key = wallet['private_key']
-
-            if swap_direction == 'usdt_to_bnb':
-                # Execute V3 swap (USDT → WBNB)
-                print(f"💱 Swapping {amount:.2f} USDT → BNB...")
-                swap_success = self.swap_manager._swap_usdt_to_bnb_v3(wallet_address, private_key, amount)
-
-                if not swap_success:
-                    print("❌ Swap failed!")
-                    return False
-
-                # ✅ AUTO-UNWRAP WBNB → BNB
-                print("🔄 Checking for WBNB to unwrap...")
-
-                try:
-                    # WBNB contract ABIs
-                    wbnb_balance_abi = [
-                        {
-                            "constant": True,
-                            "inputs": [{"name": "_owner", "type": "address"}],
-                            "name": "balanceOf",
-                            "outputs": [{"name": "balance", "type": "uint256"}],
-                            "type": "function"
-                        }
-                    ]
-
-                    wbnb_withdraw_abi = [
-                        {
-                            "constant": False,
-                            "inputs": [{"name": "wad", "type": "uint256"}],
-                            "name": "withdraw",
-                            "outputs": [],
-                            "stateMutability": "nonpayable",
-                            "type": "function"
-                        }
-                    ]
-
-                    # Get WBNB balance
-                    wbnb_contract_balance = self.web3.eth.contract(
-                        address=Web3.to_checksum_address(self.wbnb),
-                        abi=wbnb_balance_abi
-                    )
-
-                    wbnb_balance = wbnb_contract_balance.functions.balanceOf(wallet_address).call()
-
-                    if wbnb_balance > 0:
-                        wbnb_balance_human = wbnb_balance / 1e18
-                        print(f"🔄 Unwrapping {wbnb_balance_human:.6f} WBNB → BNB...")
-
-                        # Unwrap WBNB
-                        wbnb_contract = self.web3.eth.contract(
-                            address=Web3.to_checksum_address(self.wbnb),
-                            abi=wbnb_withdraw_abi
-                        )
-
-                        nonce = self.web3.eth.get_transaction_count(wallet_address)
-
-                        unwrap_tx = wbnb_contract.functions.withdraw(wbnb_balance).build_transaction({
-                            'from': wallet_address,
-                            'gas': 50000,
-                            'gasPrice': self.web3.to_wei('3', 'gwei'),
-                            'nonce': nonce,
-                            'chainId': 56,
-                            'value': 0
-                        })
-
-                        signed_tx = self.web3.eth.account.sign_transaction(unwrap_tx, private_key)
-                        tx_hash = self.web3.eth.send_raw_transaction(signed_tx.raw_transaction)
-
-                        print(f"⏳ Unwrap TX: {self.web3.to_hex(tx_hash)}")
-                        receipt = self.web3.eth.wait_for_transaction_receipt(tx_hash)
-
-                        if receipt.status == 1:
-                            print(f"✅ Unwrapped {wbnb_balance_human:.6f} WBNB → BNB")
-                            print(f"🔗 TX:  https://bscscan.com/tx/{self.web3.to_hex(tx_hash)}")
-                        else:
-                            print(f"⚠️ Unwrap failed, but you have WBNB in wallet")
-                            print(f"💡 Use /unwrap command to manually unwrap")
-                    else:
-                        print("✅ No WBNB to unwrap (swap already gave native BNB)")
-
-                except Exception as unwrap_error:
-                    print(f"⚠️ Unwrap error: {unwrap_error}")
-                    print(f"💡 You may have WBNB in wallet - use /unwrap command")
-                    import traceback
-                    traceback.print_exc()
-
-                return True
-
-            elif swap_direction == 'bnb_to_usdt':
-                # BNB → USDT (no unwrapping needed)
-                print(f"💱 Swapping {amount:.6f} BNB → USDT...")
-                return self.swap_manager._swap_bnb_to_usdt_v3(wallet_address, private_key, amount)
-
-            else:
-                print(f"❌ Unknown swap direction: {swap_direction}")
-                return False
-
-        except Exception as e:
-            print(f"❌ Swap error: {e}")
-            import traceback
-            traceback.print_exc()
-            return False
-
     def check_and_execute_orders(self):
         """Background:  Check prices and execute orders when triggered"""
         try:
@@ -621,25 +535,22 @@ class LimitOrderManager:
             if not current_price:
                 return
 
-            pending_orders = [o for o in self.orders if o['status'] == 'pending']
-
-            for order in pending_orders:
-                trigger_price = order['trigger_price']
-                swap_direction = order['swap_direction']
-
-                # Check if order should trigger
-                should_execute = False
-
-                if swap_direction == 'bnb_to_usdt':
-                    # Selling BNB - execute when price reaches or exceeds target
-                    if current_price >= trigger_price:
-                        should_execute = True
-                else:
-                    # Buying BNB - execute when price drops to or below target
-                    if current_price <= trigger_price:
-                        should_execute = True
+            # Only orders whose trigger was crossed come out of the index
+            for order_id in self.trigger_index.pop_triggered(current_price):
+                with self.lock:
+                    order = self.orders_by_id.get(order_id)
+                    if not order or order['status'] != 'pending':
+                        continue
+                    # Can't be cancelled (or triggered again) while its swap is out
+                    order['status'] = 'executing'
+                    self.in_flight.add(order_id)
+                    self.save_orders(order)
+
+                # Popped ids are out of the index: put the order back if anything fails
+                try:
+                    trigger_price = order['trigger_price']
+                    swap_direction = order['swap_direction']
 
-                if should_execute:
                     print(f"\n🎯 ORDER #{order['id']} TRIGGERED!")
                     print(f"📊 Target:  ${trigger_price:.2f} | Current: ${current_price:.2f}")
                     print(f"⚡ Executing swap...")
@@ -647,29 +558,62 @@ class LimitOrderManager:
                     # Get wallet
                     wallet = self.wallet_manager.wallets[order['wallet_idx']]
 
-                    # Execute the swap
-                    success = self.swap_manager.execute_swap(
+                    # Send the swap; the order is settled when the pipeline sees it mined,
+                    # so this loop keeps watching prices meanwhile
+                    swap = self.swap_manager.execute_swap(
                         wallet=wallet,
                         swap_direction=swap_direction,
-                        amount=order['amount']
+                        amount=order['amount'],
+                        gas_tier='fast',  # triggered orders race the price
+                        wait=False
+                    )
+                    swap.add_done_callback(
+                        lambda future, order=order, price=current_price: self._settle_order(order, price, future)
                     )
+                except Exception as e:
+                    print(f"⚠️ Order #{order_id} could not be executed: {e}")
+                    self._reset_order(order)
 
-                    if success:
-                        order['status'] = 'executed'
-                        order['executed_at'] = datetime.now().isoformat()
-                        order['execution_price'] = current_price
-                        self.save_orders()
+        except Exception as e:
+            print(f"⚠️ Error checking orders:  {e}")
 
-                        print(f"✅ Order #{order['id']} executed successfully!")
-                        self.send_telegram_notification(order, "executed")
+    def _settle_order(self, order, execution_price, swap_future):
+        """Order state transition once its swap is mined (runs on a TX pipeline callback thread)"""
+        try:
+            success = swap_future.result()
+        except Exception as e:
+            print(f"⚠️ Order #{order['id']} swap error: {e}")
+            success = False
+
+        if not success:
+            print(f"❌ Order #{order['id']} execution failed!")
+            # Keep order pending to retry on the next tick
+            self._reset_order(order)
+            return
+
+        with self.lock:
+            self.in_flight.discard(order['id'])
+            if order['status'] != 'executing':
+                print(f"⚠️ Order #{order['id']} swap mined but the order is {order['status']}, leaving it")
+                return
+            order['status'] = 'executed'
+            order['executed_at'] = datetime.now().isoformat()
+            order['execution_price'] = execution_price
+            self.save_orders(order)
 
-                        self.check_and_create_take_profit(order)
-                    else:
-                        print(f"❌ Order #{order['id']} execution failed!")
-                        # Keep order pending to retry
+        print(f"✅ Order #{order['id']} executed successfully!")
+        self.send_telegram_notification(order, "executed")
 
-        except Exception as e:
-            print(f"⚠️ Error checking orders:  {e}")
+        self.check_and_create_take_profit(order)
+
+    def _reset_order(self, order):
+        """Back to pending (and into the trigger index) after a swap that didn't go through"""
+        with self.lock:
+            self.in_flight.discard(order['id'])
+            if order['status'] == 'executing':
+                order['status'] = 'pending'
+                self.save_orders(order)
+            self.trigger_index.add(order)
 
     def send_telegram_notification(self, order, status):
         """Send Telegram notification"""
@@ -739,61 +683,66 @@ class LimitOrderManager:
     def check_and_create_take_profit(self, executed_order):
         """Check if there are pending take-profit orders for this executed order"""
         try:
-            # Look for take-profit orders waiting for this order
-            for tp_order in self.orders:
-                if (tp_order.get('status') == 'waiting_for_execution' and
-                        tp_order.get('linked_order_id') == executed_order['id']):
-
-                    print(f"\n🎯 Creating take-profit order for #{executed_order['id']}...")
-
-                    # Get the actual execution details
-                    executed_price = executed_order.get('execution_price', executed_order['trigger_price'])
-
-                    # Recalculate based on actual execution
-                    profit_target = tp_order['profit_target_usdt']
-
-                    if executed_order['swap_direction'] == 'bnb_to_usdt':
-                        # Original:  BNB → USDT, so take-profit is USDT → BNB
-                        bnb_amount = executed_order['amount']
-                        usdt_received = bnb_amount * executed_price * 0.9995  # Account for slippage
-                        usdt_to_swap = usdt_received - profit_target
-
-                        # Calculate target price with 0.05% slippage buffer
-                        target_price = (usdt_to_swap / bnb_amount) * 0.9995
-
-                        # Update the pending order
-                        tp_order['trigger_price'] = target_price
-                        tp_order['amount'] = usdt_to_swap
-                        tp_order['amount_label'] = f"{usdt_to_swap:.2f} USDT"
-                        tp_order['expected_receive'] = bnb_amount
-                        tp_order['receive_label'] = f"~{bnb_amount:.6f} BNB"
-                        tp_order['status'] = 'pending'
-                        tp_order['current_price_at_creation'] = self.get_bnb_price()
-
-                    else:
-                        # Original: USDT → BNB, so take-profit is BNB → USDT
-                        usdt_spent = executed_order['amount']
-                        bnb_received = executed_order['expected_receive']
-                        target_usdt = usdt_spent + profit_target
-
-                        # Calculate target price with 0.05% slippage buffer
-                        target_price = (target_usdt / bnb_received) * 1.0005
-
-                        # Update the pending order
-                        tp_order['trigger_price'] = target_price
-                        tp_order['amount'] = bnb_received
-                        tp_order['amount_label'] = f"{bnb_received:.6f} BNB"
-                        tp_order['expected_receive'] = target_usdt
-                        tp_order['receive_label'] = f"~{target_usdt:.2f} USDT"
-                        tp_order['status'] = 'pending'
-                        tp_order['current_price_at_creation'] = self.get_bnb_price()
-
-                    self.save_orders()
-
-                    print(f"✅ Take-profit order #{tp_order['id']} is now ACTIVE!")
-
-                    # Send notification
-                    self.send_telegram_notification(tp_order, "take_profit_activated")
+            current_price = self.get_bnb_price()
+            activated = []
+            with self.lock:
+                # Look for take-profit orders waiting for this order
+                for tp_order in self.orders:
+                    if (tp_order.get('status') == 'waiting_for_execution' and
+                            tp_order.get('linked_order_id') == executed_order['id']):
+
+                        print(f"\n🎯 Creating take-profit order for #{executed_order['id']}...")
+
+                        # Get the actual execution details
+                        executed_price = executed_order.get('execution_price', executed_order['trigger_price'])
+
+                        # Recalculate based on actual execution
+                        profit_target = tp_order['profit_target_usdt']
+
+                        if executed_order['swap_direction'] == 'bnb_to_usdt':
+                            # Original:  BNB → USDT, so take-profit is USDT → BNB
+                            bnb_amount = executed_order['amount']
+                            usdt_received = bnb_amount * executed_price * 0.9995  # Account for slippage
+                            usdt_to_swap = usdt_received - profit_target
+
+                            # Calculate target price with 0.05% slippage buffer
+                            target_price = (usdt_to_swap / bnb_amount) * 0.9995
+
+                            # Update the pending order
+                            tp_order['trigger_price'] = target_price
+                            tp_order['amount'] = usdt_to_swap
+                            tp_order['amount_label'] = f"{usdt_to_swap:.2f} USDT"
+                            tp_order['expected_receive'] = bnb_amount
+                            tp_order['receive_label'] = f"~{bnb_amount:.6f} BNB"
+                            tp_order['status'] = 'pending'
+                            tp_order['current_price_at_creation'] = current_price
+
+                        else:
+                            # Original: USDT → BNB, so take-profit is BNB → USDT
+                            usdt_spent = executed_order['amount']
+                            bnb_received = executed_order['expected_receive']
+                            target_usdt = usdt_spent + profit_target
+
+                            # Calculate target price with 0.05% slippage buffer
+                            target_price = (target_usdt / bnb_received) * 1.0005
+
+                            # Update the pending order
+                            tp_order['trigger_price'] = target_price
+                            tp_order['amount'] = bnb_received
+                            tp_order['amount_label'] = f"{bnb_received:.6f} BNB"
+                            tp_order['expected_receive'] = target_usdt
+                            tp_order['receive_label'] = f"~{target_usdt:.2f} USDT"
+                            tp_order['status'] = 'pending'
+                            tp_order['current_price_at_creation'] = current_price
+
+                        self.trigger_index.add(tp_order)
+                        self.save_orders(tp_order)
+
+                        print(f"✅ Take-profit order #{tp_order['id']} is now ACTIVE!")
+                        activated.append(tp_order)
+
+            for tp_order in activated:
+                self.send_telegram_notification(tp_order, "take_profit_activated")
 
         except Exception as e:
             print(f"⚠️ Error creating take-profit:  {e}")
@@ -0,0 +1,126 @@
+import asyncio
+import threading
+import time
+
+from eth_utils import event_signature_to_log_topic
+from web3 import AsyncWeb3, Web3
+from web3.middleware import ExtraDataToPOAMiddleware
+from web3.providers.persistent import WebSocketProvider
+
+from bet_stream import BET_BULL_TOPIC, BET_BEAR_TOPIC, _as_bytes
+
+LOCK_ROUND_TOPIC = event_signature_to_log_topic("LockRound(uint256,uint256,int256)")
+END_ROUND_TOPIC = event_signature_to_log_topic("EndRound(uint256,uint256,int256)")
+
+
+def _topic_hex(topic):
+    return "0x" + _as_bytes(topic).hex()
+
+
+class LiveRoundStream:
+    """
+    eth_subscribe feed of the prediction contract (newHeads + contract logs).
+    Runs its own asyncio loop in a daemon thread and pushes BetBull/BetBear
+    logs into a BetStream as they arrive, so the viewer sees the whole round
+    without polling. LockRound/EndRound prices are kept per epoch.
+    Reconnects (and resubscribes) on its own if the socket drops.
+    """
+
+    def __init__(self, ws_url, contract_address, bet_stream, reconnect_delay=3):
+        self.ws_url = ws_url
+        self.contract_address = Web3.to_checksum_address(contract_address)
+        self.bet_stream = bet_stream
+        self.reconnect_delay = reconnect_delay
+        self.latest_block = None
+        self.latest_block_ts = None
+        self.lock_prices = {}  # epoch -> lock price (USD)
+        self.close_prices = {}  # epoch -> close price (USD)
+        self.bets_received = 0
+        self.subscribed = threading.Event()
+        self.round_locked = threading.Event()  # set on every LockRound (= a new round started)
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=lambda: asyncio.run(self._run_forever()), daemon=True)
+        self.thread.start()
+        return self
+
+    def wait_until_subscribed(self, timeout=10):
+        return self.subscribed.wait(timeout)
+
+    @property
+    def connected(self):
+        return self.subscribed.is_set()
+
+    async def _run_forever(self):
+        while True:
+            try:
+                await self._run()
+            except Exception as e:
+                print(f"\n⚠️ WebSocket stream error: {e}")
+            self.subscribed.clear()
+            await asyncio.sleep(self.reconnect_delay)
+
+    async def _run(self):
+        async with AsyncWeb3(WebSocketProvider(self.ws_url)) as w3:
+            w3.middleware_onion.inject(ExtraDataToPOAMiddleware, layer=0)
+            heads_id = await w3.eth.subscribe('newHeads')
+            logs_id = await w3.eth.subscribe('logs', {
+                'address': self.contract_address,
+                'topics': [[_topic_hex(BET_BULL_TOPIC), _topic_hex(BET_BEAR_TOPIC),
+                            _topic_hex(LOCK_ROUND_TOPIC), _topic_hex(END_ROUND_TOPIC)]]
+            })
+            self.subscribed.set()
+
+            async for message in w3.socket.process_subscriptions():
+                if message['subscription'] == heads_id:
+                    self._on_head(message['result'])
+                elif message['subscription'] == logs_id:
+                    self._on_log(message['result'])
+
+    def _on_head(self, head):
+        self.latest_block = int(head['number'])
+        self.latest_block_ts = int(head['timestamp'])
+
+    def _on_log(self, log):
+        # Reorged-out log: skip it (bets are de-duplicated by tx hash + log index anyway)
+        if log.get('removed'):
+            return
+
+        topic = _as_bytes(log['topics'][0])
+        if topic in (_as_bytes(BET_BULL_TOPIC), _as_bytes(BET_BEAR_TOPIC)):
+            self.bet_stream.ingest(log)
+            self.bets_received += 1
+            return
+
+        # LockRound/EndRound(uint256 indexed epoch, uint256 indexed roundId, int256 price)
+        epoch = int.from_bytes(_as_bytes(log['topics'][1]), 'big')
+        price = int.from_bytes(_as_bytes(log['data']), 'big', signed=True) / 1e8
+        if topic == _as_bytes(LOCK_ROUND_TOPIC):
+            self.lock_prices[epoch] = price
+            self.round_locked.set()
+        elif topic == _as_bytes(END_ROUND_TOPIC):
+            self.close_prices[epoch] = price
+
+
+if __name__ == "__main__":
+    # Quick check against a node (or ws_stub_node.py): python live_stream.py ws://127.0.0.1:8546
+    import sys
+    from bet_stream import BetStream
+
+    url = sys.argv[1] if len(sys.argv) > 1 else "ws://127.0.0.1:8546"
+    contract = sys.argv[2] if len(sys.argv) > 2 else "0x18B2A687610328590Bc8F2e5fEdDe3b582A49cdA"
+    stream = LiveRoundStream(url, contract, BetStream(None, contract)).start()
+    if not stream.wait_until_subscribed():
+        raise SystemExit(f"❌ Could not subscribe on {url}")
+    print(f"✅ Subscribed on {url}")
+
+    while True:
+        time.sleep(1)
+        epochs = sorted(stream.bet_stream.epochs)
+        if not epochs:
+            continue
+        bets = stream.bet_stream.get(epochs[-1]).summary()
+        print(f"🧱 {stream.latest_block} | Epoch {epochs[-1]} | Bull {bets['bull_amount']:.3f} | "
+              f"Bear {bets['bear_amount']:.3f} | Bets {len(bets['all_bets'])} | "
+              f"Locks {len(stream.lock_prices)} | Ends {len(stream.close_prices)}")
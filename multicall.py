@@ -0,0 +1,129 @@
+from eth_utils.abi import get_abi_input_types, get_abi_output_types
+from web3 import Web3
+from web3.utils.abi import get_abi_element_info
+
+# Multicall3 is deployed at the same address on every EVM chain (incl. BSC)
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+MULTICALL3_ABI = [
+    {
+        "inputs": [
+            {
+                "components": [
+                    {"internalType": "address", "name": "target", "type": "address"},
+                    {"internalType": "bool", "name": "allowFailure", "type": "bool"},
+                    {"internalType": "bytes", "name": "callData", "type": "bytes"}
+                ],
+                "internalType": "struct Multicall3.Call3[]",
+                "name": "calls",
+                "type": "tuple[]"
+            }
+        ],
+        "name": "aggregate3",
+        "outputs": [
+            {
+                "components": [
+                    {"internalType": "bool", "name": "success", "type": "bool"},
+                    {"internalType": "bytes", "name": "returnData", "type": "bytes"}
+                ],
+                "internalType": "struct Multicall3.Result[]",
+                "name": "returnData",
+                "type": "tuple[]"
+            }
+        ],
+        "stateMutability": "payable",
+        "type": "function"
+    },
+    {
+        "inputs": [{"internalType": "address", "name": "addr", "type": "address"}],
+        "name": "getEthBalance",
+        "outputs": [{"internalType": "uint256", "name": "balance", "type": "uint256"}],
+        "stateMutability": "view",
+        "type": "function"
+    },
+    {
+        "inputs": [],
+        "name": "getBlockNumber",
+        "outputs": [{"internalType": "uint256", "name": "blockNumber", "type": "uint256"}],
+        "stateMutability": "view",
+        "type": "function"
+    }
+]
+
+
+class Multicall:
+    """Batch read-only contract calls into Multicall3 aggregate3 eth_calls"""
+
+    def __init__(self, web3, batch_size=500):
+        self.web3 = web3
+        self.batch_size = batch_size
+        self.contract = web3.eth.contract(
+            address=Web3.to_checksum_address(MULTICALL3_ADDRESS),
+            abi=MULTICALL3_ABI
+        )
+
+    def eth_balance(self, address):
+        """Native BNB balance as a call that can go into a batch"""
+        return self.contract.functions.getEthBalance(Web3.to_checksum_address(address))
+
+    def aggregate(self, calls, block_identifier=None):
+        """
+        Run bound contract calls (e.g. usdt_contract.functions.balanceOf(addr))
+        through aggregate3, every chunk pinned to the same block.
+
+        Returns (block_number, results). results[i] is decoded like .call()
+        would decode it, or None if that call reverted.
+        If block_identifier is None the first chunk also reads the block number
+        and the remaining chunks are pinned to it.
+        """
+        calls = list(calls)
+        results = []
+        block_number = block_identifier
+
+        if not calls and block_number is not None:
+            return block_number, results
+
+        for start in range(0, max(len(calls), 1), self.batch_size):
+            chunk = calls[start:start + self.batch_size]
+            read_block = block_number is None
+
+            if read_block:
+                chunk = [self.contract.functions.getBlockNumber()] + chunk
+
+            payload = [
+                (call.address, True, self._encode(call))
+                for call in chunk
+            ]
+            raw = self.contract.functions.aggregate3(payload).call(
+                block_identifier=block_number if block_number is not None else 'latest'
+            )
+            decoded = [self._decode(call, success, data) for call, (success, data) in zip(chunk, raw)]
+
+            if read_block:
+                block_number = decoded.pop(0)
+
+            results.extend(decoded)
+
+        return block_number, results
+
+    def _encode(self, call):
+        # Normalise args the way .call() does (struct params may be given as dicts)
+        element_info = get_abi_element_info(
+            [call.abi],
+            call.abi_element_identifier,
+            *call.args,
+            abi_codec=self.web3.codec,
+            **call.kwargs
+        )
+        encoded = self.web3.codec.encode(get_abi_input_types(call.abi), element_info['arguments'])
+        return bytes.fromhex(element_info['selector'][2:]) + encoded
+
+    def _decode(self, call, success, data):
+        if not success or not data:
+            return None
+        try:
+            output_types = get_abi_output_types(call.abi)
+            values = self.web3.codec.decode(output_types, data)
+            return values[0] if len(values) == 1 else list(values)
+        except Exception:
+            return None
@@ -3,17 +3,18 @@ import os
 import time
 import secrets
 from datetime import datetime
-from web3 import Web3
-from web3.middleware import ExtraDataToPOAMiddleware
-from eth_account import Account
+from eth_utils import to_checksum_address
 from dotenv import load_dotenv, find_dotenv
 from decimal import Decimal
+from context import ChainContext
 from limit_orders import LimitOrderManager
+import sys
 import requests
 import threading
-import requests
-import pandas as pd
-from ta.volatility import AverageTrueRange
+
+# Running as a script: make lazy `from mv5 import ...` in other modules reuse this module's singletons
+if __name__ == "__main__":
+    sys.modules.setdefault("mv5", sys.modules[__name__])
 
 # === Config ===
 load_dotenv(find_dotenv())
@@ -21,18 +22,45 @@ load_dotenv(find_dotenv())
 MAIN_PRIVATE_KEY = os.getenv("MAIN_PRIVATE_KEY")
 MAIN_WALLET_ADDRESS = os.getenv("MAIN_WALLET_ADDRESS")
 
+# USDT approvals: "max" (approve once) or N (approve enough for N more swaps of that size)
+APPROVAL_POLICY = os.getenv("APPROVAL_POLICY", "max")
+
+# Recorded QuoterV2 results (python v3_pool.py --record); the local V3 math prices
+# limit orders only once it reproduces them
+V3_FIXTURES = os.getenv("V3_FIXTURES", "v3_fixtures.json")
+
 PREDICTION_CONTRACT = "0x18B2A687610328590Bc8F2e5fEdDe3b582A49cdA"
 USDT_CONTRACT = "0x55d398326f99059fF775485246999027B3197955"
 PANCAKE_ROUTER = "0x10ED43C718714eb63d5aA57B78B54704E256024E"
 
-web3 = Web3(Web3.HTTPProvider("https://bsc-mainnet.nodereal.io/v1/a16acfa17ef245b7973338fef461c447"))
-web3.middleware_onion.inject(ExtraDataToPOAMiddleware, layer=0)
+BSC_RPC_URL = "https://bsc-mainnet.nodereal.io/v1/a16acfa17ef245b7973338fef461c447"
+
+# Chain client, contracts and services are built on first use (importing mv5 stays offline and fast)
+ctx = ChainContext()
+
+
+def _connect_web3():
+    from web3 import Web3
+    from web3.middleware import ExtraDataToPOAMiddleware
+
+    web3 = Web3(Web3.HTTPProvider(BSC_RPC_URL))
+    web3.middleware_onion.inject(ExtraDataToPOAMiddleware, layer=0)
+    if not web3.is_connected():
+        raise Exception("❌ Failed to connect to BSC")
+    return web3
+
+
+def _load_prediction_abi():
+    with open("prediction_abi.json", "r") as f:
+        return json.load(f)
 
-if not web3.is_connected():
-    raise Exception("❌ Failed to connect to BSC")
 
-with open("prediction_abi.json", "r") as f:
-    PREDICTION_ABI = json.load(f)
+def _contract(address, abi):
+    return lambda: ctx.web3.eth.contract(address=to_checksum_address(address), abi=abi() if callable(abi) else abi)
+
+
+ctx.register('web3', _connect_web3)
+ctx.register('PREDICTION_ABI', _load_prediction_abi)
 
 ERC20_ABI = [
     {
@@ -156,11 +184,7 @@ QUOTER_V2_ABI = [
     }
 ]
 
-# Create QuoterV2 contract instance
-quoter_v2_contract = web3.eth.contract(
-    address=Web3.to_checksum_address(QUOTER_V2_ADDRESS),
-    abi=QUOTER_V2_ABI
-)
+ctx.register('quoter_v2_contract', _contract(QUOTER_V2_ADDRESS, QUOTER_V2_ABI))
 
 # === V3 SMART ROUTER (for executing swaps) ===
 SMART_ROUTER_ADDRESS = "0x13f4EA83D0bd40E75C8222255bc855a974568Dd4"
@@ -241,32 +265,64 @@ SMART_ROUTER_ABI = [
         "outputs": [],
         "stateMutability": "payable",
         "type": "function"
+    },
+    {
+        "inputs": [
+            {"internalType": "uint256", "name": "amountIn", "type": "uint256"},
+            {"internalType": "uint256", "name": "amountOutMin", "type": "uint256"},
+            {"internalType": "address[]", "name": "path", "type": "address[]"},
+            {"internalType": "address", "name": "to", "type": "address"}
+        ],
+        "name": "swapExactTokensForTokens",
+        "outputs": [
+            {"internalType": "uint256", "name": "amountOut", "type": "uint256"}
+        ],
+        "stateMutability": "payable",
+        "type": "function"
+    },
+    {
+        "inputs": [
+            {"internalType": "uint256", "name": "deadline", "type": "uint256"},
+            {"internalType": "bytes[]", "name": "data", "type": "bytes[]"}
+        ],
+        "name": "multicall",
+        "outputs": [
+            {"internalType": "bytes[]", "name": "", "type": "bytes[]"}
+        ],
+        "stateMutability": "payable",
+        "type": "function"
     }
 ]
 
-# Create Smart Router contract instance
-smart_router_contract = web3.eth.contract(
-    address=Web3.to_checksum_address(SMART_ROUTER_ADDRESS),
-    abi=SMART_ROUTER_ABI
-)
-
-prediction_contract = web3.eth.contract(
-    address=Web3.to_checksum_address(PREDICTION_CONTRACT),
-    abi=PREDICTION_ABI
-)
-usdt_contract = web3.eth.contract(
-    address=Web3.to_checksum_address(USDT_CONTRACT),
-    abi=ERC20_ABI
-)
-router_contract = web3.eth.contract(
-    address=Web3.to_checksum_address(PANCAKE_ROUTER),
-    abi=ROUTER_ABI
-)
+ctx.register('smart_router_contract', _contract(SMART_ROUTER_ADDRESS, SMART_ROUTER_ABI))
+ctx.register('prediction_contract', _contract(PREDICTION_CONTRACT, lambda: ctx.PREDICTION_ABI))
+ctx.register('usdt_contract', _contract(USDT_CONTRACT, ERC20_ABI))
+ctx.register('router_contract', _contract(PANCAKE_ROUTER, ROUTER_ABI))
 
 WBNB = "0xbb4CdB9CBd36B01bD1cBaEBF2De08d9173bc095c"
 
+WBNB_ABI = [
+    {
+        "constant": True,
+        "inputs": [{"name": "_owner", "type": "address"}],
+        "name": "balanceOf",
+        "outputs": [{"name": "balance", "type": "uint256"}],
+        "type": "function"
+    },
+    {
+        "constant": False,
+        "inputs": [{"name": "wad", "type": "uint256"}],
+        "name": "withdraw",
+        "outputs": [],
+        "stateMutability": "nonpayable",
+        "type": "function"
+    }
+]
+
+ctx.register('wbnb_contract', _contract(WBNB, WBNB_ABI))
+
 # === Chainlink Price Feed ===
-CHAINLINK_BNB_USD = Web3.to_checksum_address("0x0567F2323251f0Aab15c8dFb1967E4e8A7D42aeE")
+CHAINLINK_BNB_USD = to_checksum_address("0x0567F2323251f0Aab15c8dFb1967E4e8A7D42aeE")
 CHAINLINK_ABI = [
     {
         "inputs": [],
@@ -283,10 +339,114 @@ CHAINLINK_ABI = [
     }
 ]
 
-chainlink_contract = web3.eth.contract(
-    address=CHAINLINK_BNB_USD,
-    abi=CHAINLINK_ABI
-)
+ctx.register('chainlink_contract', _contract(CHAINLINK_BNB_USD, CHAINLINK_ABI))
+
+
+# === Batched reads (Multicall3) ===
+def _multicall():
+    from multicall import Multicall
+    return Multicall(ctx.web3)
+
+
+def _balance_engine():
+    from balance_engine import BalanceEngine
+    return BalanceEngine(ctx.web3, ctx.usdt_contract, WBNB, ctx.multicall)
+
+
+# === Shared BNB/USD price (refreshed once per block) ===
+def _price_oracle():
+    from price_oracle import PriceOracle
+    from v3_pool import verify_fixtures
+    local_math = os.path.exists(V3_FIXTURES) and verify_fixtures(V3_FIXTURES)
+    if not local_math:
+        print(f"ℹ️ {V3_FIXTURES} missing or not matching, pricing with QuoterV2")
+    return PriceOracle(ctx.web3, ctx.quoter_v2_contract, ctx.chainlink_contract, WBNB, USDT_CONTRACT, ctx.multicall,
+                       pool=ctx.v3_pool if local_math else None)
+
+
+# === USDT/WBNB 0.05% pool snapshot per block (quotes computed locally) ===
+def _v3_pool():
+    from v3_pool import V3Pool
+    return V3Pool(ctx.web3, ctx.multicall, USDT_CONTRACT, WBNB, fee=500)
+
+
+# === Best route over the V3 fee tiers and V2 (venues snapshotted per block) ===
+def _swap_router():
+    from router import SwapRouter
+    return SwapRouter(ctx.web3, ctx.multicall, ctx.smart_router_contract, ctx.gas_oracle, USDT_CONTRACT, WBNB, WBNB,
+                      pools={500: ctx.v3_pool}, quoter_contract=ctx.quoter_v2_contract)
+
+
+# === Local nonce tracking (lets one wallet send several txs back-to-back) ===
+def _nonce_manager():
+    from nonce_manager import NonceManager
+    return NonceManager(ctx.web3)
+
+
+# === Send + receipt tracking for every write path (one batched receipt poll per block) ===
+def _tx_pipeline():
+    from tx_pipeline import TxPipeline
+    return TxPipeline(ctx.web3, ctx.nonce_manager)
+
+
+# === USDT allowances per wallet / spender (approve only when it runs out) ===
+def _allowance_cache():
+    from allowance_cache import AllowanceCache
+    return AllowanceCache(ctx.web3, ctx.usdt_contract, ctx.nonce_manager, ctx.gas_oracle, ctx.tx_pipeline,
+                          policy=APPROVAL_POLICY)
+
+
+# === Concurrent batch sends (distribution / drain) ===
+def _fanout():
+    from fanout import TransferFanout
+    return TransferFanout(ctx.web3, ctx.nonce_manager, ctx.tx_pipeline)
+
+
+# === BNB klines + incremental ATR for every interval (answers /atr from memory) ===
+def _atr_engine():
+    from atr_engine import ATREngine
+    return ATREngine()
+
+
+# === Reward scanning (all wallets, all rounds, finalized rounds cached) ===
+def _claim_scanner():
+    from claim_scanner import ClaimScanner
+    return ClaimScanner(ctx.web3, ctx.prediction_contract, ctx.multicall)
+
+
+# === Multi-wallet bets into one round (pre-signed, fired together near lock) ===
+def _bet_burst():
+    from bet_burst import BetBurst
+    return BetBurst(ctx.web3, ctx.prediction_contract, ctx.nonce_manager, ctx.balance_engine, ctx.gas_oracle,
+                    ctx.tx_pipeline)
+
+
+# === Gas prices from fee history (per block) and per-operation gas limits ===
+def _gas_oracle():
+    from gas_oracle import GasOracle
+    return GasOracle(ctx.web3)
+
+
+ctx.register('multicall', _multicall)
+ctx.register('balance_engine', _balance_engine)
+ctx.register('price_oracle', _price_oracle)
+ctx.register('v3_pool', _v3_pool)
+ctx.register('swap_router', _swap_router)
+ctx.register('nonce_manager', _nonce_manager)
+ctx.register('tx_pipeline', _tx_pipeline)
+ctx.register('allowance_cache', _allowance_cache)
+ctx.register('fanout', _fanout)
+ctx.register('atr_engine', _atr_engine)
+ctx.register('claim_scanner', _claim_scanner)
+ctx.register('bet_burst', _bet_burst)
+ctx.register('gas_oracle', _gas_oracle)
+
+
+def __getattr__(name):
+    # Lazy module attributes: `from mv5 import web3` builds ctx.web3 on first use
+    if name in ctx:
+        return getattr(ctx, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # === TELEGRAM BOT FUNCTIONS ===
 
@@ -318,6 +478,7 @@ class WalletManager:
     def create_new_wallet(self, name=None):
         try:
             private_key = "0x" + secrets.token_hex(32)
+            from eth_account import Account
             account = Account.from_key(private_key)
             address = account.address
             if not name:
@@ -343,10 +504,10 @@ class WalletManager:
 
     def get_wallet_balances(self, wallet_info):
         try:
-            address = Web3.to_checksum_address(wallet_info["address"])
-            bnb_balance = web3.eth.get_balance(address)
-            bnb_balance = web3.from_wei(bnb_balance, 'ether')
-            usdt_balance = usdt_contract.functions.balanceOf(address).call()
+            address = to_checksum_address(wallet_info["address"])
+            bnb_balance = ctx.web3.eth.get_balance(address)
+            bnb_balance = ctx.web3.from_wei(bnb_balance, 'ether')
+            usdt_balance = ctx.usdt_contract.functions.balanceOf(address).call()
             usdt_balance = usdt_balance / 1e18
             wallet_info["balance_bnb"] = float(bnb_balance)
             wallet_info["balance_usdt"] = float(usdt_balance)
@@ -355,46 +516,62 @@ class WalletManager:
             print(f"⚠️ Error getting balances: {e}")
             return wallet_info
 
+    def refresh_balances(self, wallets=None):
+        """Refresh balances of many wallets from one Multicall3 snapshot"""
+        if wallets is None:
+            wallets = self.wallets
+        try:
+            snapshot = ctx.balance_engine.snapshot([w['address'] for w in wallets])
+            for wallet in wallets:
+                snapshot.apply_to(wallet)
+                if not snapshot.complete(wallet['address']):
+                    # A failed subcall is not a 0 balance: read this one directly
+                    print(f"⚠️ Batched balance read failed for {wallet['name']}, reading it directly")
+                    self.get_wallet_balances(wallet)
+            return snapshot
+        except Exception as e:
+            print(f"⚠️ Error getting balances: {e}")
+            return None
+
     def list_wallets(self):
         if not self.wallets:
             print("📝 No wallets created yet.")
             return
 
-        # Import limit_order_manager to check locked balances
-        # We'll pass it as parameter instead - see main() changes below
+        # One snapshot for every wallet + one pass over the order book
+        self.refresh_balances()
+        locked_balances = {}
+        if hasattr(self, 'limit_order_manager'):
+            locked_balances = self.limit_order_manager.get_all_locked_balances()
 
         print("\n" + "=" * 80)
         print("📋 CREATED WALLETS")
         print("=" * 80)
         for i, wallet in enumerate(self.wallets):
-            wallet = self.get_wallet_balances(wallet)
             print(f"{i + 1}. {wallet['name']}")
             print(f"   Address: {wallet['address']}")
 
+            locked_bnb, locked_usdt = locked_balances.get(to_checksum_address(wallet['address']), (0, 0))
+
             # Show BNB with available balance
             print(f"   BNB: {wallet['balance_bnb']:.6f}", end="")
-            if hasattr(self, 'limit_order_manager'):
-                locked_bnb, locked_usdt = self.limit_order_manager.get_locked_balances(wallet['address'])
+            if locked_bnb > 0:
                 available_bnb = wallet['balance_bnb'] - locked_bnb
-                if locked_bnb > 0:
-                    print(f" → Available: {available_bnb:.6f} (🔒 {locked_bnb:.6f} locked)")
-                else:
-                    print()
+                print(f" → Available: {available_bnb:.6f} (🔒 {locked_bnb:.6f} locked)")
             else:
                 print()
 
             # Show USDT with available balance
             print(f"   USDT: {wallet['balance_usdt']:.2f}", end="")
-            if hasattr(self, 'limit_order_manager'):
-                locked_bnb, locked_usdt = self.limit_order_manager.get_locked_balances(wallet['address'])
+            if locked_usdt > 0:
                 available_usdt = wallet['balance_usdt'] - locked_usdt
-                if locked_usdt > 0:
-                    print(f" → Available: {available_usdt:.2f} (🔒 {locked_usdt:.2f} locked)")
-                else:
-                    print()
+                print(f" → Available: {available_usdt:.2f} (🔒 {locked_usdt:.2f} locked)")
             else:
                 print()
 
+            if wallet.get('balance_wbnb', 0) > 0:
+                print(f"   WBNB: {wallet['balance_wbnb']:.6f} (use /unwrap)")
+
             print(f"   Created: {wallet['created_at']}")
             print("-" * 80)
 
@@ -426,26 +603,29 @@ class WalletManager:
             wallet = self.wallets[wallet_index]
             wallet = self.get_wallet_balances(wallet)
 
-            wallet_address = Web3.to_checksum_address(wallet['address'])
-            total_balance = web3.eth.get_balance(wallet_address)
-            total_balance_bnb = web3.from_wei(total_balance, 'ether')
+            wallet_address = to_checksum_address(wallet['address'])
+            total_balance = ctx.web3.eth.get_balance(wallet_address)
+            total_balance_bnb = ctx.web3.from_wei(total_balance, 'ether')
 
             # Check minimum balance
             if total_balance_bnb <= 0.0001:
                 print(f"❌ Wallet '{wallet['name']}' has insufficient BNB (need >0.0001 BNB)")
                 return False
 
+            # One gas quote for both the fee kept back and the tx itself
+            gas = ctx.gas_oracle.params('transfer', 'cheap')
+            gas_fee = gas['gas'] * gas['gasPrice']
+
             # Determine amount to send
             if amount is None:
                 # Send ALL (drain mode)
                 print(f"\n💸 Draining wallet:  {wallet['name']}")
                 print(f"💰 Total balance: {total_balance_bnb:.6f} BNB")
 
-                gas_fee = web3.to_wei('0.0001', 'ether')
                 amount_to_send = total_balance - gas_fee
-                amount_bnb = web3.from_wei(amount_to_send, 'ether')
+                amount_bnb = ctx.web3.from_wei(amount_to_send, 'ether')
 
-                print(f"📤 Sending:  {amount_bnb:.6f} BNB (keeping ~0.0001 for gas)")
+                print(f"📤 Sending:  {amount_bnb:.6f} BNB (keeping {ctx.web3.from_wei(gas_fee, 'ether'):.8f} for gas)")
 
             else:
                 # Send SPECIFIC amount
@@ -454,13 +634,12 @@ class WalletManager:
                 print(f"📤 Sending: {amount:.6f} BNB")
 
                 # Validate amount
-                gas_fee = web3.to_wei('0.0001', 'ether')
-                amount_wei = web3.to_wei(amount, 'ether')
+                amount_wei = ctx.web3.to_wei(amount, 'ether')
 
                 if amount_wei + gas_fee > total_balance:
                     print(f"❌ Insufficient balance!")
                     print(f"   Available: {total_balance_bnb:.6f} BNB")
-                    print(f"   Needed: {amount:.6f} BNB + ~0.0001 gas")
+                    print(f"   Needed: {amount:.6f} BNB + {ctx.web3.from_wei(gas_fee, 'ether'):.8f} gas")
                     return False
 
                 amount_to_send = amount_wei
@@ -468,36 +647,31 @@ class WalletManager:
 
             print(f"📧 Sending to: {main_wallet_address}")
 
-            nonce = web3.eth.get_transaction_count(wallet_address)
-
             tx = {
-                'to': Web3.to_checksum_address(main_wallet_address),
+                'to': to_checksum_address(main_wallet_address),
                 'value': amount_to_send,
-                'gas': 21000,
-                'gasPrice': web3.to_wei('3', 'gwei'),
-                'nonce': nonce,
+                **gas,
                 'chainId': 56
             }
 
-            signed_tx = web3.eth.account.sign_transaction(tx, wallet['private_key'])
-            tx_hash = web3.eth.send_raw_transaction(signed_tx.raw_transaction)
+            tx_hash = ctx.nonce_manager.send_transaction(tx, wallet['private_key'])
 
-            print(f"🚀 Transaction sent! TX Hash: {web3.to_hex(tx_hash)}")
+            print(f"🚀 Transaction sent! TX Hash: {ctx.web3.to_hex(tx_hash)}")
             print(f"⏳ Waiting for confirmation...")
 
-            receipt = web3.eth.wait_for_transaction_receipt(tx_hash)
+            receipt = ctx.tx_pipeline.wait(tx_hash)
 
             if receipt.status == 1:
                 mode = "drained" if amount is None else f"sent {amount_bnb:.6f} BNB from"
                 print(f"✅ Wallet {mode} successfully!")
-                print(f"🔗 View on BSCScan: https://bscscan.com/tx/{web3.to_hex(tx_hash)}")
+                print(f"🔗 View on BSCScan: https://bscscan.com/tx/{ctx.web3.to_hex(tx_hash)}")
 
                 message = (
                     f"💸 Wallet {'Drained' if amount is None else 'Transfer'}!\n\n"
                     f"👤 Wallet: {wallet['name']}\n"
                     f"💰 Amount: {amount_bnb:.6f} BNB\n"
                     f"📧 Sent to: Main Wallet\n"
-                    f"🔗 TX: {web3.to_hex(tx_hash)}\n"
+                    f"🔗 TX: {ctx.web3.to_hex(tx_hash)}\n"
                     f"⏰ Time: {datetime.now().strftime('%H:%M:%S')}"
                 )
                 send_telegram_message(message)
@@ -518,9 +692,9 @@ class WalletManager:
             print("=" * 70)
             
             # Get main wallet balance
-            main_address = Web3.to_checksum_address(main_wallet_address)
-            bnb_balance = web3.eth.get_balance(main_address) / 1e18
-            usdt_balance = usdt_contract.functions.balanceOf(main_address).call() / 1e18
+            main_address = to_checksum_address(main_wallet_address)
+            bnb_balance = ctx.web3.eth.get_balance(main_address) / 1e18
+            usdt_balance = ctx.usdt_contract.functions.balanceOf(main_address).call() / 1e18
             
             print(f"\n💰 Main Wallet Balance:")
             print(f"   💎 BNB:   {bnb_balance:.6f}")
@@ -552,7 +726,7 @@ class WalletManager:
             
             # Validate address
             try:
-                recipient_address = Web3.to_checksum_address(recipient_input)
+                recipient_address = to_checksum_address(recipient_input)
             except Exception as e:
                 print(f"❌ Invalid address format: {e}")
                 return False
@@ -625,34 +799,29 @@ class WalletManager:
                 # Send BNB
                 print(f"\n📤 Sending {amount:.6f} BNB...")
                 
-                nonce = web3.eth.get_transaction_count(main_address)
-                
                 tx = {
                     'to': recipient_address,
-                    'value': web3.to_wei(amount, 'ether'),
-                    'gas': 21000,
-                    'gasPrice': web3.to_wei('3', 'gwei'),
-                    'nonce': nonce,
+                    'value': ctx.web3.to_wei(amount, 'ether'),
+                    **ctx.gas_oracle.params('transfer', 'standard'),
                     'chainId': 56
                 }
                 
-                signed_tx = web3.eth.account.sign_transaction(tx, main_private_key)
-                tx_hash = web3.eth. send_raw_transaction(signed_tx.raw_transaction)
+                tx_hash = ctx.nonce_manager.send_transaction(tx, main_private_key)
                 
-                print(f"⏳ TX Hash: {web3.to_hex(tx_hash)}")
+                print(f"⏳ TX Hash: {ctx.web3.to_hex(tx_hash)}")
                 print(f"⏳ Waiting for confirmation...")
                 
-                receipt = web3.eth.wait_for_transaction_receipt(tx_hash)
+                receipt = ctx.tx_pipeline.wait(tx_hash)
                 
                 if receipt.status == 1:
                     print(f"✅ Transfer successful!")
-                    print(f"🔗 View on BSCScan: https://bscscan.com/tx/{web3.to_hex(tx_hash)}")
+                    print(f"🔗 View on BSCScan: https://bscscan.com/tx/{ctx.web3.to_hex(tx_hash)}")
                     
                     message = (
                         f"📤 BNB Transfer Complete!\n\n"
                         f"💰 Amount: {amount:.6f} BNB\n"
                         f"📥 To: {recipient_address[: 10]}... {recipient_address[-6:]}\n"
-                        f"🔗 TX:  {web3.to_hex(tx_hash)}\n"
+                        f"🔗 TX:  {ctx.web3.to_hex(tx_hash)}\n"
                         f"⏰ {datetime.now().strftime('%H:%M:%S')}"
                     )
                     send_telegram_message(message)
@@ -666,36 +835,33 @@ class WalletManager:
                 print(f"\n📤 Sending {amount:.2f} USDT...")
                 
                 amount_wei = int(amount * 1e18)
-                nonce = web3.eth.get_transaction_count(main_address)
-                
-                transfer_tx = usdt_contract.functions.transfer(
+
+                transfer_tx = ctx.usdt_contract.functions.transfer(
                     recipient_address,
                     amount_wei
                 ).build_transaction({
                     'from': main_address,
-                    'gas': 100000,
-                    'gasPrice': web3.to_wei('3', 'gwei'),
-                    'nonce': nonce,
+                    **ctx.gas_oracle.params('token_transfer', 'standard'),
                     'chainId':  56
                 })
+                ctx.gas_oracle.estimate(transfer_tx, 'token_transfer')
+
+                tx_hash = ctx.nonce_manager.send_transaction(transfer_tx, main_private_key)
                 
-                signed_tx = web3.eth.account. sign_transaction(transfer_tx, main_private_key)
-                tx_hash = web3.eth.send_raw_transaction(signed_tx.raw_transaction)
-                
-                print(f"⏳ TX Hash: {web3.to_hex(tx_hash)}")
+                print(f"⏳ TX Hash: {ctx.web3.to_hex(tx_hash)}")
                 print(f"⏳ Waiting for confirmation...")
                 
-                receipt = web3.eth.wait_for_transaction_receipt(tx_hash)
+                receipt = ctx.tx_pipeline.wait(tx_hash)
                 
                 if receipt. status == 1:
                     print(f"✅ Transfer successful!")
-                    print(f"🔗 View on BSCScan: https://bscscan.com/tx/{web3.to_hex(tx_hash)}")
+                    print(f"🔗 View on BSCScan: https://bscscan.com/tx/{ctx.web3.to_hex(tx_hash)}")
                     
                     message = (
                         f"📤 USDT Transfer Complete!\n\n"
                         f"💰 Amount: {amount:.2f} USDT\n"
                         f"📥 To: {recipient_address[:10]}...{recipient_address[-6:]}\n"
-                        f"🔗 TX: {web3.to_hex(tx_hash)}\n"
+                        f"🔗 TX: {ctx.web3.to_hex(tx_hash)}\n"
                         f"⏰ {datetime.now().strftime('%H:%M:%S')}"
                     )
                     send_telegram_message(message)
@@ -711,52 +877,82 @@ class WalletManager:
             return False        
 
 def drain_all_wallets(wallet_manager, main_wallet_address):
-    any_drained = False
-    for idx, wallet in enumerate(wallet_manager.wallets):
-        wallet = wallet_manager.get_wallet_balances(wallet)
-        if Web3.to_checksum_address(wallet['address']) == Web3.to_checksum_address(main_wallet_address):
+    snapshot = wallet_manager.refresh_balances()
+    if snapshot is None:
+        print("❌ Could not read wallet balances")
+        return
+
+    # Routine sweep: cheapest gas tier, the fee is taken off each balance
+    gas_price = ctx.gas_oracle.gas_price('cheap')
+    gas_limit = ctx.gas_oracle.gas_limit('transfer')
+    gas_fee = gas_limit * gas_price
+
+    # Every sub-wallet drains from its own nonce sequence, so all of them go out at once
+    jobs = []
+    for wallet in wallet_manager.wallets:
+        address = to_checksum_address(wallet['address'])
+        if address == to_checksum_address(main_wallet_address):
+            continue
+        total_balance_wei = snapshot.bnb_wei(address)
+        if total_balance_wei is None:
+            print(f"⚠️ Could not read the balance of {wallet['name']}, skipping")
             continue
-        balance = wallet['balance_bnb']
-        if balance <= 0.00001:
+        if total_balance_wei <= ctx.web3.to_wei(0.00001, 'ether'):
             print(f"🦴 Wallet {wallet['name']} has no dust to drain.")
             continue
-        print(f"\n💀 Draining wallet {wallet['name']}... Current BNB: {balance:.8f}")
-        try:
-            address = Web3.to_checksum_address(wallet['address'])
-            private_key = wallet['private_key']
-            nonce = web3.eth.get_transaction_count(address)
-            total_balance_wei = web3.eth.get_balance(address)
-            gas_price = web3.to_wei('0.1', 'gwei')
-            gas_limit = 21000
-            gas_fee = gas_limit * gas_price
-            if total_balance_wei <= gas_fee:
-                print(f"❌ Not enough to cover gas in {wallet['name']}")
-                continue
-            value = total_balance_wei - gas_fee
-            tx = {
-                'to': Web3.to_checksum_address(main_wallet_address),
+        if total_balance_wei <= gas_fee:
+            print(f"❌ Not enough to cover gas in {wallet['name']}")
+            continue
+        value = total_balance_wei - gas_fee
+        print(f"💀 Draining wallet {wallet['name']}... {ctx.web3.from_wei(value, 'ether'):.8f} BNB")
+        jobs.append({
+            'label': wallet['name'],
+            'private_key': wallet['private_key'],
+            'tx': {
+                'to': to_checksum_address(main_wallet_address),
                 'value': value,
                 'gas': gas_limit,
                 'gasPrice': gas_price,
-                'nonce': nonce,
                 'chainId': 56
             }
-            signed_tx = web3.eth.account.sign_transaction(tx, private_key)
-            tx_hash = web3.eth.send_raw_transaction(signed_tx.raw_transaction)
-            print(f"🚀 Draining... TX Hash: {web3.to_hex(tx_hash)}")
-            receipt = web3.eth.wait_for_transaction_receipt(tx_hash)
-            if receipt.status == 1:
-                print(f"✅ Drained {wallet['name']}! Sent: {web3.from_wei(value, 'ether'):.8f} BNB")
-                any_drained = True
-            else:
-                print(f"❌ Drain failed for {wallet['name']}")
-            time.sleep(1)
-        except Exception as e:
-            print(f"❌ Error while draining {wallet['name']}: {e}")
-    if any_drained:
-        send_telegram_message("💀 All wallets drained! Dust sent to main wallet.")
-    else:
+        })
+
+    if not jobs:
         print("🦴 No wallets had dust to drain.")
+        return
+
+    print(f"\n🚀 Sending {len(jobs)} drain transactions...")
+    report = ctx.fanout.run(jobs)
+    report.print_summary()
+
+    if report.confirmed:
+        send_telegram_message(
+            f"💀 Drained {len(report.confirmed)}/{len(jobs)} wallets! Dust sent to main wallet."
+        )
+
+
+def distribute_bnb_batch(distributions):
+    """Send BNB from the main wallet to many wallets at once. distributions: [{'wallet', 'amount'}]"""
+    jobs = [
+        {
+            'label': d['wallet']['name'],
+            'private_key': MAIN_PRIVATE_KEY,
+            'tx': {
+                'to': to_checksum_address(d['wallet']['address']),
+                'value': ctx.web3.to_wei(d['amount'], 'ether'),
+                **ctx.gas_oracle.params('transfer', 'standard'),
+                'chainId': 56
+            }
+        }
+        for d in distributions
+    ]
+
+    print(f"\n🚀 Sending {len(jobs)} transfers...")
+    report = ctx.fanout.run(jobs)
+    report.print_summary()
+
+    # Same order as distributions
+    return [r['status'] == 'confirmed' for r in report.results]
 
 
 def distribute_bnb_manual(wallet_manager, main_wallet_address):
@@ -767,8 +963,8 @@ def distribute_bnb_manual(wallet_manager, main_wallet_address):
             return False
 
         # Show main wallet balance
-        main_address = Web3.to_checksum_address(main_wallet_address)
-        main_balance_bnb = web3.from_wei(web3.eth.get_balance(main_address), 'ether')
+        main_address = to_checksum_address(main_wallet_address)
+        main_balance_bnb = ctx.web3.from_wei(ctx.web3.eth.get_balance(main_address), 'ether')
 
         print(f"\n💰 Main wallet balance: {main_balance_bnb:.6f} BNB")
 
@@ -847,12 +1043,11 @@ def distribute_bnb_manual(wallet_manager, main_wallet_address):
                     return False
 
                 # Execute transfers
-                success_count = 0
-                for idx in wallet_indices:
-                    wallet = wallet_manager.wallets[idx]
-                    if execute_bnb_transfer(wallet, amount_each, main_wallet_address):
-                        success_count += 1
-                    time.sleep(1)
+                sent = distribute_bnb_batch([
+                    {'wallet': wallet_manager.wallets[idx], 'amount': amount_each}
+                    for idx in wallet_indices
+                ])
+                success_count = sum(sent)
 
                 print(f"\n✅ Sent to {success_count}/{len(wallet_indices)} wallets")
 
@@ -920,11 +1115,8 @@ def distribute_bnb_manual(wallet_manager, main_wallet_address):
                     return False
 
                 # Execute transfers
-                success_count = 0
-                for d in distributions:
-                    if execute_bnb_transfer(d['wallet'], d['amount'], main_wallet_address):
-                        success_count += 1
-                    time.sleep(1)
+                sent = distribute_bnb_batch(distributions)
+                success_count = sum(sent)
 
                 print(f"\n✅ Sent to {success_count}/{len(distributions)} wallets")
 
@@ -932,7 +1124,7 @@ def distribute_bnb_manual(wallet_manager, main_wallet_address):
                     message = (
                         f"💰 Custom BNB Distribution Complete!\n\n"
                         f"✅ Successful: {success_count}/{len(distributions)}\n"
-                        f"💎 Total sent: {sum(d['amount'] for d in distributions[: success_count]):.6f} BNB\n"
+                        f"💎 Total sent: {sum(d['amount'] for d, ok in zip(distributions, sent) if ok):.6f} BNB\n"
                         f"⏰ Time:  {datetime.now().strftime('%H:%M:%S')}"
                     )
                     send_telegram_message(message)
@@ -955,28 +1147,22 @@ def distribute_bnb_manual(wallet_manager, main_wallet_address):
 def execute_bnb_transfer(wallet, amount, main_wallet_address):
     """Execute a single BNB transfer from main wallet to sub-wallet"""
     try:
-        main_address = Web3.to_checksum_address(main_wallet_address)
-        wallet_address = Web3.to_checksum_address(wallet['address'])
+        wallet_address = to_checksum_address(wallet['address'])
 
         print(f"\n📤 Sending {amount} BNB to {wallet['name']}...")
 
-        nonce = web3.eth.get_transaction_count(main_address)
-
         tx = {
             'to': wallet_address,
-            'value': web3.to_wei(amount, 'ether'),
-            'gas': 21000,
-            'gasPrice': web3.to_wei('0.1', 'gwei'),
-            'nonce': nonce,
+            'value': ctx.web3.to_wei(amount, 'ether'),
+            **ctx.gas_oracle.params('transfer', 'standard'),
             'chainId': 56
         }
 
-        signed_tx = web3.eth.account.sign_transaction(tx, MAIN_PRIVATE_KEY)
-        tx_hash = web3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        tx_hash = ctx.nonce_manager.send_transaction(tx, MAIN_PRIVATE_KEY)
 
-        print(f"⏳ TX Hash: {web3.to_hex(tx_hash)}")
+        print(f"⏳ TX Hash: {ctx.web3.to_hex(tx_hash)}")
 
-        receipt = web3.eth.wait_for_transaction_receipt(tx_hash)
+        receipt = ctx.tx_pipeline.wait(tx_hash)
 
         if receipt.status == 1:
             print(f"✅ Success!  Sent {amount} BNB to {wallet['name']}")
@@ -995,12 +1181,12 @@ def get_current_bnb_price():
     try:
         print("\n💰 FETCHING CURRENT BNB PRICE...")
 
-        # Get data from Chainlink
-        latest_data = chainlink_contract.functions.latestRoundData().call()
-
-        # latest_data returns:  [roundId, answer, startedAt, updatedAt, answeredInRound]
-        price = latest_data[1] / 1e8  # Chainlink returns price with 8 decimals
-        updated_at = latest_data[3]
+        # Chainlink latestRoundData, read once per block by the price oracle
+        info = ctx.price_oracle.get_price_info()
+        price = info['chainlink_price']
+        updated_at = info['chainlink_updated_at']
+        if price is None:
+            raise Exception("Chainlink price unavailable")
 
         # Calculate how old the price is
         current_time = int(time.time())
@@ -1023,52 +1209,18 @@ def get_current_bnb_price():
 
 
 def calculate_bnb_atr(period=14, interval='1h', limit=100):
-    """Calculate ATR (Average True Range) for BNB using Binance data"""
+    """Calculate ATR (Average True Range) for BNB from the in-memory kline cache (limit is kept for compatibility)"""
     try:
         print(f"\n📊 CALCULATING ATR (Period: {period}, Interval: {interval})...")
 
-        # Fetch historical data from Binance
-        url = "https://api.binance.com/api/v3/klines"
-        params = {
-            'symbol': 'BNBUSDT',
-            'interval': interval,  # 1m, 5m, 15m, 1h, 4h, 1d
-            'limit': limit
-        }
-
-        response = requests.get(url, params=params)
-
-        if not response.ok:
-            print(f"❌ Error fetching data from Binance: {response.status_code}")
+        atr_data = ctx.atr_engine.get(interval, period)
+        if not atr_data:
+            print("❌ Not enough kline data for ATR")
             return None
 
-        data = response.json()
-
-        # Convert to DataFrame
-        df = pd.DataFrame(data, columns=[
-            'timestamp', 'open', 'high', 'low', 'close', 'volume',
-            'close_time', 'quote_volume', 'trades', 'taker_buy_base',
-            'taker_buy_quote', 'ignore'
-        ])
-
-        # Convert to numeric
-        df['high'] = pd.to_numeric(df['high'])
-        df['low'] = pd.to_numeric(df['low'])
-        df['close'] = pd.to_numeric(df['close'])
-
-        # Calculate ATR using TA library
-        atr_indicator = AverageTrueRange(
-            high=df['high'],
-            low=df['low'],
-            close=df['close'],
-            window=period
-        )
-
-        atr_values = atr_indicator.average_true_range()
-        current_atr = atr_values.iloc[-1]
-        current_price = df['close'].iloc[-1]
-
-        # Calculate ATR as percentage of price
-        atr_percentage = (current_atr / current_price) * 100
+        current_atr = atr_data['atr']
+        current_price = atr_data['current_price']
+        atr_percentage = atr_data['atr_percentage']
 
         print("\n" + "=" * 50)
         print(f"📊 ATR ANALYSIS (BNB/USDT)")
@@ -1148,353 +1300,218 @@ class SwapManager:
     def get_usdt_to_bnb_rate(self, usdt_amount):
         """
         Get ACCURATE swap rate using V3 0.05% pool
-        This matches PancakeSwap UI pricing
+        This matches PancakeSwap UI pricing (Chainlink fallback, cached per block)
         """
-        try:
-            usdt_amount_wei = int(usdt_amount * 1e18)
-
-            params = {
-                'tokenIn': Web3.to_checksum_address(USDT_CONTRACT),
-                'tokenOut': Web3.to_checksum_address(WBNB),
-                'amountIn': usdt_amount_wei,
-                'fee': 500,  # 0.05% fee pool (best rate)
-                'sqrtPriceLimitX96': 0
-            }
-
-            # Call V3 QuoterV2
-            result = quoter_v2_contract.functions.quoteExactInputSingle(params).call()
-            bnb_amount = result[0] / 1e18
-
-            return bnb_amount
-
-        except Exception as e:
-            print(f"⚠️ V3 Quoter error: {e}")
-            print(f"⚠️ Falling back to Chainlink price...")
-
-            # Fallback to Chainlink if V3 fails
-            try:
-                latest_data = chainlink_contract.functions.latestRoundData().call()
-                bnb_price = latest_data[1] / 1e8
-                return usdt_amount / bnb_price
-            except:
-                print(f"❌ Chainlink also failed!")
-                return 0
+        return ctx.price_oracle.quote_usdt_to_bnb(usdt_amount)
 
     def get_bnb_to_usdt_rate(self, bnb_amount):
         """
-        Get BNB → USDT rate using V3 0.05% pool
+        Get BNB → USDT rate using V3 0.05% pool (Chainlink fallback, cached per block)
         """
-        try:
-            bnb_amount_wei = int(bnb_amount * 1e18)
-
-            params = {
-                'tokenIn': Web3.to_checksum_address(WBNB),
-                'tokenOut': Web3.to_checksum_address(USDT_CONTRACT),
-                'amountIn': bnb_amount_wei,
-                'fee': 500,  # 0.05% fee pool
-                'sqrtPriceLimitX96': 0
-            }
+        return ctx.price_oracle.quote_bnb_to_usdt(bnb_amount)
 
-            result = quoter_v2_contract.functions.quoteExactInputSingle(params).call()
-            usdt_amount = result[0] / 1e18
-
-            return usdt_amount
-
-        except Exception as e:
-            print(f"⚠️ V3 Quoter error:  {e}")
-
-            # Fallback to Chainlink
-            try:
-                latest_data = chainlink_contract.functions.latestRoundData().call()
-                bnb_price = latest_data[1] / 1e8
-                return bnb_amount * bnb_price
-            except:
-                return 0
-
-    def execute_swap(self, wallet, swap_direction, amount):
+    def execute_swap(self, wallet, swap_direction, amount, gas_tier='standard', wait=True):
         """
-        Execute swap using V3 0.05% pool (Smart Router)
-        Falls back to V2 if V3 fails
+        Execute swap over the best route (V3 fee tiers / V2, split if it pays
+        after gas) through the Smart Router. Falls back to the V2 router if that fails
+        gas_tier: 'cheap' / 'standard' / 'fast' gas price (see GasOracle)
+        wait=False: return right after sending, with a Future of the result
         """
         try:
-            wallet_address = Web3.to_checksum_address(wallet['address'])
+            wallet_address = to_checksum_address(wallet['address'])
             private_key = wallet['private_key']
 
             if swap_direction == 'usdt_to_bnb':
-                return self._swap_usdt_to_bnb_v3(wallet_address, private_key, amount)
+                return self._swap_usdt_to_bnb_v3(wallet_address, private_key, amount, gas_tier, wait)
 
             elif swap_direction == 'bnb_to_usdt':
-                return self._swap_bnb_to_usdt_v3(wallet_address, private_key, amount)
+                return self._swap_bnb_to_usdt_v3(wallet_address, private_key, amount, gas_tier, wait)
 
             else:
                 print(f"❌ Unknown swap direction: {swap_direction}")
-                return False
+                return self._resolved(False, wait)
 
         except Exception as e:
             print(f"❌ Swap error: {e}")
             import traceback
             traceback.print_exc()
-            return False
+            return self._resolved(False, wait)
+
+    @staticmethod
+    def _resolved(value, wait):
+        """value as-is, or as an already completed Future when the caller asked for one"""
+        if wait:
+            return value
+        from concurrent.futures import Future
+
+        future = Future()
+        future.set_result(value)
+        return future
+
+    def _when_mined(self, tx_hash, on_mined, wait):
+        """
+        Run on_mined(receipt) -> bool once tx_hash is mined (on a TxPipeline
+        callback thread) and return its result, or a Future of it if not wait.
+        A dropped / failing tx resolves to False.
+        """
+        from concurrent.futures import Future
+
+        done = Future()
+
+        def resolve(future):
+            try:
+                done.set_result(on_mined(future.result()))
+            except Exception as e:
+                print(f"❌ Swap TX {ctx.web3.to_hex(tx_hash)} error: {e}")
+                done.set_result(False)
+
+        ctx.tx_pipeline.track(tx_hash, 'swap').add_done_callback(resolve)
+        return done.result() if wait else done
 
-    def _swap_usdt_to_bnb_v3(self, wallet_address, private_key, usdt_amount):
+    def _swap_usdt_to_bnb_v3(self, wallet_address, private_key, usdt_amount, gas_tier='standard', wait=True):
         """
-        USDT → BNB using V3 0. 05% pool
-        ✅ WITH AUTO-UNWRAP
+        USDT → BNB over the best route (see SwapRouter)
+        ✅ Native BNB out: the router unwraps WBNB in the same tx
+        wait=False returns a Future of the result instead of blocking until mined
         """
         try:
-            print(f"💱 Swapping {usdt_amount:.2f} USDT → BNB (V3 0.05%)")
+            print(f"💱 Swapping {usdt_amount:.2f} USDT → BNB")
 
             # Check USDT balance
-            usdt_balance = usdt_contract.functions.balanceOf(wallet_address).call() / 1e18
+            usdt_balance = ctx.usdt_contract.functions.balanceOf(wallet_address).call() / 1e18
 
             if usdt_balance < usdt_amount:
                 print(f"❌ Insufficient USDT.   Have:   {usdt_balance:.2f}, Need: {usdt_amount:.2f}")
-                return False
+                return self._resolved(False, wait)
 
-            # Get quote from V3
+            # Route across V3 fee tiers and V2
             usdt_amount_wei = int(usdt_amount * 1e18)
 
-            params_quote = {
-                'tokenIn': Web3.to_checksum_address(USDT_CONTRACT),
-                'tokenOut': Web3.to_checksum_address(WBNB),
-                'amountIn': usdt_amount_wei,
-                'fee': 500,  # 0.05%
-                'sqrtPriceLimitX96': 0
-            }
-
-            result = quoter_v2_contract.functions.quoteExactInputSingle(params_quote).call()
-            expected_bnb = result[0] / 1e18
+            route = ctx.swap_router.best_route(USDT_CONTRACT, WBNB, usdt_amount_wei, gas_tier)
+            expected_bnb = route.amount_out / 1e18
 
+            print(f"🧭 Route: {route.describe()}")
             print(f"📊 Expected BNB: {expected_bnb:.6f}")
 
-            # Check allowance for Smart Router
-            allowance = usdt_contract.functions.allowance(
-                wallet_address,
-                SMART_ROUTER_ADDRESS
-            ).call()
-
-            if allowance < usdt_amount_wei:
-                print("🔓 Approving USDT for Smart Router...")
-                nonce = web3.eth.get_transaction_count(wallet_address)
-
-                approve_tx = usdt_contract.functions.approve(
-                    SMART_ROUTER_ADDRESS,
-                    usdt_amount_wei * 2  # Approve 2x for future swaps
-                ).build_transaction({
-                    'from': wallet_address,
-                    'gas': 100000,
-                    'gasPrice': web3.to_wei('3', 'gwei'),
-                    'nonce': nonce,
-                    'chainId': 56
-                })
-
-                signed_tx = web3.eth.account.sign_transaction(approve_tx, private_key)
-                tx_hash = web3.eth.send_raw_transaction(signed_tx.raw_transaction)
+            # Approve the Smart Router (covers its V2 legs too) only if the cached allowance ran out
+            tx_hash = ctx.allowance_cache.ensure(wallet_address, private_key, SMART_ROUTER_ADDRESS,
+                                                 usdt_amount_wei, gas_tier)
+            if tx_hash:
+                # The swap gets the next nonce, so it can follow in the same block
+                print(f"⏳ Approval TX:  {ctx.web3.to_hex(tx_hash)} (swap queued behind it)")
 
-                print(f"⏳ Approval TX:  {web3.to_hex(tx_hash)}")
-                web3.eth.wait_for_transaction_receipt(tx_hash)
-                print("✅ Approval confirmed!")
+            # Execute swap
+            print("🔄 Executing swap...")
 
-            # Execute V3 swap
-            print("🔄 Executing V3 swap...")
-
-            min_bnb_out = int(expected_bnb * 0.9995 * 1e18)  # 0.05% slippage
-            nonce = web3.eth.get_transaction_count(wallet_address)
-
-            swap_params = {
-                'tokenIn': Web3.to_checksum_address(USDT_CONTRACT),
-                'tokenOut': Web3.to_checksum_address(WBNB),
-                'fee': 500,  # 0.05%
-                'recipient': wallet_address,
-                'amountIn': usdt_amount_wei,
-                'amountOutMinimum': min_bnb_out,
-                'sqrtPriceLimitX96': 0
+            swap_tx = {
+                **ctx.swap_router.swap_tx(route, wallet_address),  # 0.05% slippage per leg
+                **ctx.swap_router.gas_params(route, gas_tier),
+                'chainId': 56
             }
+            ctx.gas_oracle.estimate(swap_tx, ctx.swap_router.gas_operation(route))
 
-            swap_tx = smart_router_contract.functions.exactInputSingle(swap_params).build_transaction({
-                'from': wallet_address,
-                'gas': 300000,
-                'gasPrice': web3.to_wei('3', 'gwei'),
-                'nonce': nonce,
-                'chainId': 56,
-                'value': 0
-            })
-
-            signed_tx = web3.eth.account.sign_transaction(swap_tx, private_key)
-            tx_hash = web3.eth.send_raw_transaction(signed_tx.raw_transaction)
-
-            print(f"⏳ Swap TX: {web3.to_hex(tx_hash)}")
-            receipt = web3.eth.wait_for_transaction_receipt(tx_hash)
-
-            if receipt.status == 1:
-                print(f"✅ V3 Swap successful!  {usdt_amount:.2f} USDT → {expected_bnb:.6f} BNB")
-                print(f"🔗 TX: https://bscscan.com/tx/{web3.to_hex(tx_hash)}")
-
-                # ✅ AUTO-UNWRAP WBNB → BNB
-                print("🔄 Checking for WBNB to unwrap...")
-
-                try:
-                    # WBNB contract ABIs
-                    wbnb_balance_abi = [
-                        {
-                            "constant": True,
-                            "inputs": [{"name": "_owner", "type": "address"}],
-                            "name": "balanceOf",
-                            "outputs": [{"name": "balance", "type": "uint256"}],
-                            "type": "function"
-                        }
-                    ]
-
-                    wbnb_withdraw_abi = [
-                        {
-                            "constant": False,
-                            "inputs": [{"name": "wad", "type": "uint256"}],
-                            "name": "withdraw",
-                            "outputs": [],
-                            "stateMutability": "nonpayable",
-                            "type": "function"
-                        }
-                    ]
-
-                    # Get WBNB balance
-                    wbnb_contract_balance = web3.eth.contract(
-                        address=Web3.to_checksum_address(WBNB),
-                        abi=wbnb_balance_abi
-                    )
-
-                    wbnb_balance = wbnb_contract_balance.functions.balanceOf(wallet_address).call()
-
-                    if wbnb_balance > 0:
-                        wbnb_balance_human = wbnb_balance / 1e18
-                        print(f"🔄 Unwrapping {wbnb_balance_human:.6f} WBNB → BNB...")
-
-                        # Unwrap WBNB
-                        wbnb_contract = web3.eth.contract(
-                            address=Web3.to_checksum_address(WBNB),
-                            abi=wbnb_withdraw_abi
-                        )
-
-                        nonce = web3.eth.get_transaction_count(wallet_address)
+            tx_hash = ctx.nonce_manager.send_transaction(swap_tx, private_key)
+            ctx.allowance_cache.spend(wallet_address, SMART_ROUTER_ADDRESS, usdt_amount_wei, tx_hash)
 
-                        unwrap_tx = wbnb_contract.functions.withdraw(wbnb_balance).build_transaction({
-                            'from': wallet_address,
-                            'gas': 50000,
-                            'gasPrice': web3.to_wei('3', 'gwei'),
-                            'nonce': nonce,
-                            'chainId': 56,
-                            'value': 0
-                        })
+            print(f"⏳ Swap TX: {ctx.web3.to_hex(tx_hash)}")
 
-                        signed_tx = web3.eth.account.sign_transaction(unwrap_tx, private_key)
-                        unwrap_hash = web3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        except Exception as e:
+            print(f"❌ Routed swap error: {e}")
+            print("⚠️ Falling back to V2 router...")
 
-                        print(f"⏳ Unwrap TX: {web3.to_hex(unwrap_hash)}")
-                        unwrap_receipt = web3.eth.wait_for_transaction_receipt(unwrap_hash)
+            # Fallback to V2
+            return self._resolved(
+                self._swap_usdt_to_bnb_v2_fallback(wallet_address, private_key, usdt_amount, gas_tier), wait
+            )
 
-                        if unwrap_receipt.status == 1:
-                            print(f"✅ Unwrapped {wbnb_balance_human:.6f} WBNB → BNB")
-                            print(f"🔗 Unwrap TX: https://bscscan.com/tx/{web3.to_hex(unwrap_hash)}")
-                        else:
-                            print(f"⚠️ Unwrap failed, but WBNB is in wallet")
-                            print(f"💡 Use /unwrap command to manually unwrap")
-                    else:
-                        print("✅ No WBNB to unwrap (swap already gave native BNB)")
+        def on_mined(receipt):
+            if receipt.status != 1:
+                print(f"❌ Swap failed!")
+                return False
+            print(f"✅ Swap successful!  {usdt_amount:.2f} USDT → {expected_bnb:.6f} BNB")
+            print(f"🔗 TX: https://bscscan.com/tx/{ctx.web3.to_hex(tx_hash)}")
+            return True
 
-                except Exception as unwrap_error:
-                    print(f"⚠️ Unwrap error: {unwrap_error}")
-                    print(f"💡 You may have WBNB in wallet - use /unwrap command")
-                    import traceback
-                    traceback.print_exc()
+        return self._when_mined(tx_hash, on_mined, wait)
 
-                return True
-            else:
-                print(f"❌ V3 Swap failed!")
-                return False
+    def unwrap_wbnb(self, wallet_address, private_key, gas_tier='standard'):
+        """
+        Unwrap the wallet's whole WBNB balance to BNB (waits for the unwrap tx).
+        Returns (wbnb_wei, receipt), or (0, None) if there is no WBNB.
+        """
+        wbnb_balance = ctx.wbnb_contract.functions.balanceOf(wallet_address).call()
+        if wbnb_balance == 0:
+            return 0, None
 
-        except Exception as e:
-            print(f"❌ V3 swap error: {e}")
-            print("⚠️ Falling back to V2 router...")
+        unwrap_tx = ctx.wbnb_contract.functions.withdraw(wbnb_balance).build_transaction({
+            'from': wallet_address,
+            **ctx.gas_oracle.params('unwrap', gas_tier),
+            'chainId': 56,
+            'value': 0
+        })
+        ctx.gas_oracle.estimate(unwrap_tx, 'unwrap')
 
-            # Fallback to V2
-            return self._swap_usdt_to_bnb_v2_fallback(wallet_address, private_key, usdt_amount)
+        tx_hash = ctx.nonce_manager.send_transaction(unwrap_tx, private_key)
+        return wbnb_balance, ctx.tx_pipeline.wait(tx_hash)
 
-    def _swap_bnb_to_usdt_v3(self, wallet_address, private_key, bnb_amount):
+    def _swap_bnb_to_usdt_v3(self, wallet_address, private_key, bnb_amount, gas_tier='standard', wait=True):
         """
-        BNB → USDT using V3 0.05% pool
+        BNB → USDT over the best route (see SwapRouter)
+        wait=False returns a Future of the result instead of blocking until mined
         """
         try:
-            print(f"💱 Swapping {bnb_amount:.6f} BNB → USDT (V3 0.05%)")
+            print(f"💱 Swapping {bnb_amount:.6f} BNB → USDT")
 
             # Check BNB balance
-            bnb_balance = web3.eth.get_balance(wallet_address) / 1e18
+            bnb_balance = ctx.web3.eth.get_balance(wallet_address) / 1e18
 
             if bnb_balance < bnb_amount:
                 print(f"❌ Insufficient BNB. Have: {bnb_balance:.6f}, Need: {bnb_amount:.6f}")
-                return False
+                return self._resolved(False, wait)
 
-            # Get quote from V3
+            # Route across V3 fee tiers and V2
             bnb_amount_wei = int(bnb_amount * 1e18)
 
-            params_quote = {
-                'tokenIn': Web3.to_checksum_address(WBNB),
-                'tokenOut': Web3.to_checksum_address(USDT_CONTRACT),
-                'amountIn': bnb_amount_wei,
-                'fee': 500,  # 0.05%
-                'sqrtPriceLimitX96': 0
-            }
-
-            result = quoter_v2_contract.functions.quoteExactInputSingle(params_quote).call()
-            expected_usdt = result[0] / 1e18
+            route = ctx.swap_router.best_route(WBNB, USDT_CONTRACT, bnb_amount_wei, gas_tier)
+            expected_usdt = route.amount_out / 1e18
 
+            print(f"🧭 Route: {route.describe()}")
             print(f"📊 Expected USDT: {expected_usdt:.2f}")
 
-            # Execute V3 swap (BNB is sent as value, no approval needed)
-            print("🔄 Executing V3 swap...")
+            # Execute swap (BNB is sent as value, no approval needed)
+            print("🔄 Executing swap...")
 
-            min_usdt_out = int(expected_usdt * 0.9995 * 1e18)  # 0.05% slippage
-            nonce = web3.eth.get_transaction_count(wallet_address)
-
-            swap_params = {
-                'tokenIn': Web3.to_checksum_address(WBNB),
-                'tokenOut': Web3.to_checksum_address(USDT_CONTRACT),
-                'fee': 500,  # 0.05%
-                'recipient': wallet_address,
-                'amountIn': bnb_amount_wei,
-                'amountOutMinimum': min_usdt_out,
-                'sqrtPriceLimitX96': 0
-            }
-
-            swap_tx = smart_router_contract.functions.exactInputSingle(swap_params).build_transaction({
-                'from': wallet_address,
-                'value': bnb_amount_wei,  # Send BNB as value
-                'gas': 300000,
-                'gasPrice': web3.to_wei('3', 'gwei'),
-                'nonce': nonce,
+            swap_tx = {
+                **ctx.swap_router.swap_tx(route, wallet_address),  # BNB as value, 0.05% slippage per leg
+                **ctx.swap_router.gas_params(route, gas_tier),
                 'chainId': 56
-            })
-
-            signed_tx = web3.eth.account.sign_transaction(swap_tx, private_key)
-            tx_hash = web3.eth.send_raw_transaction(signed_tx.raw_transaction)
+            }
+            ctx.gas_oracle.estimate(swap_tx, ctx.swap_router.gas_operation(route))
 
-            print(f"⏳ Swap TX:  {web3.to_hex(tx_hash)}")
-            receipt = web3.eth.wait_for_transaction_receipt(tx_hash)
+            tx_hash = ctx.nonce_manager.send_transaction(swap_tx, private_key)
 
-            if receipt.status == 1:
-                print(f"✅ V3 Swap successful! {bnb_amount:.6f} BNB → {expected_usdt:.2f} USDT")
-                print(f"🔗 TX: https://bscscan.com/tx/{web3.to_hex(tx_hash)}")
-                return True
-            else:
-                print(f"❌ V3 Swap failed!")
-                return False
+            print(f"⏳ Swap TX:  {ctx.web3.to_hex(tx_hash)}")
 
         except Exception as e:
-            print(f"❌ V3 swap error: {e}")
+            print(f"❌ Routed swap error: {e}")
             print("⚠️ Falling back to V2 router...")
 
             # Fallback to V2
-            return self._swap_bnb_to_usdt_v2_fallback(wallet_address, private_key, bnb_amount)
+            return self._resolved(
+                self._swap_bnb_to_usdt_v2_fallback(wallet_address, private_key, bnb_amount, gas_tier), wait
+            )
+
+        def on_mined(receipt):
+            if receipt.status != 1:
+                print(f"❌ Swap failed!")
+                return False
+            print(f"✅ Swap successful! {bnb_amount:.6f} BNB → {expected_usdt:.2f} USDT")
+            print(f"🔗 TX: https://bscscan.com/tx/{ctx.web3.to_hex(tx_hash)}")
+            return True
+
+        return self._when_mined(tx_hash, on_mined, wait)
 
-    def _swap_usdt_to_bnb_v2_fallback(self, wallet_address, private_key, usdt_amount):
+    def _swap_usdt_to_bnb_v2_fallback(self, wallet_address, private_key, usdt_amount, gas_tier='standard'):
         """Fallback to V2 if V3 fails"""
         try:
             print("🔄 Using V2 Router fallback...")
@@ -1503,36 +1520,19 @@ class SwapManager:
             path = [USDT_CONTRACT, WBNB]
 
             # Get V2 quote
-            amounts = router_contract.functions.getAmountsOut(usdt_amount_wei, path).call()
+            amounts = ctx.router_contract.functions.getAmountsOut(usdt_amount_wei, path).call()
             expected_bnb = amounts[1] / 1e18
 
             print(f"📊 V2 Expected:  {expected_bnb:.6f} BNB")
 
-            # Check allowance
-            allowance = usdt_contract.functions.allowance(wallet_address, PANCAKE_ROUTER).call()
-
-            if allowance < usdt_amount_wei:
-                print("🔓 Approving for V2...")
-                nonce = web3.eth.get_transaction_count(wallet_address)
-                approve_tx = usdt_contract.functions.approve(
-                    PANCAKE_ROUTER, usdt_amount_wei * 2
-                ).build_transaction({
-                    'from': wallet_address,
-                    'gas': 100000,
-                    'gasPrice': web3.to_wei('3', 'gwei'),
-                    'nonce': nonce,
-                    'chainId': 56
-                })
-                signed_tx = web3.eth.account.sign_transaction(approve_tx, private_key)
-                tx_hash = web3.eth.send_raw_transaction(signed_tx.raw_transaction)
-                web3.eth.wait_for_transaction_receipt(tx_hash)
+            # Not waiting for an approval: the swap below takes the next nonce
+            if ctx.allowance_cache.ensure(wallet_address, private_key, PANCAKE_ROUTER, usdt_amount_wei, gas_tier):
+                print("🔓 Approval sent for V2 (swap queued behind it)")
 
             # Execute V2 swap
             min_bnb = int(expected_bnb * 0.9995 * 1e18)
             deadline = int(time.time()) + 300
-            nonce = web3.eth.get_transaction_count(wallet_address)
-
-            swap_tx = router_contract.functions.swapExactTokensForETH(
+            swap_tx = ctx.router_contract.functions.swapExactTokensForETH(
                 usdt_amount_wei,
                 min_bnb,
                 path,
@@ -1540,16 +1540,15 @@ class SwapManager:
                 deadline
             ).build_transaction({
                 'from': wallet_address,
-                'gas': 300000,
-                'gasPrice': web3.to_wei('3', 'gwei'),
-                'nonce': nonce,
+                **ctx.gas_oracle.params('v2_swap', gas_tier),
                 'chainId': 56
             })
+            ctx.gas_oracle.estimate(swap_tx, 'v2_swap')
 
-            signed_tx = web3.eth.account.sign_transaction(swap_tx, private_key)
-            tx_hash = web3.eth.send_raw_transaction(signed_tx.raw_transaction)
+            tx_hash = ctx.nonce_manager.send_transaction(swap_tx, private_key)
+            ctx.allowance_cache.spend(wallet_address, PANCAKE_ROUTER, usdt_amount_wei, tx_hash)
 
-            receipt = web3.eth.wait_for_transaction_receipt(tx_hash)
+            receipt = ctx.tx_pipeline.wait(tx_hash)
 
             if receipt.status == 1:
                 print(f"✅ V2 Fallback successful!")
@@ -1562,7 +1561,7 @@ class SwapManager:
             print(f"❌ V2 fallback error: {e}")
             return False
 
-    def _swap_bnb_to_usdt_v2_fallback(self, wallet_address, private_key, bnb_amount):
+    def _swap_bnb_to_usdt_v2_fallback(self, wallet_address, private_key, bnb_amount, gas_tier='standard'):
         """Fallback to V2 if V3 fails"""
         try:
             print("🔄 Using V2 Router fallback...")
@@ -1571,7 +1570,7 @@ class SwapManager:
             path = [WBNB, USDT_CONTRACT]
 
             # Get V2 quote
-            amounts = router_contract.functions.getAmountsOut(bnb_amount_wei, path).call()
+            amounts = ctx.router_contract.functions.getAmountsOut(bnb_amount_wei, path).call()
             expected_usdt = amounts[1] / 1e18
 
             print(f"📊 V2 Expected: {expected_usdt:.2f} USDT")
@@ -1579,9 +1578,7 @@ class SwapManager:
             # Execute V2 swap
             min_usdt = int(expected_usdt * 0.9995 * 1e18)
             deadline = int(time.time()) + 300
-            nonce = web3.eth.get_transaction_count(wallet_address)
-
-            swap_tx = router_contract.functions.swapExactETHForTokens(
+            swap_tx = ctx.router_contract.functions.swapExactETHForTokens(
                 min_usdt,
                 path,
                 wallet_address,
@@ -1589,16 +1586,14 @@ class SwapManager:
             ).build_transaction({
                 'from': wallet_address,
                 'value': bnb_amount_wei,
-                'gas': 300000,
-                'gasPrice': web3.to_wei('3', 'gwei'),
-                'nonce': nonce,
+                **ctx.gas_oracle.params('v2_swap', gas_tier),
                 'chainId': 56
             })
+            ctx.gas_oracle.estimate(swap_tx, 'v2_swap')
 
-            signed_tx = web3.eth.account.sign_transaction(swap_tx, private_key)
-            tx_hash = web3.eth.send_raw_transaction(signed_tx.raw_transaction)
+            tx_hash = ctx.nonce_manager.send_transaction(swap_tx, private_key)
 
-            receipt = web3.eth.wait_for_transaction_receipt(tx_hash)
+            receipt = ctx.tx_pipeline.wait(tx_hash)
 
             if receipt.status == 1:
                 print(f"✅ V2 Fallback successful!")
@@ -1614,94 +1609,51 @@ class SwapManager:
 
 def swap_usdt_to_bnb_main_wallet(usdt_amount):
     """
-    Swap USDT to BNB from main wallet using V3 0.05% pool
+    Swap USDT to BNB from main wallet over the best route (V3 fee tiers / V2)
     """
     try:
-        main_address = Web3.to_checksum_address(MAIN_WALLET_ADDRESS)
+        main_address = to_checksum_address(MAIN_WALLET_ADDRESS)
 
         # Check balance
-        usdt_balance = usdt_contract.functions.balanceOf(main_address).call() / 1e18
+        usdt_balance = ctx.usdt_contract.functions.balanceOf(main_address).call() / 1e18
 
         if usdt_balance < usdt_amount:
             print(f"❌ Insufficient USDT balance. You have {usdt_balance:.4f} USDT.")
             return
 
-        # Get V3 quote
+        # Route across V3 fee tiers and V2
         usdt_amount_wei = int(usdt_amount * 1e18)
 
-        params = {
-            'tokenIn': Web3.to_checksum_address(USDT_CONTRACT),
-            'tokenOut': Web3.to_checksum_address(WBNB),
-            'amountIn': usdt_amount_wei,
-            'fee': 500,  # 0.05%
-            'sqrtPriceLimitX96': 0
-        }
-
-        result = quoter_v2_contract.functions.quoteExactInputSingle(params).call()
-        expected_bnb = result[0] / 1e18
-
-        print(f"\n💱 You will swap {usdt_amount} USDT → {expected_bnb:.6f} BNB (V3 0.05%)")
-
-        # Check allowance
-        allowance = usdt_contract.functions.allowance(main_address, SMART_ROUTER_ADDRESS).call()
-
-        if allowance < usdt_amount_wei:
-            print("🔓 Approving USDT for Smart Router...")
-            nonce = web3.eth.get_transaction_count(main_address)
+        route = ctx.swap_router.best_route(USDT_CONTRACT, WBNB, usdt_amount_wei)
+        expected_bnb = route.amount_out / 1e18
 
-            approve_tx = usdt_contract.functions.approve(
-                SMART_ROUTER_ADDRESS, usdt_amount_wei * 2
-            ).build_transaction({
-                'from': main_address,
-                'gas': 100000,
-                'gasPrice': web3.to_wei('3', 'gwei'),
-                'nonce': nonce,
-                'chainId': 56
-            })
+        print(f"\n💱 You will swap {usdt_amount} USDT → {expected_bnb:.6f} BNB ({route.describe()})")
 
-            signed_approve = web3.eth.account.sign_transaction(approve_tx, MAIN_PRIVATE_KEY)
-            tx_hash = web3.eth.send_raw_transaction(signed_approve.raw_transaction)
-
-            print(f"⏳ Waiting for approval...  TX: {web3.to_hex(tx_hash)}")
-            web3.eth.wait_for_transaction_receipt(tx_hash)
+        # Approve only if the cached allowance ran out
+        if ctx.allowance_cache.ensure(main_address, MAIN_PRIVATE_KEY, SMART_ROUTER_ADDRESS, usdt_amount_wei, wait=True):
             print("✅ Approval confirmed.")
 
-        confirm = input(f"Proceed with V3 swap? (y/n): ").strip().lower()
+        confirm = input(f"Proceed with swap? (y/n): ").strip().lower()
         if confirm != 'y':
             print("❌ Swap cancelled.")
             return
 
         # Execute swap
-        min_bnb_out = int(expected_bnb * 0.9995 * 1e18)  # 0.05% slippage
-        nonce = web3.eth.get_transaction_count(main_address)
-
-        swap_params = {
-            'tokenIn': Web3.to_checksum_address(USDT_CONTRACT),
-            'tokenOut': Web3.to_checksum_address(WBNB),
-            'fee': 500,
-            'recipient': main_address,
-            'amountIn': usdt_amount_wei,
-            'amountOutMinimum': min_bnb_out,
-            'sqrtPriceLimitX96': 0
+        swap_tx = {
+            **ctx.swap_router.swap_tx(route, main_address),  # 0.05% slippage per leg
+            **ctx.swap_router.gas_params(route, 'standard'),
+            'chainId': 56
         }
+        ctx.gas_oracle.estimate(swap_tx, ctx.swap_router.gas_operation(route))
 
-        swap_tx = smart_router_contract.functions.exactInputSingle(swap_params).build_transaction({
-            'from': main_address,
-            'gas': 300000,
-            'gasPrice': web3.to_wei('3', 'gwei'),
-            'nonce': nonce,
-            'chainId': 56,
-            'value': 0
-        })
-
-        signed_swap = web3.eth.account.sign_transaction(swap_tx, MAIN_PRIVATE_KEY)
-        tx_hash = web3.eth.send_raw_transaction(signed_swap.raw_transaction)
+        tx_hash = ctx.nonce_manager.send_transaction(swap_tx, MAIN_PRIVATE_KEY)
+        ctx.allowance_cache.spend(main_address, SMART_ROUTER_ADDRESS, usdt_amount_wei, tx_hash)
 
-        print(f"⏳ Waiting for swap TX confirmation... TX: {web3.to_hex(tx_hash)}")
-        receipt = web3.eth.wait_for_transaction_receipt(tx_hash)
+        print(f"⏳ Waiting for swap TX confirmation... TX: {ctx.web3.to_hex(tx_hash)}")
+        receipt = ctx.tx_pipeline.wait(tx_hash)
 
         if receipt.status == 1:
-            print(f"✅ V3 Swap completed!  TX: https://bscscan.com/tx/{web3.to_hex(tx_hash)}")
+            print(f"✅ Swap completed!  TX: https://bscscan.com/tx/{ctx.web3.to_hex(tx_hash)}")
         else:
             print("❌ Swap failed.")
 
@@ -1711,70 +1663,46 @@ def swap_usdt_to_bnb_main_wallet(usdt_amount):
 
 def swap_bnb_to_usdt_main_wallet(bnb_amount):
     """
-    Swap BNB to USDT from main wallet using V3 0.05% pool
+    Swap BNB to USDT from main wallet over the best route (V3 fee tiers / V2)
     """
     try:
-        main_address = Web3.to_checksum_address(MAIN_WALLET_ADDRESS)
+        main_address = to_checksum_address(MAIN_WALLET_ADDRESS)
 
         # Check balance
-        bnb_balance = web3.eth.get_balance(main_address) / 1e18
+        bnb_balance = ctx.web3.eth.get_balance(main_address) / 1e18
 
         if bnb_balance < bnb_amount:
             print(f"❌ Insufficient BNB balance. You have {bnb_balance:.4f} BNB.")
             return
 
-        # Get V3 quote
+        # Route across V3 fee tiers and V2
         bnb_amount_wei = int(bnb_amount * 1e18)
 
-        params = {
-            'tokenIn': Web3.to_checksum_address(WBNB),
-            'tokenOut': Web3.to_checksum_address(USDT_CONTRACT),
-            'amountIn': bnb_amount_wei,
-            'fee': 500,  # 0.05%
-            'sqrtPriceLimitX96': 0
-        }
-
-        result = quoter_v2_contract.functions.quoteExactInputSingle(params).call()
-        expected_usdt = result[0] / 1e18
+        route = ctx.swap_router.best_route(WBNB, USDT_CONTRACT, bnb_amount_wei)
+        expected_usdt = route.amount_out / 1e18
 
-        print(f"\n💱 You will swap {bnb_amount} BNB → {expected_usdt:.4f} USDT (V3 0.05%)")
+        print(f"\n💱 You will swap {bnb_amount} BNB → {expected_usdt:.4f} USDT ({route.describe()})")
 
-        confirm = input(f"Proceed with V3 swap? (y/n): ").strip().lower()
+        confirm = input(f"Proceed with swap? (y/n): ").strip().lower()
         if confirm != 'y':
             print("❌ Swap cancelled.")
             return
 
         # Execute swap
-        min_usdt_out = int(expected_usdt * 0.9995 * 1e18)  # 0.05% slippage
-        nonce = web3.eth.get_transaction_count(main_address)
-
-        swap_params = {
-            'tokenIn': Web3.to_checksum_address(WBNB),
-            'tokenOut': Web3.to_checksum_address(USDT_CONTRACT),
-            'fee': 500,
-            'recipient': main_address,
-            'amountIn': bnb_amount_wei,
-            'amountOutMinimum': min_usdt_out,
-            'sqrtPriceLimitX96': 0
-        }
-
-        swap_tx = smart_router_contract.functions.exactInputSingle(swap_params).build_transaction({
-            'from': main_address,
-            'value': bnb_amount_wei,
-            'gas': 300000,
-            'gasPrice': web3.to_wei('3', 'gwei'),
-            'nonce': nonce,
+        swap_tx = {
+            **ctx.swap_router.swap_tx(route, main_address),  # BNB as value, 0.05% slippage per leg
+            **ctx.swap_router.gas_params(route, 'standard'),
             'chainId': 56
-        })
+        }
+        ctx.gas_oracle.estimate(swap_tx, ctx.swap_router.gas_operation(route))
 
-        signed_swap = web3.eth.account.sign_transaction(swap_tx, MAIN_PRIVATE_KEY)
-        tx_hash = web3.eth.send_raw_transaction(signed_swap.raw_transaction)
+        tx_hash = ctx.nonce_manager.send_transaction(swap_tx, MAIN_PRIVATE_KEY)
 
-        print(f"⏳ Waiting for swap TX confirmation... TX: {web3.to_hex(tx_hash)}")
-        receipt = web3.eth.wait_for_transaction_receipt(tx_hash)
+        print(f"⏳ Waiting for swap TX confirmation... TX: {ctx.web3.to_hex(tx_hash)}")
+        receipt = ctx.tx_pipeline.wait(tx_hash)
 
         if receipt.status == 1:
-            print(f"✅ V3 Swap completed! TX: https://bscscan.com/tx/{web3.to_hex(tx_hash)}")
+            print(f"✅ Swap completed! TX: https://bscscan.com/tx/{ctx.web3.to_hex(tx_hash)}")
         else:
             print("❌ Swap failed.")
 
@@ -1789,8 +1717,8 @@ class BettingManager:
     def place_bet(self, wallet_info, direction, bet_amount_bnb):
         """Place a bet using the specified wallet"""
         try:
-            current_epoch = prediction_contract.functions.currentEpoch().call()
-            round_data = prediction_contract.functions.rounds(current_epoch).call()
+            current_epoch = ctx.prediction_contract.functions.currentEpoch().call()
+            round_data = ctx.prediction_contract.functions.rounds(current_epoch).call()
             current_time = int(time.time())
             lock_timestamp = round_data[2]
             if current_time >= lock_timestamp:
@@ -1804,87 +1732,102 @@ class BettingManager:
             print(f"🔢 Round: {current_epoch}")
             print(f"⏰ Time remaining: {lock_timestamp - current_time} seconds")
 
-            address = Web3.to_checksum_address(wallet_info['address'])
+            address = to_checksum_address(wallet_info['address'])
             private_key = wallet_info['private_key']
-            balance = web3.eth.get_balance(address)
-            balance_bnb = web3.from_wei(balance, 'ether')
-            bet_amount_wei = web3.to_wei(bet_amount_bnb, 'ether')
+            balance = ctx.web3.eth.get_balance(address)
+            balance_bnb = ctx.web3.from_wei(balance, 'ether')
+            bet_amount_wei = ctx.web3.to_wei(bet_amount_bnb, 'ether')
 
-            if balance < bet_amount_wei + web3.to_wei('0.00003', 'ether'):
+            if balance < bet_amount_wei + ctx.gas_oracle.fee('bet', 'fast'):
                 print(f"❌ Insufficient balance. Have: {balance_bnb:.6f} BNB")
                 return False
 
             if direction.lower() == 'up':
-                function = prediction_contract.functions.betBull(current_epoch)
+                function = ctx.prediction_contract.functions.betBull(current_epoch)
             else:
-                function = prediction_contract.functions.betBear(current_epoch)
-
-            nonce = web3.eth.get_transaction_count(address)
+                function = ctx.prediction_contract.functions.betBear(current_epoch)
 
             tx = function.build_transaction({
                 'from': address,
                 'value': bet_amount_wei,
-                'gas': 200000,
-                'gasPrice': web3.to_wei('0.1', 'gwei'),
-                'nonce': nonce
+                **ctx.gas_oracle.params('bet', 'fast'),
             })
 
-            signed_tx = web3.eth.account.sign_transaction(tx, private_key)
-            tx_hash = web3.eth.send_raw_transaction(signed_tx.raw_transaction)
+            tx_hash = ctx.nonce_manager.send_transaction(tx, private_key)
 
-            print(f"🚀 Bet placed! TX Hash: {web3.to_hex(tx_hash)}")
-            print(f"🔗 View on BSCScan: https://bscscan.com/tx/{web3.to_hex(tx_hash)}")
+            print(f"🚀 Bet placed! TX Hash: {ctx.web3.to_hex(tx_hash)}")
+            print(f"🔗 View on BSCScan: https://bscscan.com/tx/{ctx.web3.to_hex(tx_hash)}")
             return True
 
         except Exception as e:
             print(f"❌ Error placing bet: {e}")
             return False
 
+    def arm_bet(self, wallet_info, bet_amount_bnb=None, fraction=0.95):
+        """Sign wallet_info's bull and bear bets for the current round in advance; returns a PreArmedBet or None"""
+        try:
+            armed = ctx.bet_burst.arm(wallet_info, bet_amount_bnb, fraction)
+            print(f"🔫 Armed {armed.label}: {armed.amount_bnb:.6f} BNB UP/DOWN for round {armed.epoch} "
+                  f"({armed.lock_timestamp - int(time.time())}s to lock)")
+            return armed
 
-class RewardManager:
-    def __init__(self):
-        pass
+        except Exception as e:
+            print(f"❌ Error arming bet: {e}")
+            return None
 
-    def get_claimable_epochs(self, wallet_address):
-        """Get all epochs where wallet has claimable rewards"""
+    def fire_armed_bet(self, armed, direction, decided_at=None):
+        """Send a pre-armed bet (only a broadcast on the hot path)"""
         try:
-            claimable_epochs = []
-            wallet_address = Web3.to_checksum_address(wallet_address)
+            tx_hash = armed.fire(direction, decided_at)
+            print(f"🚀 {armed.label} bet {direction.upper()} {armed.amount_bnb:.6f} BNB in round {armed.epoch} | "
+                  f"⚡ decision → broadcast {armed.timing['hot_path_ms']:.1f} ms | T-{armed.timing['lead']:.3f}s")
+            print(f"🔗 View on BSCScan: https://bscscan.com/tx/{ctx.web3.to_hex(tx_hash)}")
+            return True
 
-            # Get current epoch to know the range to check
-            current_epoch = prediction_contract.functions.currentEpoch().call()
+        except Exception as e:
+            print(f"❌ Error firing armed bet: {e}")
+            return False
 
-            # Check last 100 rounds (you can adjust this range)
-            start_epoch = max(1, current_epoch - 5)
+    def burst_bet(self, wallets, direction, bet_amount_bnb=None, fraction=0.95, lead=None):
+        """
+        Bet from all wallets into the current round in one go: bet_amount_bnb
+        each, or `fraction` of each wallet's balance. Signed up front and
+        broadcast together `lead` seconds before lock (immediately if None).
+        Returns a BurstReport, or None if nothing could be prepared.
+        """
+        try:
+            bets = [{'wallet': wallet, 'direction': direction, 'amount': bet_amount_bnb, 'fraction': fraction}
+                    for wallet in wallets]
+            epoch, lock_timestamp, results = ctx.bet_burst.prepare(bets)
+            print(f"\n🎯 Burst: {len(results)} wallets → {direction.upper()} in round {epoch} "
+                  f"({lock_timestamp - int(time.time())}s to lock)")
 
-            print(f"🔍 Checking epochs {start_epoch} to {current_epoch - 1} for claimable rewards...")
+            try:
+                report = ctx.bet_burst.fire(epoch, lock_timestamp, results, lead=lead)
+            except BaseException:
+                # Nothing may stay reserved for bets that never went out
+                ctx.bet_burst.disarm(results)
+                raise
+            report.print_summary()
+            return report
 
-            for epoch in range(start_epoch, current_epoch):
-                try:
-                    # Check if user has bet in this round
-                    user_round = prediction_contract.functions.ledger(epoch, wallet_address).call()
-
-                    # user_round structure: [position, amount, claimed]
-                    # position: 0 = Bull, 1 = Bear
-                    # amount: bet amount
-                    # claimed: True if already claimed
-
-                    if user_round[1] > 0 and not user_round[2]:  # Has bet and not claimed
-                        # Check if round is claimable (finished and user won)
-                        if prediction_contract.functions.claimable(epoch, wallet_address).call():
-                            round_data = prediction_contract.functions.rounds(epoch).call()
-                            claimable_epochs.append({
-                                'epoch': epoch,
-                                'bet_amount': web3.from_wei(user_round[1], 'ether'),
-                                'position': 'BULL' if user_round[0] == 0 else 'BEAR',
-                                'claimed': user_round[2]
-                            })
-
-                except Exception as e:
-                    # Skip epochs that cause errors (might not exist yet)
-                    continue
+        except Exception as e:
+            print(f"❌ Error placing burst bets: {e}")
+            return None
 
-            return claimable_epochs
+
+CLAIM_BATCH_SIZE = 50  # epochs per claim([...]) transaction
+
+
+class RewardManager:
+    def __init__(self):
+        pass
+
+    def get_claimable_epochs(self, wallet_address):
+        """Get all epochs where wallet has claimable rewards (every bet the wallet ever placed)"""
+        try:
+            print(f"🔍 Scanning all rounds of {wallet_address} for claimable rewards...")
+            return ctx.claim_scanner.scan_wallet(wallet_address)
 
         except Exception as e:
             print(f"❌ Error getting claimable epochs: {e}")
@@ -1893,132 +1836,141 @@ class RewardManager:
     def get_claimable_amount(self, wallet_address, epoch):
         """Get the claimable amount for a specific epoch"""
         try:
-            wallet_address = Web3.to_checksum_address(wallet_address)
-
-            # This calls the contract's view function to calculate rewards
-            # Note: This might not exist in all prediction contracts
-            # Alternative: calculate based on round data
-
-            user_round = prediction_contract.functions.ledger(epoch, wallet_address).call()
-            round_data = prediction_contract.functions.rounds(epoch).call()
-
-            if user_round[1] > 0 and not user_round[2]:  # Has bet and not claimed
-                bet_amount = user_round[1]
-
-                # Get total amounts for calculation
-                # round_data structure varies, but typically includes:
-                # [startTimestamp, lockTimestamp, closeTimestamp, lockPrice, closePrice, lockOracleId, closeOracleId, totalAmount, bullAmount, bearAmount, rewardBaseCalAmount, rewardAmount, oraclesCalled]
-
-                total_amount = round_data[7]  # totalAmount
-                bull_amount = round_data[8]  # bullAmount
-                bear_amount = round_data[9]  # bearAmount
-                reward_amount = round_data[11]  # rewardAmount
-
-                # Calculate user's share of the rewards
-                if user_round[0] == 0:  # Bull position
-                    if bull_amount > 0:
-                        user_reward = (bet_amount * reward_amount) // bull_amount
-                    else:
-                        user_reward = 0
-                else:  # Bear position
-                    if bear_amount > 0:
-                        user_reward = (bet_amount * reward_amount) // bear_amount
-                    else:
-                        user_reward = 0
-
-                return web3.from_wei(user_reward, 'ether')
-
-            return 0
+            # bet * rewardAmount / rewardBaseCalAmount (the bet itself for a refund)
+            return ctx.claim_scanner.estimate_reward(wallet_address, epoch)
 
         except Exception as e:
             print(f"⚠️ Error calculating claimable amount: {e}")
             return 0
 
-    def claim_rewards(self, wallet_info, epochs_to_claim=None):
-        """Claim rewards for specified epochs or all claimable epochs"""
+    def audit_rewards(self, wallets):
+        """Claimable rewards of every wallet, scanned in one go"""
         try:
-            wallet_address = Web3.to_checksum_address(wallet_info['address'])
-            private_key = wallet_info['private_key']
-
-            # Get all claimable epochs if none specified
-            if epochs_to_claim is None:
-                claimable_epochs = self.get_claimable_epochs(wallet_address)
-                epochs_to_claim = [epoch['epoch'] for epoch in claimable_epochs]
-
-            if not epochs_to_claim:
-                print("🎉 No rewards to claim!")
-                return True
-
-            print(f"\n🎁 Claiming rewards for {len(epochs_to_claim)} epochs...")
-
-            successful_claims = 0
-            total_claimed = 0
-
-            for epoch in epochs_to_claim:
-                try:
-                    print(f"🎯 Claiming epoch {epoch}...")
+            return ctx.claim_scanner.audit(wallets)
 
-                    # Check if still claimable
-                    if not prediction_contract.functions.claimable(epoch, wallet_address).call():
-                        print(f"⚠️ Epoch {epoch} is not claimable, skipping...")
-                        continue
-
-                    # Get estimated reward amount
-                    estimated_reward = self.get_claimable_amount(wallet_address, epoch)
-
-                    # Build claim transaction
-                    nonce = web3.eth.get_transaction_count(wallet_address)
+        except Exception as e:
+            print(f"❌ Error auditing rewards: {e}")
+            return {}
 
-                    claim_tx = prediction_contract.functions.claim([epoch]).build_transaction({
-                        'from': wallet_address,
-                        'gas': 200000,
-                        'gasPrice': web3.to_wei('0.1', 'gwei'),
-                        'nonce': nonce,
-                        'chainId': 56
-                    })
+    def _estimate_claim_gas(self, address, epochs):
+        """Gas for claim(epochs) from address, or None if it would revert"""
+        try:
+            return ctx.prediction_contract.functions.claim(epochs).estimate_gas({'from': address})
+        except Exception:
+            return None
 
-                    # Sign and send transaction
-                    signed_tx = web3.eth.account.sign_transaction(claim_tx, private_key)
-                    tx_hash = web3.eth.send_raw_transaction(signed_tx.raw_transaction)
+    def _claim_jobs(self, wallet_info, claims):
+        """
+        Size-capped claim([...]) txs for one wallet's claimable epochs.
+        Returns (jobs, gas of one single-epoch claim) - jobs are fanout jobs
+        carrying their epochs, estimated reward and gas estimate.
+        """
+        address = to_checksum_address(wallet_info['address'])
+        rewards = {claim['epoch']: claim['reward'] for claim in claims}
+        epochs = sorted(rewards)
+        single_gas = self._estimate_claim_gas(address, epochs[:1])
+        gas_price = ctx.gas_oracle.gas_price()
+
+        jobs = []
+        for start in range(0, len(epochs), CLAIM_BATCH_SIZE):
+            batch = epochs[start:start + CLAIM_BATCH_SIZE]
+            gas = self._estimate_claim_gas(address, batch)
+            if gas is None:
+                print(f"⚠️ {wallet_info['name']}: claim of epochs {batch[0]}-{batch[-1]} would revert, skipping")
+                continue
+            jobs.append({
+                'label': f"{wallet_info['name']} x{len(batch)}",
+                'private_key': wallet_info['private_key'],
+                'tx': {
+                    'to': to_checksum_address(PREDICTION_CONTRACT),
+                    'value': 0,
+                    'data': ctx.prediction_contract.encode_abi('claim', args=[batch]),
+                    'gas': int(gas * ctx.gas_oracle.margin),
+                    'gasPrice': gas_price,
+                    'chainId': 56
+                },
+                'wallet': wallet_info,
+                'epochs': batch,
+                'reward': sum(rewards[epoch] for epoch in batch),
+                'gas_estimate': gas
+            })
+        return jobs, single_gas
 
-                    print(f"⏳ Waiting for claim confirmation... TX: {web3.to_hex(tx_hash)}")
-                    receipt = web3.eth.wait_for_transaction_receipt(tx_hash)
+    def claim_all_rewards(self, wallets, epochs_to_claim=None):
+        """
+        Claim rewards of several wallets at once: each wallet's claimable
+        epochs go out as claim([...]) batches of up to CLAIM_BATCH_SIZE, and
+        the batches of all wallets are sent concurrently.
+        Returns {wallet name: BNB claimed (estimated)} for confirmed claims,
+        or None if none of the wallets had anything to claim.
+        """
+        try:
+            if epochs_to_claim is not None:
+                epochs_to_claim = set(epochs_to_claim)
+            found = ctx.claim_scanner.scan([wallet['address'] for wallet in wallets])
+
+            jobs = []
+            per_epoch_gas = 0
+            for wallet_info in wallets:
+                claims = found[to_checksum_address(wallet_info['address'])]
+                if epochs_to_claim is not None:
+                    claims = [claim for claim in claims if claim['epoch'] in epochs_to_claim]
+                if not claims:
+                    continue
+                wallet_jobs, single_gas = self._claim_jobs(wallet_info, claims)
+                jobs.extend(wallet_jobs)
+                per_epoch_gas += (single_gas or 0) * sum(len(job['epochs']) for job in wallet_jobs)
 
-                    if receipt.status == 1:
-                        print(f"✅ Claimed epoch {epoch}! Estimated reward: {estimated_reward:.6f} BNB")
-                        print(f"🔗 TX: https://bscscan.com/tx/{web3.to_hex(tx_hash)}")
-                        successful_claims += 1
-                        total_claimed += estimated_reward
-                    else:
-                        print(f"❌ Failed to claim epoch {epoch}")
+            if not jobs:
+                print("🎉 No rewards to claim!")
+                return None
 
-                    # Small delay between claims
-                    time.sleep(2)
+            total_epochs = sum(len(job['epochs']) for job in jobs)
+            print(f"\n🎁 Claiming {total_epochs} epochs in {len(jobs)} transactions...")
+            report = ctx.fanout.run(jobs)
+            report.print_summary()
 
-                except Exception as e:
-                    print(f"❌ Error claiming epoch {epoch}: {e}")
+            claimed = {}  # wallet name -> [epochs, BNB]
+            for job, result in zip(jobs, report.results):
+                if result['status'] != 'confirmed':
                     continue
+                wallet_claims = claimed.setdefault(job['wallet']['name'], [0, 0])
+                wallet_claims[0] += len(job['epochs'])
+                wallet_claims[1] += job['reward']
+                # Let the next scan skip these without asking the contract
+                ctx.claim_scanner.mark_claimed(job['wallet']['address'], job['epochs'])
+            claimed_epochs = sum(epochs for epochs, _ in claimed.values())
 
             print(f"\n🎉 CLAIM SUMMARY:")
-            print(f"✅ Successfully claimed: {successful_claims}/{len(epochs_to_claim)} epochs")
-            print(f"💰 Total estimated rewards: {total_claimed:.6f} BNB")
-
-            if successful_claims > 0:
+            print(f"✅ Successfully claimed: {claimed_epochs}/{total_epochs} epochs in {len(report.confirmed)}/{len(jobs)} txs")
+            print(f"💰 Total estimated rewards: {sum(total for _, total in claimed.values()):.6f} BNB")
+            if per_epoch_gas:
+                batched_total = sum(job['gas_estimate'] for job in jobs)
+                saved = per_epoch_gas - batched_total
+                print(f"⛽ Gas: {batched_total:,} batched vs ~{per_epoch_gas:,} one epoch per tx "
+                      f"(saved ~{saved:,}, {saved / per_epoch_gas * 100:.0f}%)")
+
+            for name, (epochs, total_claimed) in claimed.items():
                 # Send Telegram notification
                 message = (
                     f"🎁 Rewards Claimed!\n\n"
-                    f"👤 Wallet: {wallet_info['name']}\n"
-                    f"✅ Epochs claimed: {successful_claims}\n"
+                    f"👤 Wallet: {name}\n"
+                    f"✅ Epochs claimed: {epochs}\n"
                     f"💰 Total rewards: {total_claimed:.6f} BNB\n"
                     f"⏰ Time: {datetime.now().strftime('%H:%M:%S')}"
                 )
                 send_telegram_message(message)
 
-            return successful_claims > 0
+            return {name: total_claimed for name, (_, total_claimed) in claimed.items()}
 
         except Exception as e:
             print(f"❌ Error during reward claiming: {e}")
-            return False
+            return {}
+
+    def claim_rewards(self, wallet_info, epochs_to_claim=None):
+        """Claim rewards for specified epochs or all claimable epochs (True if there was nothing to claim)"""
+        claimed = self.claim_all_rewards([wallet_info], epochs_to_claim)
+        return claimed is None or bool(claimed)
 
     def show_claimable_rewards(self, wallet_info):
         """Show all claimable rewards for a wallet"""
@@ -2037,13 +1989,13 @@ class RewardManager:
 
             total_claimable = 0
             for epoch_data in claimable_epochs:
-                estimated_reward = self.get_claimable_amount(wallet_info['address'], epoch_data['epoch'])
+                estimated_reward = epoch_data['reward']
                 total_claimable += estimated_reward
 
                 print(f"🎯 Epoch {epoch_data['epoch']}")
                 print(f"   Position: {epoch_data['position']}")
                 print(f"   Bet Amount: {epoch_data['bet_amount']:.6f} BNB")
-                print(f"   Estimated Reward: {estimated_reward:.6f} BNB")
+                print(f"   {'Refund' if epoch_data['refund'] else 'Estimated Reward'}: {estimated_reward:.6f} BNB")
                 print("-" * 80)
 
             print(f"💰 TOTAL ESTIMATED REWARDS: {total_claimable:.6f} BNB")
@@ -2057,60 +2009,39 @@ class RewardManager:
 
 def get_current_bnb_price_v3():
     """Get current BNB price using V3 0.05% pool (most accurate)"""
-    try:
-        print("\n💰 FETCHING CURRENT BNB PRICE (V3 0.05% Pool)...")
-
-        one_bnb_wei = int(1 * 1e18)
-
-        params = {
-            'tokenIn': Web3.to_checksum_address(WBNB),
-            'tokenOut': Web3.to_checksum_address(USDT_CONTRACT),
-            'amountIn': one_bnb_wei,
-            'fee': 500,  # 0.05% fee pool
-            'sqrtPriceLimitX96': 0
-        }
-
-        result = quoter_v2_contract.functions.quoteExactInputSingle(params).call()
-        usdt_out = result[0] / 1e18
+    print("\n💰 FETCHING CURRENT BNB PRICE (V3 0.05% Pool)...")
 
-        # Also get Chainlink for comparison
-        try:
-            chainlink_data = chainlink_contract.functions.latestRoundData().call()
-            chainlink_price = chainlink_data[1] / 1e8
-            diff = usdt_out - chainlink_price
-            diff_pct = (diff / chainlink_price) * 100
-        except:
-            chainlink_price = None
-            diff = 0
-            diff_pct = 0
-
-        print("\n" + "=" * 60)
-        print("💎 BNB/USD PRICE")
-        print("=" * 60)
-        print(f"🥞 V3 0.05% Pool:   ${usdt_out:.2f}")
+    info = ctx.price_oracle.get_price_info()
+    usdt_out = info['v3_price']
+    chainlink_price = info['chainlink_price']
 
+    if not usdt_out:
         if chainlink_price:
-            print(f"📊 Chainlink:        ${chainlink_price:.2f}")
-            print(f"📈 Difference:     ${diff:+.2f} ({diff_pct:+.3f}%)")
+            print(f"⚠️ Falling back to Chainlink: ${chainlink_price:.2f}")
+            return chainlink_price
+        print("❌ All price sources failed!")
+        return None
 
-        print("=" * 60)
-        print(f"✅ Using V3 price: ${usdt_out:.2f}")
-        print("=" * 60)
+    print("\n" + "=" * 60)
+    print("💎 BNB/USD PRICE")
+    print("=" * 60)
+    print(f"🥞 V3 0.05% Pool:   ${usdt_out:.2f}")
 
-        return usdt_out
+    if chainlink_price:
+        diff = usdt_out - chainlink_price
+        diff_pct = (diff / chainlink_price) * 100
+        print(f"📊 Chainlink:        ${chainlink_price:.2f}")
+        print(f"📈 Difference:     ${diff:+.2f} ({diff_pct:+.3f}%)")
 
-    except Exception as e:
-        print(f"❌ Error fetching V3 price: {e}")
+    print(f"🧱 Block: {info['block_number']}")
+    if info['stale']:
+        print("⚠️ Price is stale (no successful refresh recently)")
 
-        # Fallback to Chainlink
-        try:
-            chainlink_data = chainlink_contract.functions.latestRoundData().call()
-            price = chainlink_data[1] / 1e8
-            print(f"⚠️ Falling back to Chainlink: ${price:.2f}")
-            return price
-        except:
-            print("❌ All price sources failed!")
-            return None
+    print("=" * 60)
+    print(f"✅ Using V3 price: ${usdt_out:.2f}")
+    print("=" * 60)
+
+    return usdt_out
 
 
 def send_telegram_message(message):
@@ -2139,8 +2070,7 @@ def main():
         swap_manager,
         betting_manager,
         wallet_manager,
-        web3,  # Your global web3 instance
-        chainlink_contract,  # Your global chainlink_contract
+        ctx,  # Shared chain context (web3, contracts, price oracle, nonces - built on first use)
         USDT_CONTRACT,  # Pass USDT address string (not contract object)
         WBNB  # Pass WBNB address string
     )
@@ -2157,23 +2087,28 @@ def main():
         swap_manager,
         betting_manager,
         reward_manager,
-        limit_order_manager
+        limit_order_manager,
+        ctx
     )
     telegram_handler.set_bot_commands()
 
-    def telegram_monitor():
-        """INSTANT Telegram monitoring - NO DELAYS ⚡"""
+    def limit_order_monitor():
+        """Check limit orders about once per BSC block"""
         while True:
             try:
-                telegram_handler.process_commands()
                 limit_order_manager.check_and_execute_orders()
             except Exception as e:
-                print(f"⚠️ Telegram monitor error: {e}")
-                time.sleep(1)
+                print(f"⚠️ Limit order monitor error: {e}")
+            time.sleep(1)
 
-    # ✅ START THE TELEGRAM THREAD!
-    telegram_thread = threading.Thread(target=telegram_monitor, daemon=True)
+    # ✅ START THE TELEGRAM THREAD! (long-polls, commands run on worker pools)
+    telegram_thread = threading.Thread(target=telegram_handler.run, daemon=True)
     telegram_thread.start()
+
+    limit_order_thread = threading.Thread(target=limit_order_monitor, daemon=True)
+    limit_order_thread.start()
+
+    ctx.atr_engine.start()
     print("⚡ INSTANT Telegram monitor started!")
     print("⚡ Limit order monitor started!")
 
@@ -2206,10 +2141,10 @@ def main():
 
         if choice == '1':
             try:
-                main_address = Web3.to_checksum_address(MAIN_WALLET_ADDRESS)
-                bnb_balance = web3.eth.get_balance(main_address)
-                bnb_balance = web3.from_wei(bnb_balance, 'ether')
-                usdt_balance = usdt_contract.functions.balanceOf(main_address).call()
+                main_address = to_checksum_address(MAIN_WALLET_ADDRESS)
+                bnb_balance = ctx.web3.eth.get_balance(main_address)
+                bnb_balance = ctx.web3.from_wei(bnb_balance, 'ether')
+                usdt_balance = ctx.usdt_contract.functions.balanceOf(main_address).call()
                 usdt_balance = usdt_balance / 1e18
                 print(f"\n💰 MAIN WALLET BALANCE:")
                 print(f"📧 Address: {MAIN_WALLET_ADDRESS}")
@@ -2220,7 +2155,7 @@ def main():
 
         elif choice == '2':
             try:
-                bnb_balance = web3.eth.get_balance(Web3.to_checksum_address(MAIN_WALLET_ADDRESS)) / 1e18
+                bnb_balance = ctx.web3.eth.get_balance(to_checksum_address(MAIN_WALLET_ADDRESS)) / 1e18
                 print(f"\n💎 Main Wallet BNB Balance: {bnb_balance:.4f} BNB")
                 amount = float(input("Enter BNB amount to swap: "))
                 if amount <= 0 or amount > bnb_balance:
@@ -2232,8 +2167,8 @@ def main():
 
         elif choice == '3':
             try:
-                usdt_balance = usdt_contract.functions.balanceOf(
-                    Web3.to_checksum_address(MAIN_WALLET_ADDRESS)).call() / 1e18
+                usdt_balance = ctx.usdt_contract.functions.balanceOf(
+                    to_checksum_address(MAIN_WALLET_ADDRESS)).call() / 1e18
                 print(f"\n💵 Main Wallet USDT Balance: {usdt_balance:.4f} USDT")
                 amount = float(input("Enter USDT amount to swap: "))
                 if amount <= 0 or amount > usdt_balance:
@@ -2322,7 +2257,12 @@ def main():
                 print("❌ No wallets available.")
                 continue
             try:
-                wallet_idx = int(input("\nSelect wallet number: ")) - 1
+                wallet_idx = int(input("\nSelect wallet number (0 = audit all wallets): ")) - 1
+                if wallet_idx == -1:
+                    found = reward_manager.audit_rewards(wallet_manager.wallets)
+                    if any(found.values()) and input("\n🎁 Claim rewards of all wallets? (y/n): ").strip().lower() == 'y':
+                        reward_manager.claim_all_rewards(wallet_manager.wallets)
+                    continue
                 if wallet_idx < 0 or wallet_idx >= len(wallet_manager.wallets):
                     print("❌ Invalid wallet selection")
                     continue
@@ -2469,12 +2409,13 @@ def main():
             print("\n" + "=" * 80)
             print("💰 SUB-WALLETS BALANCE SUMMARY")
             print("=" * 80)
-            for wallet in wallet_manager.wallets:
-                # Skip main wallet
-                if Web3.to_checksum_address(wallet['address']) == Web3.to_checksum_address(MAIN_WALLET_ADDRESS):
-                    continue
-                # Get balances
-                wallet = wallet_manager.get_wallet_balances(wallet)
+            sub_wallets = [
+                w for w in wallet_manager.wallets
+                if to_checksum_address(w['address']) != to_checksum_address(MAIN_WALLET_ADDRESS)
+            ]
+            # All balances from one snapshot
+            wallet_manager.refresh_balances(sub_wallets)
+            for wallet in sub_wallets:
                 total_bnb += wallet['balance_bnb']
                 total_usdt += wallet['balance_usdt']
                 # Show individual wallet
@@ -2636,10 +2577,7 @@ def main():
 
                 # Create placeholder order
                 current_price = limit_order_manager.get_bnb_price()
-                tp_order_id = len(limit_order_manager.orders) + 1
-
                 tp_order = {
-                    'id': tp_order_id,
                     'wallet_idx': original_order['wallet_idx'],
                     'wallet_name': original_order['wallet_name'],
                     'wallet_address': original_order['wallet_address'],
@@ -2656,8 +2594,7 @@ def main():
                     'profit_target_usdt': profit_usdt
                 }
 
-                limit_order_manager.orders.append(tp_order)
-                limit_order_manager.save_orders()
+                tp_order_id = limit_order_manager.add_order(tp_order)
 
                 print(f"\n✅ TAKE-PROFIT ORDER #{tp_order_id} CREATED!")
                 print(f"⏳ Waiting for Order #{order_id} to execute...")
@@ -2927,12 +2864,8 @@ def main():
 
                 current_price = limit_order_manager.get_bnb_price()
 
-                tp_order_id = len(limit_order_manager.orders) + 1
-
                 tp_order = {
 
-                    'id': tp_order_id,
-
                     'wallet_idx': original_order['wallet_idx'],
 
                     'wallet_name': original_order['wallet_name'],
@@ -2963,9 +2896,7 @@ def main():
 
                 }
 
-                limit_order_manager.orders.append(tp_order)
-
-                limit_order_manager.save_orders()
+                tp_order_id = limit_order_manager.add_order(tp_order)
 
                 print(f"\n✅ TAKE-PROFIT ORDER #{tp_order_id} CREATED!")
 
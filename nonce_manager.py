@@ -0,0 +1,122 @@
+import threading
+import time
+from eth_account import Account
+from web3 import Web3
+
+
+class NonceManager:
+    """
+    Local per-address nonce counter.
+    The pending nonce is read from the node once, then handed out sequentially
+    so several transactions from one wallet can be sent back-to-back without
+    waiting for each receipt. The cache is dropped (and re-read from the node)
+    when a send fails, when the node reports a nonce conflict, or after the
+    address has been idle for `idle_resync` seconds (covers dropped txs).
+    Builders leave 'nonce' out and let send_transaction() take it, so a tx
+    that fails to build never holds one.
+
+    reserve() hands out a nonce for a tx that is signed now and broadcast
+    later (armed / burst bets). While an address holds reservations its
+    counter is never re-read, so the reserved nonces can't be handed out
+    twice; release() ends a reservation (an unsent nonce is given back).
+    """
+
+    NONCE_ERRORS = (
+        'nonce too low',
+        'nonce too high',
+        'invalid nonce',
+        'replacement transaction underpriced',
+    )
+
+    def __init__(self, web3, idle_resync=30):
+        self.web3 = web3
+        self.idle_resync = idle_resync
+        self.nonces = {}  # checksum address -> next nonce to hand out
+        self.last_used = {}  # checksum address -> time of last next_nonce()
+        self.addresses = {}  # private key -> checksum address
+        self.reserved = {}  # checksum address -> nonces reserved but not broadcast yet
+        self.stale = set()  # addresses to re-read once their reservations are released
+        self.lock = threading.Lock()
+
+    def _next(self, address):
+        now = time.time()
+        idle = now - self.last_used.get(address, 0) > self.idle_resync
+        if address not in self.nonces or (not self.reserved.get(address) and (idle or address in self.stale)):
+            self.nonces[address] = self.web3.eth.get_transaction_count(address, 'pending')
+            self.stale.discard(address)
+        nonce = self.nonces[address]
+        self.nonces[address] = nonce + 1
+        self.last_used[address] = now
+        return nonce
+
+    def next_nonce(self, address):
+        """Reserve the next nonce for address"""
+        with self.lock:
+            return self._next(Web3.to_checksum_address(address))
+
+    def reserve(self, address):
+        """Next nonce for a tx broadcast later; held until release()"""
+        address = Web3.to_checksum_address(address)
+        with self.lock:
+            nonce = self._next(address)
+            self.reserved.setdefault(address, set()).add(nonce)
+            return nonce
+
+    def release(self, address, nonce, sent=True):
+        """End a reservation. An unsent nonce is handed out again (or the address re-read)."""
+        address = Web3.to_checksum_address(address)
+        with self.lock:
+            reserved = self.reserved.get(address, set())
+            reserved.discard(nonce)
+            if not reserved:
+                self.reserved.pop(address, None)
+            if sent:
+                return
+            if self.nonces.get(address) == nonce + 1:
+                self.nonces[address] = nonce
+            elif reserved:
+                self.stale.add(address)
+            else:
+                self.nonces.pop(address, None)
+
+    def resync(self, address):
+        """Forget the cached nonce; the next call re-reads the pending nonce (deferred while reservations are held)"""
+        address = Web3.to_checksum_address(address)
+        with self.lock:
+            if self.reserved.get(address):
+                self.stale.add(address)
+            else:
+                self.nonces.pop(address, None)
+
+    def address_for(self, private_key):
+        if private_key not in self.addresses:
+            self.addresses[private_key] = Account.from_key(private_key).address
+        return self.addresses[private_key]
+
+    def send_transaction(self, tx, private_key):
+        """
+        Sign and broadcast tx. Fills in the nonce if the tx has none.
+        On a nonce conflict the tx is re-signed once with a fresh nonce.
+        Returns the tx hash.
+        """
+        address = self.address_for(private_key)
+        if 'nonce' not in tx:
+            tx['nonce'] = self.next_nonce(address)
+
+        for attempt in range(2):
+            signed_tx = self.web3.eth.account.sign_transaction(tx, private_key)
+            try:
+                return self.web3.eth.send_raw_transaction(signed_tx.raw_transaction)
+            except Exception as e:
+                message = str(e).lower()
+
+                # Same signed tx is already in the mempool - nonce was consumed
+                if 'already known' in message:
+                    return signed_tx.hash
+
+                self.resync(address)
+                if attempt == 0 and any(err in message for err in self.NONCE_ERRORS):
+                    print(f"⚠️ Nonce conflict ({e}), resyncing and retrying...")
+                    tx['nonce'] = self.next_nonce(address)
+                    continue
+                raise
@@ -0,0 +1,96 @@
+import heapq
+import itertools
+import threading
+
+
+class OrderTriggerIndex:
+    """
+    Pending limit orders keyed by trigger price.
+    Sell side (bnb_to_usdt) fires when price >= trigger -> min-heap.
+    Buy side (usdt_to_bnb) fires when price <= trigger -> max-heap (negated keys).
+    Removals are lazy: the live entry for each order id is tracked in
+    self.entries and stale heap items are skipped when they reach the top.
+    Safe to share between the Telegram workers and the limit order thread.
+    """
+
+    def __init__(self, orders=None):
+        self.sell_heap = []  # (trigger_price, seq, order_id)
+        self.buy_heap = []  # (-trigger_price, seq, order_id)
+        self.entries = {}  # order_id -> seq of its live heap item
+        self.counter = itertools.count()
+        self.lock = threading.RLock()
+        if orders:
+            self.rebuild(orders)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, order_id):
+        return order_id in self.entries
+
+    def rebuild(self, orders):
+        """Index every pending order (O(n), used on load)"""
+        with self.lock:
+            self.sell_heap = []
+            self.buy_heap = []
+            self.entries = {}
+            for order in orders:
+                if order.get('status') != 'pending':
+                    continue
+                seq = next(self.counter)
+                self.entries[order['id']] = seq
+                trigger_price = float(order['trigger_price'])
+                if order['swap_direction'] == 'bnb_to_usdt':
+                    self.sell_heap.append((trigger_price, seq, order['id']))
+                else:
+                    self.buy_heap.append((-trigger_price, seq, order['id']))
+            heapq.heapify(self.sell_heap)
+            heapq.heapify(self.buy_heap)
+
+    def add(self, order):
+        """Index (or re-index after a trigger change) a pending order"""
+        with self.lock:
+            if order.get('status') != 'pending':
+                self.remove(order['id'])
+                return
+
+            seq = next(self.counter)
+            self.entries[order['id']] = seq
+            trigger_price = float(order['trigger_price'])
+            if order['swap_direction'] == 'bnb_to_usdt':
+                heapq.heappush(self.sell_heap, (trigger_price, seq, order['id']))
+            else:
+                heapq.heappush(self.buy_heap, (-trigger_price, seq, order['id']))
+            self._compact()
+
+    def remove(self, order_id):
+        with self.lock:
+            self.entries.pop(order_id, None)
+
+    def pop_triggered(self, price):
+        """Remove and return ids of every order crossed by price"""
+        with self.lock:
+            triggered = []
+
+            while self.sell_heap and self.sell_heap[0][0] <= price:
+                _, seq, order_id = heapq.heappop(self.sell_heap)
+                if self.entries.get(order_id) == seq:
+                    del self.entries[order_id]
+                    triggered.append(order_id)
+
+            while self.buy_heap and -self.buy_heap[0][0] >= price:
+                _, seq, order_id = heapq.heappop(self.buy_heap)
+                if self.entries.get(order_id) == seq:
+                    del self.entries[order_id]
+                    triggered.append(order_id)
+
+            return triggered
+
+    def _compact(self):
+        # Drop stale items once they outnumber live ones
+        if len(self.sell_heap) + len(self.buy_heap) <= 2 * len(self.entries) + 64:
+            return
+        self.sell_heap = [item for item in self.sell_heap if self.entries.get(item[2]) == item[1]]
+        self.buy_heap = [item for item in self.buy_heap if self.entries.get(item[2]) == item[1]]
+        heapq.heapify(self.sell_heap)
+        heapq.heapify(self.buy_heap)
@@ -0,0 +1,97 @@
+import json
+import os
+import threading
+
+
+class OrderJournal:
+    """
+    Crash-safe persistence for the limit order book.
+
+    limit_orders.json holds the last snapshot (same format as before), and
+    limit_orders.journal holds one JSON line per order change since then.
+    Each change is a single appended line (O(1)), fsync'd before returning.
+    Every `compact_every` changes the full book is written to a temp file and
+    atomically swapped in with os.replace, then the journal is truncated.
+    A torn last line (crash mid-write) is dropped on replay.
+    """
+
+    def __init__(self, snapshot_file="limit_orders.json", journal_file=None, compact_every=500):
+        self.snapshot_file = snapshot_file
+        self.journal_file = journal_file or os.path.splitext(snapshot_file)[0] + ".journal"
+        self.compact_every = compact_every
+        self.lock = threading.Lock()
+        self.pending_events = 0
+
+    def load(self):
+        """Snapshot + journal replay -> list of orders in creation order"""
+        orders = []
+        if os.path.exists(self.snapshot_file):
+            with open(self.snapshot_file, 'r') as f:
+                orders = json.load(f)
+
+        by_id = {order['id']: order for order in orders}
+        if not os.path.exists(self.journal_file):
+            return orders
+
+        good_offset = 0
+        with open(self.journal_file, 'rb') as f:
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("torn write")
+                    event = json.loads(line)
+                    order = event['order']
+                except (ValueError, KeyError):
+                    print(f"⚠️ Order journal: dropping incomplete entry at byte {good_offset}")
+                    break
+
+                if order['id'] in by_id:
+                    by_id[order['id']].clear()
+                    by_id[order['id']].update(order)
+                else:
+                    by_id[order['id']] = order
+                    orders.append(order)
+
+                good_offset += len(line)
+                self.pending_events += 1
+
+        # Cut off anything after the last complete entry so new appends stay parseable
+        if good_offset != os.path.getsize(self.journal_file):
+            with open(self.journal_file, 'r+b') as f:
+                f.truncate(good_offset)
+
+        return orders
+
+    def record(self, order, orders=None):
+        """Append the current state of one order. Pass the full book to allow compaction."""
+        line = json.dumps({'op': 'upsert', 'order': order}, separators=(',', ':')) + "\n"
+
+        with self.lock:
+            with open(self.journal_file, 'a', encoding='utf-8') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            self.pending_events += 1
+
+            if orders is not None and self.pending_events >= self.compact_every:
+                self._compact(orders)
+
+    def compact(self, orders):
+        """Write a full snapshot atomically and reset the journal"""
+        with self.lock:
+            self._compact(orders)
+
+    def _compact(self, orders):
+        tmp_file = self.snapshot_file + ".tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump(orders, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.snapshot_file)
+
+        # Replaying the old journal over the new snapshot is harmless (upserts),
+        # so a crash before this truncate loses nothing
+        with open(self.journal_file, 'w') as f:
+            f.flush()
+            os.fsync(f.fileno())
+        self.pending_events = 0
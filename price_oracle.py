@@ -0,0 +1,198 @@
+import threading
+import time
+from web3 import Web3
+
+from multicall import Multicall
+
+
+class PriceOracle:
+    """
+    Shared BNB/USD price source.
+    Reads the V3 0.05% pool quote for 1 BNB and Chainlink latestRoundData
+    once per new block (one Multicall3 eth_call) and serves every caller
+    from that cache.
+
+    With a V3Pool (v3_pool.py) the pool state is snapshotted in that same
+    refresh instead, and the 1 BNB price and every quote_exact_input() are
+    computed locally; QuoterV2 is only called for sizes that run past the
+    snapshot or if the snapshot can't be read. mv5 only passes the pool once
+    v3_pool.verify_fixtures() passes on recorded QuoterV2 results.
+    """
+
+    def __init__(self, web3, quoter_contract, chainlink_contract, wbnb_address, usdt_address,
+                 multicall=None, fee=500, min_poll_interval=1.0, stale_after=30, pool=None):
+        self.web3 = web3
+        self.quoter = quoter_contract
+        self.chainlink = chainlink_contract
+        self.wbnb = Web3.to_checksum_address(wbnb_address)
+        self.usdt = Web3.to_checksum_address(usdt_address)
+        self.multicall = multicall or Multicall(web3)
+        self.fee = fee
+        self.pool = pool
+        self.snapshot = None  # pool snapshot for block_number
+        self.min_poll_interval = min_poll_interval  # seconds between eth_blockNumber checks
+        self.stale_after = stale_after  # seconds without a successful refresh
+
+        self.lock = threading.RLock()
+        self.block_number = None
+        self.v3_price = None
+        self.chainlink_price = None
+        self.chainlink_updated_at = None
+        self.refreshed_at = 0
+        self.last_block_check = 0
+        self.quote_cache = {}  # (token_in, token_out, amount_wei) -> amount_out for current block
+
+    def _quote_call(self, token_in, token_out, amount_wei):
+        params = {
+            'tokenIn': token_in,
+            'tokenOut': token_out,
+            'amountIn': amount_wei,
+            'fee': self.fee,
+            'sqrtPriceLimitX96': 0
+        }
+        return self.quoter.functions.quoteExactInputSingle(params)
+
+    def refresh(self, force=False):
+        """Re-read prices if a new block was produced since the last read"""
+        with self.lock:
+            now = time.time()
+            if not force and now - self.last_block_check < self.min_poll_interval:
+                return
+
+            self.last_block_check = now
+            block_number = self.web3.eth.block_number
+            if not force and block_number == self.block_number:
+                # Still the block we priced: the cached price is current
+                if self.v3_price or self.chainlink_price:
+                    self.refreshed_at = now
+                return
+
+            one_bnb_wei = int(1 * 1e18)
+            snapshot, chainlink_result = self._refresh_pool(block_number)
+            if snapshot:
+                quote_result = [self._local_quote(snapshot, self.wbnb, one_bnb_wei)]
+            else:
+                _, results = self.multicall.aggregate(
+                    [
+                        self._quote_call(self.wbnb, self.usdt, one_bnb_wei),
+                        self.chainlink.functions.latestRoundData()
+                    ],
+                    block_identifier=block_number
+                )
+                quote_result, chainlink_result = results
+
+            self.block_number = block_number
+            self.snapshot = snapshot
+            self.quote_cache = {}
+            self.v3_price = quote_result[0] / 1e18 if quote_result and quote_result[0] is not None else None
+
+            if chainlink_result:
+                self.chainlink_price = chainlink_result[1] / 1e8
+                self.chainlink_updated_at = chainlink_result[3]
+            else:
+                self.chainlink_price = None
+                self.chainlink_updated_at = None
+
+            if self.v3_price or self.chainlink_price:
+                self.refreshed_at = now
+
+    def _refresh_pool(self, block_number):
+        """(pool snapshot, latestRoundData) read together, or (None, None) to use QuoterV2"""
+        if self.pool is None:
+            return None, None
+        try:
+            snapshot, extra = self.pool.refresh(block_number, [self.chainlink.functions.latestRoundData()])
+            return snapshot, extra[0]
+        except Exception as e:
+            print(f"⚠️ V3 pool snapshot failed, using QuoterV2: {e}")
+            return None, None
+
+    def _local_quote(self, snapshot, token_in, amount_wei):
+        """Local amountOut, or None if the swap runs past the snapshot's ticks"""
+        from v3_pool import TickOutOfRange
+        try:
+            return snapshot.quote_exact_input(token_in, amount_wei)
+        except TickOutOfRange:
+            return None
+
+    def _safe_refresh(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            print(f"⚠️ Price oracle refresh failed: {e}")
+
+    def get_price(self):
+        """BNB/USD price: V3 pool first, Chainlink fallback, None if both are unavailable or older than stale_after"""
+        self._safe_refresh()
+        with self.lock:
+            if not self.refreshed_at or time.time() - self.refreshed_at > self.stale_after:
+                return None
+            return self.v3_price or self.chainlink_price
+
+    def get_price_info(self):
+        """Current price plus source and staleness metadata"""
+        self._safe_refresh()
+        with self.lock:
+            now = time.time()
+            price = self.v3_price or self.chainlink_price
+            return {
+                'price': price,
+                'source': 'v3' if self.v3_price else ('chainlink' if self.chainlink_price else None),
+                'v3_price': self.v3_price,
+                'chainlink_price': self.chainlink_price,
+                'chainlink_updated_at': self.chainlink_updated_at,
+                'chainlink_age': now - self.chainlink_updated_at if self.chainlink_updated_at else None,
+                'block_number': self.block_number,
+                'age': now - self.refreshed_at if self.refreshed_at else None,
+                'stale': price is None or now - self.refreshed_at > self.stale_after
+            }
+
+    def quote_exact_input(self, token_in, token_out, amount_wei):
+        """V3 QuoterV2 amountOut for any size (local pool math when possible), cached for the current block. Raises on failure."""
+        self._safe_refresh()
+        token_in = Web3.to_checksum_address(token_in)
+        token_out = Web3.to_checksum_address(token_out)
+        key = (token_in, token_out, amount_wei)
+
+        with self.lock:
+            if key in self.quote_cache:
+                return self.quote_cache[key]
+            block_number = self.block_number
+            snapshot = self.snapshot
+
+        amount_out = None
+        if snapshot and {token_in, token_out} == {snapshot.token0, snapshot.token1}:
+            amount_out = self._local_quote(snapshot, token_in, amount_wei)
+        if amount_out is None:
+            amount_out = self._quote_call(token_in, token_out, amount_wei).call(
+                block_identifier=block_number if block_number is not None else 'latest'
+            )[0]
+
+        with self.lock:
+            if block_number == self.block_number:
+                self.quote_cache[key] = amount_out
+        return amount_out
+
+    def quote_usdt_to_bnb(self, usdt_amount):
+        """Expected BNB for a USDT amount (V3 quote, Chainlink fallback, 0 if both fail)"""
+        try:
+            return self.quote_exact_input(self.usdt, self.wbnb, int(usdt_amount * 1e18)) / 1e18
+        except Exception as e:
+            print(f"⚠️ V3 Quoter error: {e}")
+            chainlink_price = self.chainlink_price
+            if chainlink_price:
+                print(f"⚠️ Falling back to Chainlink price...")
+                return usdt_amount / chainlink_price
+            print(f"❌ Chainlink also failed!")
+            return 0
+
+    def quote_bnb_to_usdt(self, bnb_amount):
+        """Expected USDT for a BNB amount (V3 quote, Chainlink fallback, 0 if both fail)"""
+        try:
+            return self.quote_exact_input(self.wbnb, self.usdt, int(bnb_amount * 1e18)) / 1e18
+        except Exception as e:
+            print(f"⚠️ V3 Quoter error: {e}")
+            chainlink_price = self.chainlink_price
+            if chainlink_price:
+                return bnb_amount * chainlink_price
+            return 0
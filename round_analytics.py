@@ -0,0 +1,218 @@
+import collections
+
+import numpy as np
+
+from round_store import BULL, BEAR
+
+SIDE_NAMES = {BULL: "BULL", BEAR: "BEAR"}
+
+
+def run_lengths(winners, epochs=None):
+    """
+    Run-length encoding of a winner column: (values, starts, lengths).
+    With epochs, a run also ends wherever the next stored epoch is not the next round.
+    """
+    if not len(winners):
+        empty = np.zeros(0, dtype=np.int64)
+        return winners[:0], empty, empty
+    breaks = winners[1:] != winners[:-1]
+    if epochs is not None:
+        breaks |= np.diff(epochs.astype(np.int64)) != 1
+    starts = np.flatnonzero(np.append(True, breaks))
+    lengths = np.diff(np.append(starts, len(winners)))
+    return winners[starts], starts, lengths
+
+
+class RoundAnalytics:
+    """
+    Streak / win-rate / payout analytics over the whole RoundStore.
+
+    The alert state (current streak, longest streaks, wins in the last
+    `window` epochs) is kept as running counters: sync() only feeds the
+    rounds added since the last call, and falls back to one vectorized
+    rebuild when older rounds were back-filled in between.
+    report() computes the full-history statistics with NumPy run-length
+    encoding. Streaks never span an epoch missing from the store.
+    """
+
+    def __init__(self, round_store, window=24):
+        self.round_store = round_store
+        self.window = window
+        self.processed = 0  # rows of the store already counted
+        self.last_epoch = None
+        self.streak_side = None  # BULL / BEAR
+        self.streak_length = 0
+        self.longest = {BULL: 0, BEAR: 0}
+        self.recent = collections.deque()  # (epoch, winner) of the last `window` epochs
+        self.window_wins = {BULL: 0, BEAR: 0}
+
+    def sync(self):
+        """Update the counters with rounds stored since the last call; returns rounds added"""
+        rows = self.round_store.rows
+        added = len(rows) - self.processed
+        if added <= 0:
+            return 0
+
+        in_order = self.processed == 0 or rows['epoch'][self.processed - 1] == self.last_epoch
+        if not in_order or added > self.window:
+            self._rebuild(rows)
+        else:
+            for epoch, winner in zip(rows['epoch'][self.processed:], rows['winner'][self.processed:]):
+                self._push(int(epoch), int(winner))
+
+        self.processed = len(rows)
+        self.last_epoch = int(rows['epoch'][-1])
+        return added
+
+    def _push(self, epoch, winner):
+        if winner == self.streak_side and self.last_epoch is not None and epoch == self.last_epoch + 1:
+            self.streak_length += 1
+        else:
+            self.streak_side = winner
+            self.streak_length = 1
+        self.longest[winner] = max(self.longest[winner], self.streak_length)
+        self.last_epoch = epoch
+
+        while self.recent and self.recent[0][0] <= epoch - self.window:
+            self.window_wins[self.recent.popleft()[1]] -= 1
+        self.recent.append((epoch, winner))
+        self.window_wins[winner] += 1
+
+    def _rebuild(self, rows):
+        winners = rows['winner']
+        values, _, lengths = run_lengths(winners, rows['epoch'])
+        self.streak_side = int(values[-1])
+        self.streak_length = int(lengths[-1])
+        for side in (BULL, BEAR):
+            side_lengths = lengths[values == side]
+            self.longest[side] = int(side_lengths.max()) if len(side_lengths) else 0
+
+        tail = self.round_store.recent(self.window)
+        self.recent = collections.deque((int(e), int(w)) for e, w in zip(tail['epoch'], tail['winner']))
+        self.window_wins = {side: int(np.count_nonzero(tail['winner'] == side)) for side in (BULL, BEAR)}
+
+    @property
+    def current_streak(self):
+        """("BULL"/"BEAR", length) of the streak ending at the latest round"""
+        return SIDE_NAMES.get(self.streak_side), self.streak_length
+
+    def window_summary(self):
+        """Wins and price trend over the last `window` epochs (None if no rounds yet)"""
+        rows = self.round_store.recent(self.window)
+        if not len(rows):
+            return None
+        return {
+            'rounds': len(rows),
+            'bull_wins': self.window_wins[BULL],
+            'bear_wins': self.window_wins[BEAR],
+            'first_price': float(rows['lock_price'][0]),
+            'last_price': float(rows['close_price'][-1]),
+        }
+
+    def report(self, max_streak=10, rolling=288):
+        """
+        Full-history statistics:
+          streaks    - {"BULL": {length: count}, "BEAR": {...}} of completed streaks
+          continue   - {"BULL": {n: (rate, samples)}, ...} chance the next round
+                       extends a streak that has reached n rounds
+          rolling    - bull share over the last `rolling` rounds (latest / min / max)
+          payouts    - mean / median / p10 / p90 of the winning side payout, per side means
+        """
+        rows = self.round_store.rows
+        if not len(rows):
+            return None
+
+        winners = rows['winner']
+        values, starts, lengths = run_lengths(winners, rows['epoch'])
+
+        # The last streak is still running, and a streak next to a missing
+        # epoch has an unknown length: leave both out of the distributions
+        gap_after = np.append(np.diff(rows['epoch'].astype(np.int64)) != 1, False)
+        ends = starts + lengths - 1
+        done = ~(gap_after[ends] | np.append(False, gap_after[starts[1:] - 1]))
+        done[-1] = False
+        done_values, done_lengths = values[done], lengths[done]
+
+        streaks = {}
+        continuation = {}
+        for side in (BULL, BEAR):
+            side_lengths = done_lengths[done_values == side]
+            counts = np.bincount(side_lengths, minlength=max_streak + 2)
+            streaks[SIDE_NAMES[side]] = {int(n): int(c) for n, c in enumerate(counts) if c and n}
+
+            # reached[n] = streaks that got to >= n rounds
+            reached = np.cumsum(counts[::-1])[::-1]
+            continuation[SIDE_NAMES[side]] = {
+                n: (float(reached[n + 1] / reached[n]), int(reached[n]))
+                for n in range(1, max_streak + 1) if reached[n]
+            }
+
+        is_bull = (winners == BULL).astype(np.float64)
+        window = min(rolling, len(winners))
+        cumulative = np.concatenate(([0.0], np.cumsum(is_bull)))
+        rolling_share = (cumulative[window:] - cumulative[:-window]) / window
+
+        winning_payout = np.where(winners == BULL, rows['bull_payout'], rows['bear_payout'])
+        winning_payout = winning_payout[winning_payout > 0]
+        p10, p50, p90 = np.percentile(winning_payout, [10, 50, 90]) if len(winning_payout) else (0, 0, 0)
+
+        return {
+            'rounds': len(rows),
+            'bull_rate': float(is_bull.mean()),
+            'current_streak': (SIDE_NAMES[int(values[-1])], int(lengths[-1])),
+            'longest': {SIDE_NAMES[side]: int(lengths[values == side].max()) if np.any(values == side) else 0
+                        for side in (BULL, BEAR)},
+            'streaks': streaks,
+            'continue': continuation,
+            'rolling': {
+                'window': window,
+                'latest': float(rolling_share[-1]),
+                'min': float(rolling_share.min()),
+                'max': float(rolling_share.max()),
+            },
+            'payouts': {
+                'winning_mean': float(winning_payout.mean()) if len(winning_payout) else 0,
+                'winning_median': float(p50),
+                'winning_p10': float(p10),
+                'winning_p90': float(p90),
+                'bull_mean': float(rows['bull_payout'][rows['bull_payout'] > 0].mean()) if np.any(rows['bull_payout'] > 0) else 0,
+                'bear_mean': float(rows['bear_payout'][rows['bear_payout'] > 0].mean()) if np.any(rows['bear_payout'] > 0) else 0,
+            }
+        }
+
+    def print_report(self, max_streak=10, rolling=288):
+        report = self.report(max_streak, rolling)
+        if not report:
+            print("📋 No rounds stored yet")
+            return
+
+        print("\n" + "=" * 70)
+        print(f"📊 ROUND ANALYTICS ({report['rounds']} rounds)")
+        print("=" * 70)
+        side, length = report['current_streak']
+        print(f"🟢 Bull rate: {report['bull_rate'] * 100:.2f}% | 🔥 Current streak: {side} x{length}")
+        print(f"🏆 Longest: BULL x{report['longest']['BULL']} | BEAR x{report['longest']['BEAR']}")
+
+        print(f"\n{'Streak':<8} {'BULL runs':<10} {'BEAR runs':<10} {'BULL cont.':<14} {'BEAR cont.':<14}")
+        for n in range(1, max_streak + 1):
+            bull_cont = report['continue']['BULL'].get(n)
+            bear_cont = report['continue']['BEAR'].get(n)
+            print(f"{n:<8} {report['streaks']['BULL'].get(n, 0):<10} {report['streaks']['BEAR'].get(n, 0):<10} "
+                  f"{f'{bull_cont[0] * 100:.1f}% ({bull_cont[1]})' if bull_cont else '-':<14} "
+                  f"{f'{bear_cont[0] * 100:.1f}% ({bear_cont[1]})' if bear_cont else '-':<14}")
+
+        rolling_stats = report['rolling']
+        print(f"\n📈 Rolling bull share ({rolling_stats['window']} rounds): latest {rolling_stats['latest'] * 100:.1f}% | "
+              f"min {rolling_stats['min'] * 100:.1f}% | max {rolling_stats['max'] * 100:.1f}%")
+        payouts = report['payouts']
+        print(f"💰 Winning payout: avg {payouts['winning_mean']:.2f}x | median {payouts['winning_median']:.2f}x | "
+              f"p10 {payouts['winning_p10']:.2f}x | p90 {payouts['winning_p90']:.2f}x")
+        print(f"💰 Avg payout: Bull {payouts['bull_mean']:.2f}x | Bear {payouts['bear_mean']:.2f}x")
+        print("=" * 70)
+
+
+if __name__ == "__main__":
+    import sys
+    from round_store import RoundStore
+
+    RoundAnalytics(RoundStore(sys.argv[1] if len(sys.argv) > 1 else "rounds.bin")).print_report()
@@ -0,0 +1,217 @@
+import json
+import os
+import threading
+
+import numpy as np
+
+
+ROUND_DTYPE = np.dtype([
+    ('epoch', '<u8'),
+    ('start_ts', '<u8'),
+    ('lock_ts', '<u8'),
+    ('close_ts', '<u8'),
+    ('lock_price', '<f8'),  # USD, oracle 8 decimals already applied
+    ('close_price', '<f8'),
+    ('total_amount', '<f8'),  # BNB
+    ('bull_amount', '<f8'),
+    ('bear_amount', '<f8'),
+    ('bull_payout', '<f8'),
+    ('bear_payout', '<f8'),
+    ('max_bull_bet', '<f8'),
+    ('max_bear_bet', '<f8'),
+    ('winner', '<i1'),  # 1 = BULL, -1 = BEAR
+    ('reward_base_cal_amount', '<f8'),  # BNB on the winning side
+    ('reward_amount', '<f8'),  # BNB paid out to winners
+    ('bull_bets', '<u4'),  # number of BetBull events (0 if bets were not scanned)
+    ('bear_bets', '<u4'),
+    ('claimed_amount', '<f8'),  # Claim events seen while the round was backfilled
+    ('claims', '<u4'),
+])
+
+BULL = 1
+BEAR = -1
+
+
+class RoundStore:
+    """
+    Append-only columnar history of every finished prediction round.
+
+    On disk: a magic header followed by fixed-size little-endian records
+    (ROUND_DTYPE), so an append is a single small write and loading months of
+    rounds is one np.fromfile. In memory the rows live in a NumPy structured
+    array with spare capacity; columns (store['close_price'], store['winner'])
+    are zero-copy views for vectorized statistics.
+    """
+
+    MAGIC = b"RNDSTR1\0"
+
+    def __init__(self, path="rounds.bin"):
+        self.path = path
+        self.buffer = np.zeros(1024, dtype=ROUND_DTYPE)
+        self.size = 0
+        self.lock = threading.RLock()
+        self._load()
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, column):
+        return self.rows[column]
+
+    def __contains__(self, epoch):
+        epochs = self.rows['epoch']
+        i = np.searchsorted(epochs, epoch)
+        return bool(i < len(epochs) and epochs[i] == epoch)
+
+    @property
+    def rows(self):
+        """All rounds, sorted by epoch (view, do not modify)"""
+        return self.buffer[:self.size]
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            with open(self.path, 'wb') as f:
+                f.write(self.MAGIC)
+            return
+
+        with open(self.path, 'rb') as f:
+            header = f.read(len(self.MAGIC))
+        if header != self.MAGIC:
+            print(f"⚠️ {self.path} is not a round store, starting fresh")
+            with open(self.path, 'wb') as f:
+                f.write(self.MAGIC)
+            return
+
+        body_size = os.path.getsize(self.path) - len(self.MAGIC)
+        count = body_size // ROUND_DTYPE.itemsize
+        records = np.fromfile(self.path, dtype=ROUND_DTYPE, count=count, offset=len(self.MAGIC))
+
+        # Sort by epoch; a re-fetched epoch keeps its latest record
+        order = np.argsort(records['epoch'], kind='stable')
+        records = records[order]
+        if len(records):
+            last_of_epoch = np.append(records['epoch'][1:] != records['epoch'][:-1], True)
+            records = records[last_of_epoch]
+
+        self._reserve(len(records))
+        self.buffer[:len(records)] = records
+        self.size = len(records)
+
+        # Drop a torn trailing record so the next append stays aligned
+        if body_size % ROUND_DTYPE.itemsize:
+            with open(self.path, 'r+b') as f:
+                f.truncate(len(self.MAGIC) + count * ROUND_DTYPE.itemsize)
+
+    def _reserve(self, size):
+        if size > len(self.buffer):
+            grown = np.zeros(max(size, 2 * len(self.buffer)), dtype=ROUND_DTYPE)
+            grown[:self.size] = self.buffer[:self.size]
+            self.buffer = grown
+
+    @staticmethod
+    def to_record(round_info):
+        """Round dict (fetch_single_round_data format) -> one ROUND_DTYPE record"""
+        record = np.zeros(1, dtype=ROUND_DTYPE)
+        for name in ROUND_DTYPE.names:
+            if name == 'winner':
+                record['winner'] = BULL if round_info.get('winner') == 'BULL' else BEAR
+            elif name in ('lock_price', 'close_price'):
+                record[name] = round_info.get(f'{name}_usdt', round_info.get(name, 0))
+            else:
+                record[name] = round_info.get(name) or 0
+        return record
+
+    def append(self, round_info):
+        """Persist one finished round (O(1) amortized)"""
+        self.extend([round_info])
+
+    def extend(self, rounds):
+        """Persist several rounds with a single write"""
+        records = [self.to_record(round_info) for round_info in rounds]
+        if not records:
+            return
+
+        with self.lock:
+            with open(self.path, 'ab') as f:
+                f.write(b"".join(record.tobytes() for record in records))
+            for record in records:
+                self._insert(record)
+
+    def _insert(self, record):
+        epoch = record['epoch'][0]
+        epochs = self.rows['epoch']
+        i = np.searchsorted(epochs, epoch)
+        if i < self.size and epochs[i] == epoch:
+            self.buffer[i] = record[0]
+            return
+
+        self._reserve(self.size + 1)
+        if i < self.size:
+            # Back-filled hole: shift the newer rounds (rare, history normally grows at the end)
+            self.buffer[i + 1:self.size + 1] = self.buffer[i:self.size]
+        self.buffer[i] = record[0]
+        self.size += 1
+
+    def missing(self, epochs):
+        """Epochs from the given list that are not stored yet"""
+        epochs = np.asarray(epochs, dtype=np.uint64)
+        return [int(e) for e in epochs[~np.isin(epochs, self.rows['epoch'])]]
+
+    def tail(self, n):
+        return self.rows[-n:] if n else self.rows[:0]
+
+    def recent(self, n):
+        """Rounds of the last n epochs up to the newest stored one (epochs that are missing are left out)"""
+        rows = self.rows
+        if not n or not len(rows):
+            return rows[:0]
+        first_epoch = int(rows['epoch'][-1]) - n + 1
+        return rows[np.searchsorted(rows['epoch'], max(first_epoch, 0)):]
+
+    @staticmethod
+    def to_dicts(records):
+        """Records -> the round dicts the viewer and notifications display"""
+        rounds = []
+        for r in records:
+            lock_price = float(r['lock_price'])
+            close_price = float(r['close_price'])
+            rounds.append({
+                'epoch': int(r['epoch']),
+                'start_ts': int(r['start_ts']),
+                'lock_ts': int(r['lock_ts']),
+                'close_ts': int(r['close_ts']),
+                'lock_price': lock_price,
+                'close_price': close_price,
+                'lock_price_usdt': lock_price,
+                'close_price_usdt': close_price,
+                'price_change_usdt': close_price - lock_price,
+                'bull_payout': float(r['bull_payout']),
+                'bear_payout': float(r['bear_payout']),
+                'winner': "BULL" if r['winner'] == BULL else "BEAR",
+                'total_amount': float(r['total_amount']),
+                'bull_amount': float(r['bull_amount']),
+                'bear_amount': float(r['bear_amount']),
+                'max_bull_bet': float(r['max_bull_bet']),
+                'max_bear_bet': float(r['max_bear_bet']),
+                'reward_base_cal_amount': float(r['reward_base_cal_amount']),
+                'reward_amount': float(r['reward_amount']),
+                'bull_bets': int(r['bull_bets']),
+                'bear_bets': int(r['bear_bets']),
+                'claimed_amount': float(r['claimed_amount']),
+                'claims': int(r['claims'])
+            })
+        return rounds
+
+    def import_json_cache(self, cache_file):
+        """One-off import of the old rounds_cache.json (24-round JSON cache)"""
+        if not os.path.exists(cache_file):
+            return 0
+        try:
+            with open(cache_file, 'r') as f:
+                rounds = json.load(f).get('rounds_history', [])
+        except Exception as e:
+            print(f"⚠️ Error reading {cache_file}: {e}")
+            return 0
+        rounds = [r for r in rounds if r.get('epoch') is not None and r['epoch'] not in self]
+        self.extend(sorted(rounds, key=lambda r: r['epoch']))
+        return len(rounds)
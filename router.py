@@ -0,0 +1,470 @@
+"""
+Best-execution routing for one token pair across the PancakeSwap V3 fee
+tiers and the V2 pair. Every venue is snapshotted at the same block and
+quoted locally (v3_pool.py math, V2 constant product), a large order is
+split greedily across venues by marginal output, and routes are compared
+on output net of gas. Routes execute as one Smart Router transaction.
+
+    python router.py --record router_states.json   # all venue snapshots at one block (needs RPC)
+    python router.py --bench router_states.json    # route a size ladder offline against them
+"""
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from eth_utils import to_checksum_address
+
+from v3_pool import PoolSnapshot, TickOutOfRange, V3Pool
+
+PANCAKE_V2_FACTORY = "0xcA143Ce32Fe78f1f7019d7d551a6402fC5350c73"
+V3_FEE_TIERS = (100, 500, 2500)
+V2_FEE_BPS = 25
+
+# Rough gas per route: a fixed part plus one per pool touched (only differences between routes matter)
+BASE_GAS = 60000
+LEG_GAS = {'v3': 100000, 'v2': 80000}
+
+# Smart Router recipient placeholder for "the router itself" (so it can unwrapWETH9 the output)
+ADDRESS_THIS = "0x0000000000000000000000000000000000000002"
+
+V2_FACTORY_ABI = [
+    {
+        "constant": True,
+        "inputs": [
+            {"internalType": "address", "name": "", "type": "address"},
+            {"internalType": "address", "name": "", "type": "address"}
+        ],
+        "name": "getPair",
+        "outputs": [{"internalType": "address", "name": "", "type": "address"}],
+        "stateMutability": "view",
+        "type": "function"
+    }
+]
+
+V2_PAIR_ABI = [
+    {
+        "constant": True,
+        "inputs": [],
+        "name": "getReserves",
+        "outputs": [
+            {"internalType": "uint112", "name": "_reserve0", "type": "uint112"},
+            {"internalType": "uint112", "name": "_reserve1", "type": "uint112"},
+            {"internalType": "uint32", "name": "_blockTimestampLast", "type": "uint32"}
+        ],
+        "stateMutability": "view",
+        "type": "function"
+    },
+    {
+        "constant": True,
+        "inputs": [],
+        "name": "token0",
+        "outputs": [{"internalType": "address", "name": "", "type": "address"}],
+        "stateMutability": "view",
+        "type": "function"
+    },
+    {
+        "constant": True,
+        "inputs": [],
+        "name": "token1",
+        "outputs": [{"internalType": "address", "name": "", "type": "address"}],
+        "stateMutability": "view",
+        "type": "function"
+    }
+]
+
+
+class PairSnapshot:
+    """V2 pair reserves at one block"""
+
+    def __init__(self, block_number, token0, token1, reserve0, reserve1, fee_bps=V2_FEE_BPS):
+        self.block_number = block_number
+        self.token0 = to_checksum_address(token0)
+        self.token1 = to_checksum_address(token1)
+        self.reserve0 = reserve0
+        self.reserve1 = reserve1
+        self.fee_bps = fee_bps
+
+    def quote_exact_input(self, token_in, amount_in):
+        """PancakeLibrary.getAmountOut"""
+        token_in = to_checksum_address(token_in)
+        if token_in == self.token0:
+            reserve_in, reserve_out = self.reserve0, self.reserve1
+        elif token_in == self.token1:
+            reserve_in, reserve_out = self.reserve1, self.reserve0
+        else:
+            raise ValueError(f"{token_in} is not in this pair")
+        amount_in_with_fee = amount_in * (10000 - self.fee_bps)
+        return amount_in_with_fee * reserve_out // (reserve_in * 10000 + amount_in_with_fee)
+
+    def to_dict(self):
+        return {
+            'block_number': self.block_number,
+            'token0': self.token0,
+            'token1': self.token1,
+            'reserve0': str(self.reserve0),
+            'reserve1': str(self.reserve1),
+            'fee_bps': self.fee_bps,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['block_number'], data['token0'], data['token1'],
+                   int(data['reserve0']), int(data['reserve1']), data['fee_bps'])
+
+
+class V2Pair:
+    """Per-block reserves of one V2 pair (one Multicall3 eth_call)"""
+
+    def __init__(self, web3, multicall, token_a, token_b, pair_address=None, factory_address=PANCAKE_V2_FACTORY):
+        self.web3 = web3
+        self.multicall = multicall
+        self.token_a = to_checksum_address(token_a)
+        self.token_b = to_checksum_address(token_b)
+        self.factory_address = factory_address
+        self.pair_address = to_checksum_address(pair_address) if pair_address else None
+        self.contract = None
+        self.tokens = None
+        self.snapshot = None
+        self.lock = threading.RLock()
+
+    def _pair(self):
+        if self.contract is None:
+            if self.pair_address is None:
+                factory = self.web3.eth.contract(address=to_checksum_address(self.factory_address), abi=V2_FACTORY_ABI)
+                self.pair_address = factory.functions.getPair(self.token_a, self.token_b).call()
+            self.contract = self.web3.eth.contract(address=self.pair_address, abi=V2_PAIR_ABI)
+        return self.contract
+
+    def refresh(self, block_number, extra_calls=()):
+        """Reserves at block_number (no-op if already there); returns (snapshot, extra results) like V3Pool"""
+        with self.lock:
+            extra_calls = list(extra_calls)
+            if self.snapshot and self.snapshot.block_number == block_number and not extra_calls:
+                return self.snapshot, []
+
+            pair = self._pair().functions
+            calls = [pair.getReserves()]
+            if self.tokens is None:
+                calls += [pair.token0(), pair.token1()]
+            _, results = self.multicall.aggregate(calls + extra_calls, block_identifier=block_number)
+            if results[0] is None:
+                raise RuntimeError(f"getReserves failed at block {block_number}")
+            if self.tokens is None:
+                self.tokens = (results[1], results[2])
+
+            self.snapshot = PairSnapshot(block_number, *self.tokens, results[0][0], results[0][1])
+            return self.snapshot, results[len(calls):]
+
+
+class Route:
+    """How an order is filled: legs of (venue, amount in, amount out), judged on output net of gas"""
+
+    def __init__(self, token_in, token_out, amount_in, legs, gas, gas_cost_out):
+        self.token_in = token_in
+        self.token_out = token_out
+        self.amount_in = amount_in
+        self.legs = legs  # [(venue name, amount_in, amount_out)]
+        self.amount_out = sum(leg[2] for leg in legs)
+        self.gas = gas
+        self.gas_cost_out = gas_cost_out  # gas cost in token_out wei
+        self.net_out = self.amount_out - gas_cost_out
+
+    @property
+    def is_split(self):
+        return len(self.legs) > 1
+
+    def describe(self):
+        return " + ".join(f"{name} {amount_in / self.amount_in:.0%}" for name, amount_in, _ in self.legs)
+
+
+def venue_kind(name):
+    return 'v2' if name == 'v2' else 'v3'
+
+
+def venue_fee(name):
+    return int(name.split('-')[1]) if name != 'v2' else None
+
+
+def _safe_quote(snapshot, token_in, amount_in):
+    """Local amount out, or None if the snapshot can't price this size"""
+    if amount_in == 0:
+        return 0
+    try:
+        return snapshot.quote_exact_input(token_in, amount_in)
+    except TickOutOfRange:
+        return None
+
+
+def find_route(snapshots, token_in, token_out, amount_in, gas_price=0, native=None, split_parts=20):
+    """
+    Best route for amount_in of token_in over venue snapshots ({name: snapshot}).
+    Single-venue routes are always candidates; with split_parts > 1 the order
+    is also filled in split_parts chunks, each chunk going to the venue with
+    the highest marginal output (opening a venue costs its leg gas).
+    gas_price / native (wrapped native token) let gas be charged in token_out.
+    Returns None if no venue can fill the order.
+    """
+    def gas_cost_out(gas, reference_out):
+        if not gas_price:
+            return 0
+        gas_wei = gas * gas_price
+        if native and to_checksum_address(token_out) == native:
+            return gas_wei
+        if native and to_checksum_address(token_in) == native:
+            return gas_wei * reference_out // amount_in  # at the route's own price
+        return 0
+
+    def make_route(allocation):
+        legs = []
+        for name, amount in allocation.items():
+            if amount:
+                out = _safe_quote(snapshots[name], token_in, amount)
+                if out is None:
+                    return None
+                legs.append((name, amount, out))
+        if not legs:
+            return None
+        legs.sort(key=lambda leg: -leg[1])
+        gas = BASE_GAS + sum(LEG_GAS[venue_kind(name)] for name, _, _ in legs)
+        return Route(token_in, token_out, amount_in, legs, gas, gas_cost_out(gas, sum(leg[2] for leg in legs)))
+
+    candidates = [make_route({name: amount_in}) for name in snapshots]
+    candidates = [route for route in candidates if route]
+
+    if split_parts > 1 and len(snapshots) > 1:
+        best_single = max(candidates, key=lambda route: route.amount_out, default=None)
+        price_ref = best_single.amount_out if best_single else 0
+        chunk = amount_in // split_parts
+        allocation = {name: 0 for name in snapshots}
+        outputs = {name: 0 for name in snapshots}
+        for part in range(split_parts):
+            size = chunk if part < split_parts - 1 else amount_in - chunk * (split_parts - 1)
+            best_name, best_gain, best_out = None, None, None
+            for name in snapshots:
+                out = _safe_quote(snapshots[name], token_in, allocation[name] + size)
+                if out is None:
+                    continue
+                gain = out - outputs[name]
+                if not allocation[name]:
+                    gain -= gas_cost_out(LEG_GAS[venue_kind(name)], price_ref)
+                if best_gain is None or gain > best_gain:
+                    best_name, best_gain, best_out = name, gain, out
+            if best_name is None:
+                break
+            allocation[best_name] += size
+            outputs[best_name] = best_out
+        else:
+            split_route = make_route(allocation)
+            if split_route:
+                candidates.append(split_route)
+
+    return max(candidates, key=lambda route: route.net_out, default=None)
+
+
+class SwapRouter:
+    """
+    Routes token_a <-> token_b swaps over the V3 fee tiers and the V2 pair.
+    refresh() snapshots every venue at one block, concurrently; best_route()
+    is then pure Python; swap_tx() turns a route into a Smart Router call
+    (exactInputSingle / swapExactTokensForTokens, or a multicall of legs,
+    followed by unwrapWETH9 when the output is the native token).
+
+    The local V3 math only picks the route: amountOutMinimum of V3 legs is
+    taken from QuoterV2 (one multicall) until the math has been checked
+    against recorded QuoterV2 fixtures (v3_pool.py --record / --verify).
+    """
+
+    def __init__(self, web3, multicall, smart_router_contract, gas_oracle, token_a, token_b, native,
+                 fee_tiers=V3_FEE_TIERS, pools=None, include_v2=True, split_parts=20, max_workers=4,
+                 quoter_contract=None):
+        self.web3 = web3
+        self.multicall = multicall
+        self.smart_router = smart_router_contract
+        self.quoter = quoter_contract
+        self.gas_oracle = gas_oracle
+        self.native = to_checksum_address(native)
+        self.split_parts = split_parts
+        self.max_workers = max_workers
+
+        pools = pools or {}
+        self.venues = {f"v3-{fee}": pools.get(fee) or V3Pool(web3, multicall, token_a, token_b, fee=fee)
+                       for fee in fee_tiers}
+        if include_v2:
+            self.venues['v2'] = V2Pair(web3, multicall, token_a, token_b)
+        self.disabled = set()  # venues that don't exist on chain
+        self.lock = threading.RLock()
+
+    def _refresh_venue(self, name, block_number):
+        try:
+            return self.venues[name].refresh(block_number)[0]
+        except Exception as e:
+            venue = self.venues[name]
+            address = getattr(venue, 'pool_address', None) or getattr(venue, 'pair_address', None)
+            if address == "0x0000000000000000000000000000000000000000":
+                self.disabled.add(name)
+                print(f"⚠️ {name}: no pool for this pair, skipping it")
+            else:
+                print(f"⚠️ {name} snapshot failed: {e}")
+            return None
+
+    def refresh(self, block_number=None):
+        """{venue name: snapshot} at block_number (latest if None), all venues read in parallel"""
+        if block_number is None:
+            block_number = self.web3.eth.block_number
+        names = [name for name in self.venues if name not in self.disabled]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            results = list(pool.map(lambda name: self._refresh_venue(name, block_number), names))
+
+        return {name: snapshot for name, snapshot in zip(names, results) if snapshot is not None}
+
+    def best_route(self, token_in, token_out, amount_in, gas_tier='standard', split=True, block_number=None):
+        """Best route (net of gas at gas_tier) for amount_in wei of token_in; raises if no venue can fill it"""
+        token_in = to_checksum_address(token_in)
+        token_out = to_checksum_address(token_out)
+        snapshots = self.refresh(block_number)
+        route = find_route(snapshots, token_in, token_out, amount_in,
+                           gas_price=self.gas_oracle.gas_price(gas_tier), native=self.native,
+                           split_parts=self.split_parts if split else 1)
+        if route is None:
+            raise RuntimeError(f"No venue can fill {amount_in} of {token_in}")
+        return route
+
+    def _leg_data(self, route, name, amount_in, min_out, recipient):
+        if venue_kind(name) == 'v2':
+            return self.smart_router.encode_abi(
+                'swapExactTokensForTokens', args=[amount_in, min_out, [route.token_in, route.token_out], recipient]
+            )
+        return self.smart_router.encode_abi('exactInputSingle', args=[{
+            'tokenIn': route.token_in,
+            'tokenOut': route.token_out,
+            'fee': venue_fee(name),
+            'recipient': recipient,
+            'amountIn': amount_in,
+            'amountOutMinimum': min_out,
+            'sqrtPriceLimitX96': 0
+        }])
+
+    def _leg_outs(self, route):
+        """Expected output per leg: QuoterV2 for V3 legs (raises if a quote fails), V2 from the pair math"""
+        outs = [amount_out for _, _, amount_out in route.legs]
+        v3_legs = [i for i, (name, _, _) in enumerate(route.legs) if venue_kind(name) == 'v3']
+        if not v3_legs or self.quoter is None:
+            return outs
+
+        calls = [self.quoter.functions.quoteExactInputSingle({
+            'tokenIn': route.token_in,
+            'tokenOut': route.token_out,
+            'amountIn': route.legs[i][1],
+            'fee': venue_fee(route.legs[i][0]),
+            'sqrtPriceLimitX96': 0
+        }) for i in v3_legs]
+        _, results = self.multicall.aggregate(calls)
+        for i, result in zip(v3_legs, results):
+            if result is None:
+                raise RuntimeError(f"QuoterV2 failed for the {route.legs[i][0]} leg")
+            outs[i] = result[0]
+        return outs
+
+    def gas_operation(self, route, unwrap=True):
+        """GasOracle operation for route's swap tx, one per shape (e.g. 'swap:v2+v3:unwrap')"""
+        kinds = "+".join(sorted(venue_kind(name) for name, _, _ in route.legs))
+        unwrap = unwrap and route.token_out == self.native
+        return f"swap:{kinds}{':unwrap' if unwrap else ''}"
+
+    def gas_params(self, route, gas_tier='standard', unwrap=True):
+        """{'gas', 'gasPrice'} for route's swap tx: the last estimate for its shape, else route.gas"""
+        return self.gas_oracle.params(self.gas_operation(route, unwrap), gas_tier, default=route.gas)
+
+    def swap_tx(self, route, sender, recipient=None, slippage=0.0005, deadline=None, unwrap=True):
+        """
+        {'from', 'to', 'data', 'value'} for route (add gas / nonce / chainId).
+        Every leg gets its own amountOutMinimum (see _leg_outs); native input is sent as value
+        and wrapped by the router. Native output is paid out as BNB in the
+        same tx (legs pay the router, then unwrapWETH9), unless unwrap=False.
+        """
+        sender = to_checksum_address(sender)
+        recipient = to_checksum_address(recipient or sender)
+        unwrap = unwrap and route.token_out == self.native
+        min_outs = [int(amount_out * (1 - slippage)) for amount_out in self._leg_outs(route)]
+        legs = [self._leg_data(route, name, amount_in, min_out, ADDRESS_THIS if unwrap else recipient)
+                for (name, amount_in, _), min_out in zip(route.legs, min_outs)]
+        if unwrap:
+            legs.append(self.smart_router.encode_abi('unwrapWETH9', args=[sum(min_outs), recipient]))
+        if len(legs) == 1:
+            data = legs[0]
+        else:
+            deadline = deadline or int(time.time()) + 300
+            data = self.smart_router.encode_abi('multicall', args=[deadline, legs])
+        return {
+            'from': sender,
+            'to': self.smart_router.address,
+            'data': data,
+            'value': route.amount_in if route.token_in == self.native else 0,
+        }
+
+
+def record_states(path, router):
+    """Snapshot every venue at one block into path"""
+    block_number = router.web3.eth.block_number
+    snapshots = router.refresh(block_number)
+    with open(path, 'w') as f:
+        json.dump({'block_number': block_number, 'native': router.native,
+                   'gas_price': router.gas_oracle.gas_price('standard'),
+                   'venues': {name: snapshot.to_dict() for name, snapshot in snapshots.items()}}, f, indent=1)
+    print(f"💾 Recorded {len(snapshots)} venues at block {block_number} → {path}")
+
+
+def load_states(path):
+    with open(path, 'r') as f:
+        data = json.load(f)
+    snapshots = {name: (PairSnapshot if name == 'v2' else PoolSnapshot).from_dict(state)
+                 for name, state in data['venues'].items()}
+    return data, snapshots
+
+
+def bench(path, baseline='v3-500'):
+    """Route a ladder of sizes in both directions against recorded states; compare with baseline alone"""
+    data, snapshots = load_states(path)
+    native = data['native']
+    sample = next(iter(snapshots.values()))
+    other = sample.token1 if sample.token0 == native else sample.token0
+
+    print("\n" + "=" * 90)
+    print(f"🧭 ROUTER BENCH - block {data['block_number']} | venues: {', '.join(snapshots)}")
+    print("=" * 90)
+    for token_in, token_out, label in ((native, other, "BNB→"), (other, native, "→BNB")):
+        for size in (10 ** exp * mult for exp in (17, 18, 19, 20, 21, 22) for mult in (1, 5)):
+            started = time.perf_counter()
+            route = find_route(snapshots, token_in, token_out, size, data['gas_price'], native)
+            elapsed = (time.perf_counter() - started) * 1000
+            base = find_route({baseline: snapshots[baseline]}, token_in, token_out, size,
+                              data['gas_price'], native, split_parts=1) if baseline in snapshots else None
+            if route is None:
+                print(f"{label} {size / 1e18:>10g}: no venue can fill")
+                continue
+            if base and base.net_out > 0:
+                versus = f"{(route.net_out - base.net_out) / base.net_out * 10000:+.2f} bps vs {baseline}"
+            else:
+                versus = f"{baseline} alone can't fill"
+            print(f"{label} {size / 1e18:>10g}: {route.describe():<32} net {route.net_out / 1e18:>16.6f} "
+                  f"({versus}) | {elapsed:.1f} ms")
+    print("=" * 90)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="USDT/WBNB routing across V3 fee tiers and V2")
+    parser.add_argument("--record", help="Record every venue's state at one block into this file (needs RPC)")
+    parser.add_argument("--bench", help="Route a size ladder offline against a recorded state file")
+    args = parser.parse_args()
+
+    if args.bench:
+        bench(args.bench)
+    elif args.record:
+        from mv5 import ctx
+
+        record_states(args.record, ctx.swap_router)
+    else:
+        parser.print_help()
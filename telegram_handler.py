@@ -1,14 +1,52 @@
 import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from dotenv import load_dotenv
 import requests
+from eth_utils import to_checksum_address
 
 load_dotenv()
 
 
 class TelegramHandler:
-    def __init__(self, wallet_manager, swap_manager, betting_manager, reward_manager, limit_order_manager):
+    # getUpdates long-poll: Telegram holds the request open until a message arrives
+    LONG_POLL_TIMEOUT = 25
+
+    # Max concurrent runs per command, each command gets its own worker pool
+    # so a slow /claim never delays /price. Money-moving commands run one at a time.
+    COMMAND_LIMITS = {
+        '/bet': 4,
+        '/burst': 1,
+        '/arm': 1,
+        '/fire': 1,
+        '/claim': 1,
+        '/drain': 1,
+        '/empty': 1,
+        '/send': 1,
+        '/unwrap': 1,
+        'confirm': 1,
+        'swap_confirm': 1,
+        'limit_confirm': 1,
+    }
+    DEFAULT_COMMAND_LIMIT = 2
+
+    # Commands that end in a YES/NO preview. They share the single 'confirm'
+    # worker with the replies, so a reply is only read after its preview stored
+    # the pending swap / order.
+    CONFIRM_COMMANDS = ('/swap_usdt', '/swap_bnb', '/limit')
+
+    COMMANDS = (
+        '/help', '/start', '/wallets', '/balance', '/create', '/send', '/swap_usdt', '/swap_bnb',
+        '/bet', '/burst', '/arm', '/fire', '/claim', '/rewards', '/orders', '/cancel', '/price', '/atr', '/drain', '/empty',
+        '/limit', '/profit', '/pnl', '/unwrap',
+    )
+
+    def __init__(self, wallet_manager, swap_manager, betting_manager, reward_manager, limit_order_manager, context=None):
+        if context is None:
+            from mv5 import ctx as context
+        self.context = context  # ChainContext shared with mv5 (web3 / contracts built on first use)
         self.wallet_manager = wallet_manager
         self.swap_manager = swap_manager
         self.betting_manager = betting_manager
@@ -19,6 +57,11 @@ class TelegramHandler:
         self.last_update_id = 0
         self.pending_cancel_order = None
         self.pending_swap = None
+        self.pending_limit_order = None
+        self.armed_bets = []  # PreArmedBet per wallet, waiting for /fire
+        self.session = requests.Session()
+        self.command_pools = {}
+        self.pools_lock = threading.Lock()
 
     def send_message(self, message):
         """Send message to Telegram"""
@@ -34,23 +77,54 @@ class TelegramHandler:
             return False
 
     def get_updates(self):
-        """Get new messages from Telegram"""
+        """Get new messages from Telegram (long poll, blocks up to LONG_POLL_TIMEOUT seconds)"""
         try:
             if not self.token:
                 return []
             url = f"https://api.telegram.org/bot{self.token}/getUpdates"
-            params = {"offset": self.last_update_id + 1, "timeout": 0}
-            response = requests.get(url, params=params, timeout=2)
+            params = {"offset": self.last_update_id + 1, "timeout": self.LONG_POLL_TIMEOUT}
+            response = self.session.get(url, params=params, timeout=self.LONG_POLL_TIMEOUT + 5)
             if response.ok:
                 data = response.json()
                 updates = data.get('result', [])
                 if updates:
                     self.last_update_id = updates[-1]['update_id']
                 return updates
-        except:
-            pass
+            time.sleep(1)
+        except (requests.RequestException, ValueError):
+            # Network error or a garbled response: back off instead of spinning
+            time.sleep(1)
         return []
 
+    def run(self):
+        """Poll Telegram forever, handing commands to the worker pools"""
+        if not self.token:
+            print("⚠️ TELEGRAM_TOKEN not set, Telegram bot disabled")
+            return
+        while True:
+            try:
+                self.process_commands()
+            except Exception as e:
+                print(f"⚠️ Telegram monitor error: {e}")
+                time.sleep(1)
+
+    def dispatch(self, command, handler, *args):
+        """Run handler on the worker pool of its command"""
+        with self.pools_lock:
+            pool = self.command_pools.get(command)
+            if pool is None:
+                limit = self.COMMAND_LIMITS.get(command, self.DEFAULT_COMMAND_LIMIT)
+                pool = ThreadPoolExecutor(max_workers=limit, thread_name_prefix=f"tg{command}")
+                self.command_pools[command] = pool
+        return pool.submit(self._run_handler, command, handler, *args)
+
+    def _run_handler(self, command, handler, *args):
+        try:
+            handler(*args)
+        except Exception as e:
+            print(f"⚠️ Error in {command}: {e}")
+            self.send_message(f"❌ Error:    {str(e)}")
+
     def process_commands(self):
         """Process incoming Telegram commands"""
         updates = self.get_updates()
@@ -62,68 +136,9 @@ class TelegramHandler:
 
                 message_text = update['message']['text']. strip()
 
-                # ✅ CHECK FOR PENDING SWAP CONFIRMATION FIRST
-                if hasattr(self, 'pending_swap') and self.pending_swap:
-                    response = message_text.strip().upper()
-
-                    if response == 'YES':
-                        # Execute the swap
-                        self._execute_pending_swap()
-                        self. pending_swap = None
-                        continue
-
-                    elif response == 'NO' or response == '/CANCEL':
-                        self.send_message("❌ Swap cancelled")
-                        self.pending_swap = None
-                        continue
-
-                    elif not message_text.startswith('/'):
-                        self.send_message("❌ Please reply <b>YES</b> to confirm or <b>NO</b> to cancel")
-                        continue
-
-                # ✅ CHECK FOR PENDING LIMIT ORDER CONFIRMATION
-                if hasattr(self, 'pending_limit_order') and self.pending_limit_order:
-                    response = message_text.strip().upper()
-
-                    if response == 'YES':
-                        # Create order using proper method
-                        order_data = self. pending_limit_order
-
-                        order = self.limit_order_manager.create_order(
-                            wallet_idx=order_data['wallet_idx'],
-                            wallet_name=order_data['wallet_name'],
-                            wallet_address=order_data['wallet_address'],
-                            swap_direction=order_data['swap_direction'],
-                            amount=order_data['amount'],
-                            trigger_price=order_data['trigger_price']
-                        )
-
-                        if order:
-                            self.send_message(
-                                f"✅ <b>LIMIT ORDER CREATED!  </b>\n\n"
-                                f"🆔 Order #{order['id']}\n"
-                                f"👤 {order['wallet_name']}\n"
-                                f"🔄 {order['amount_label']}\n"
-                                f"🎯 Target:   ${order['trigger_price']:.2f}\n"
-                                f"⚡ Monitoring started!"
-                            )
-                        else:
-                            self.send_message("❌ Failed to create order")
-
-                        self.pending_limit_order = None
-                        continue
-
-                    elif response == 'NO' or response == '/CANCEL':
-                        self.send_message("❌ Order cancelled")
-                        self.pending_limit_order = None
-                        continue
-
-                    elif not message_text.startswith('/'):
-                        self.send_message("❌ Please reply <b>YES</b> to confirm or <b>NO</b> to cancel")
-                        continue
-
-                # Parse commands
-                if not message_text.startswith('/'):
+                # Replies (YES / NO / bare /cancel) queue behind the preview that asked for them
+                if not message_text.startswith('/') or message_text.upper() == '/CANCEL':
+                    self.dispatch('confirm', self._handle_reply, message_text)
                     continue
 
                 parts = message_text.split()
@@ -132,13 +147,76 @@ class TelegramHandler:
 
                 print(f"📱 Telegram command:  {message_text}")
 
-                # Route to handler
-                self.handle_command(command, args)
+                # Route to handler on the command's worker pool (unknown commands share one)
+                if command in self.CONFIRM_COMMANDS:
+                    pool_key = 'confirm'
+                else:
+                    pool_key = command if command in self.COMMANDS else 'unknown'
+                self.dispatch(pool_key, self.handle_command, command, args)
 
             except Exception as e:
                 print(f"⚠️ Error processing update:   {e}")
                 self.send_message(f"❌ Error:    {str(e)}")
 
+    def _handle_reply(self, message_text):
+        """Answer a pending swap / limit order preview (runs on the 'confirm' worker)"""
+        response = message_text.upper()
+
+        # ✅ CHECK FOR PENDING SWAP CONFIRMATION FIRST
+        if self.pending_swap:
+            if response == 'YES':
+                # Execute the swap in the background
+                pending_swap = self.pending_swap
+                self.pending_swap = None
+                self.dispatch('swap_confirm', self._execute_pending_swap, pending_swap)
+            elif response == 'NO' or response == '/CANCEL':
+                self.send_message("❌ Swap cancelled")
+                self.pending_swap = None
+            else:
+                self.send_message("❌ Please reply <b>YES</b> to confirm or <b>NO</b> to cancel")
+            return
+
+        # ✅ CHECK FOR PENDING LIMIT ORDER CONFIRMATION
+        if self.pending_limit_order:
+            if response == 'YES':
+                order_data = self.pending_limit_order
+                self.pending_limit_order = None
+                self.dispatch('limit_confirm', self._confirm_pending_limit_order, order_data)
+            elif response == 'NO' or response == '/CANCEL':
+                self.send_message("❌ Order cancelled")
+                self.pending_limit_order = None
+            else:
+                self.send_message("❌ Please reply <b>YES</b> to confirm or <b>NO</b> to cancel")
+            return
+
+        # Nothing pending: a bare /cancel is the regular command
+        if response == '/CANCEL':
+            print(f"📱 Telegram command:  {message_text}")
+            self.handle_command('/cancel', [])
+
+    def _confirm_pending_limit_order(self, order_data):
+        """Create the limit order the user just confirmed with YES"""
+        order = self.limit_order_manager.create_order(
+            wallet_idx=order_data['wallet_idx'],
+            wallet_name=order_data['wallet_name'],
+            wallet_address=order_data['wallet_address'],
+            swap_direction=order_data['swap_direction'],
+            amount=order_data['amount'],
+            trigger_price=order_data['trigger_price']
+        )
+
+        if order:
+            self.send_message(
+                f"✅ <b>LIMIT ORDER CREATED!  </b>\n\n"
+                f"🆔 Order #{order['id']}\n"
+                f"👤 {order['wallet_name']}\n"
+                f"🔄 {order['amount_label']}\n"
+                f"🎯 Target:   ${order['trigger_price']:.2f}\n"
+                f"⚡ Monitoring started!"
+            )
+        else:
+            self.send_message("❌ Failed to create order")
+
     def handle_command(self, command, args):
         """Route commands to appropriate handlers"""
 
@@ -165,6 +243,12 @@ class TelegramHandler:
         # === BETTING COMMANDS ===
         elif command == '/bet':
             self.cmd_bet(args)
+        elif command == '/burst':
+            self.cmd_burst(args)
+        elif command == '/arm':
+            self.cmd_arm(args)
+        elif command == '/fire':
+            self.cmd_fire(args)
 
         # === REWARD COMMANDS ===
         elif command == '/claim':
@@ -226,6 +310,10 @@ www.moeyassin.com</b>
 🎯 <b>BETTING COMMANDS:</b>
 /bet [wallet]/[usdt]/[up|down] - Place bet
 Example: /bet 1/50/up
+/burst [wallets|all]/[bnb|%]/[up|down]/[secs before lock] - Bet from many wallets at once
+Example: /burst 1,2,3/95%/up/5
+/arm [wallet]/[bnb|%] - Pre-sign UP and DOWN bets for this round
+/fire [up|down] - Send the armed bets
 
 🎁 <b>REWARD COMMANDS:</b>
 /rewards [wallet] - Show claimable rewards
@@ -258,11 +346,13 @@ Example: /bet 1/50/up
 
             message = "📋 <b>YOUR WALLETS</b>\n\n"
 
-            for i, wallet in enumerate(self.wallet_manager.wallets):
-                wallet = self.wallet_manager.get_wallet_balances(wallet)
+            # All balances from one snapshot, locked funds from one pass over the orders
+            self.wallet_manager.refresh_balances()
+            all_locked = self.limit_order_manager.get_all_locked_balances()
 
+            for i, wallet in enumerate(self.wallet_manager.wallets):
                 # Get locked balances
-                locked_bnb, locked_usdt = self.limit_order_manager.get_locked_balances(wallet['address'])
+                locked_bnb, locked_usdt = all_locked.get(to_checksum_address(wallet['address']), (0, 0))
                 available_bnb = wallet['balance_bnb'] - locked_bnb
                 available_usdt = wallet['balance_usdt'] - locked_usdt
 
@@ -288,10 +378,10 @@ Example: /bet 1/50/up
     def cmd_balance(self):
         """Show main wallet balance"""
         try:
-            from web3 import Web3
-            from mv5 import web3, usdt_contract, MAIN_WALLET_ADDRESS
+            from mv5 import MAIN_WALLET_ADDRESS
+            web3, usdt_contract = self.context.web3, self.context.usdt_contract
 
-            main_address = Web3.to_checksum_address(MAIN_WALLET_ADDRESS)
+            main_address = to_checksum_address(MAIN_WALLET_ADDRESS)
             bnb_balance = web3.eth.get_balance(main_address)
             bnb_balance = web3.from_wei(bnb_balance, 'ether')
             usdt_balance = usdt_contract.functions.balanceOf(main_address).call() / 1e18
@@ -341,10 +431,10 @@ Example: /bet 1/50/up
                 return
 
             # Check balance first
-            from web3 import Web3
-            from mv5 import web3, usdt_contract, MAIN_WALLET_ADDRESS
+            from mv5 import MAIN_WALLET_ADDRESS
+            usdt_contract = self.context.usdt_contract
 
-            main_address = Web3.to_checksum_address(MAIN_WALLET_ADDRESS)
+            main_address = to_checksum_address(MAIN_WALLET_ADDRESS)
             usdt_balance = usdt_contract.functions.balanceOf(main_address).call() / 1e18
 
             if amount > usdt_balance:
@@ -395,10 +485,10 @@ Example: /bet 1/50/up
                 return
 
             # Check balance first
-            from web3 import Web3
-            from mv5 import web3, MAIN_WALLET_ADDRESS
+            from mv5 import MAIN_WALLET_ADDRESS
+            web3 = self.context.web3
 
-            main_address = Web3.to_checksum_address(MAIN_WALLET_ADDRESS)
+            main_address = to_checksum_address(MAIN_WALLET_ADDRESS)
             bnb_balance = web3.eth.get_balance(main_address) / 1e18
 
             if amount > bnb_balance:
@@ -503,6 +593,131 @@ Example: /bet 1/50/up
         except Exception as e:
             self.send_message(f"❌ Error: {str(e)}")
 
+    def cmd_burst(self, args):
+        """Bet from several wallets into the current round:  /burst 1,2,3/95%/up/5"""
+        try:
+            usage = ("❌ Format: /burst [wallets|all]/[bnb|%]/[up|down]/[secs before lock]\n"
+                     "Example: /burst 1,2,3/95%/up/5")
+            if not args:
+                self.send_message(usage)
+                return
+
+            parts = args[0].split('/')
+            if len(parts) not in (3, 4):
+                self.send_message(usage)
+                return
+
+            wallets = self.wallet_manager.wallets
+            if parts[0].lower() == 'all':
+                selected = list(wallets)
+            else:
+                indexes = [int(i) - 1 for i in parts[0].split(',')]
+                if any(i < 0 or i >= len(wallets) for i in indexes):
+                    self.send_message("❌ Invalid wallet number")
+                    return
+                selected = [wallets[i] for i in indexes]
+
+            amount, fraction = None, 0.95
+            if parts[1].endswith('%'):
+                fraction = float(parts[1][:-1]) / 100
+            else:
+                amount = float(parts[1])
+
+            direction = parts[2].lower()
+            if direction not in ['up', 'down']:
+                self.send_message("❌ Direction must be 'up' or 'down'")
+                return
+            lead = float(parts[3]) if len(parts) == 4 else None
+
+            self.send_message(f"⚡ <b>BURST BET</b>\n\n👥 {len(selected)} wallets → {direction.upper()}\n⏳ Signing...")
+            report = self.betting_manager.burst_bet(selected, direction, amount, fraction, lead)
+            if report is None:
+                self.send_message("❌ Burst failed!")
+                return
+
+            lines = []
+            for r in report.results:
+                emoji = "✅" if r['status'] == 'confirmed' else "❌"
+                sent = f"T-{r['lead']:.2f}s" if r['lead'] is not None else r['status']
+                lines.append(f"{emoji} {r['label']}: {r['amount_bnb']:.4f} BNB ({sent})")
+            self.send_message(
+                f"🎯 <b>BURST ROUND {report.epoch}</b>\n\n" + "\n".join(lines) +
+                f"\n\n✅ Placed: {len(report.placed)}/{len(report.results)}"
+            )
+
+        except Exception as e:
+            self.send_message(f"❌ Error: {str(e)}")
+
+    def cmd_arm(self, args):
+        """Pre-sign bull and bear bets:  /arm 1/95%"""
+        try:
+            if not args or len(args[0].split('/')) != 2:
+                self.send_message("❌ Format: /arm [wallet]/[bnb|%]\nExample: /arm 1/95%")
+                return
+
+            wallet_part, amount_part = args[0].split('/')
+            wallet_idx = int(wallet_part) - 1
+            if wallet_idx < 0 or wallet_idx >= len(self.wallet_manager.wallets):
+                self.send_message("❌ Invalid wallet number")
+                return
+
+            amount, fraction = None, 0.95
+            if amount_part.endswith('%'):
+                fraction = float(amount_part[:-1]) / 100
+            else:
+                amount = float(amount_part)
+
+            wallet = self.wallet_manager.wallets[wallet_idx]
+
+            # Bets armed for an earlier round (or the same wallet) are replaced; disarmed
+            # first so the wallet's reserved nonce is free for the new bet
+            address = to_checksum_address(wallet['address'])
+            for old in self.armed_bets:
+                if old.expired or old.address == address:
+                    old.disarm()
+            self.armed_bets = [a for a in self.armed_bets if not a.fired]
+
+            armed = self.betting_manager.arm_bet(wallet, amount, fraction)
+            if armed is None:
+                self.send_message("❌ Could not arm bet")
+                return
+            self.armed_bets.append(armed)
+            self.send_message(
+                f"🔫 <b>ARMED</b> {armed.label}: {armed.amount_bnb:.6f} BNB\n"
+                f"🔢 Round {armed.epoch} | ⏰ {armed.lock_timestamp - int(time.time())}s to lock\n"
+                f"Send /fire up or /fire down"
+            )
+
+        except Exception as e:
+            self.send_message(f"❌ Error: {str(e)}")
+
+    def cmd_fire(self, args):
+        """Send the armed bets:  /fire up"""
+        decided_at = time.perf_counter()
+        try:
+            if not args or args[0].lower() not in ['up', 'down']:
+                self.send_message("❌ Usage: /fire [up|down]")
+                return
+            if not self.armed_bets:
+                self.send_message("❌ Nothing armed. Use /arm first")
+                return
+
+            direction = args[0].lower()
+            armed_bets, self.armed_bets = self.armed_bets, []
+            lines = []
+            for armed in armed_bets:
+                if self.betting_manager.fire_armed_bet(armed, direction, decided_at):
+                    lines.append(f"✅ {armed.label}: {armed.amount_bnb:.6f} BNB | "
+                                 f"⚡ {armed.timing['hot_path_ms']:.1f} ms | T-{armed.timing['lead']:.2f}s")
+                else:
+                    armed.disarm()
+                    lines.append(f"❌ {armed.label}: not sent (round {armed.epoch})")
+
+            self.send_message(f"🚀 <b>FIRED {direction.upper()}</b>\n\n" + "\n".join(lines))
+
+        except Exception as e:
+            self.send_message(f"❌ Error: {str(e)}")
+
     def cmd_show_rewards(self, args):
         """Show claimable rewards"""
         try:
@@ -1032,10 +1247,7 @@ Example: /bet 1/50/up
 
             # For now, auto-confirm (you can add state machine for YES/NO)
             # Create the order
-            order_id = len(self.limit_order_manager.orders) + 1
-
             order = {
-                'id': order_id,
                 'wallet_idx': wallet_idx,
                 'wallet_name': wallet['name'],
                 'wallet_address': wallet['address'],
@@ -1050,8 +1262,7 @@ Example: /bet 1/50/up
                 'status': 'pending'
             }
 
-            self.limit_order_manager.orders.append(order)
-            self.limit_order_manager.save_orders()
+            order_id = self.limit_order_manager.add_order(order)
 
             success_msg = (
                 f"✅ <b>LIMIT ORDER #{order_id} CREATED!</b>\n\n"
@@ -1157,10 +1368,7 @@ Example: /bet 1/50/up
             self.send_message(preview_msg)
 
             # Create placeholder take-profit order
-            tp_order_id = len(self.limit_order_manager.orders) + 1
-
             tp_order = {
-                'id': tp_order_id,
                 'wallet_idx': original_order['wallet_idx'],
                 'wallet_name': original_order['wallet_name'],
                 'wallet_address': original_order['wallet_address'],
@@ -1177,8 +1385,7 @@ Example: /bet 1/50/up
                 'profit_target_usdt': profit_usdt
             }
 
-            self.limit_order_manager.orders.append(tp_order)
-            self.limit_order_manager.save_orders()
+            tp_order_id = self.limit_order_manager.add_order(tp_order)
 
             success_msg = (
                 f"✅ <b>TAKE-PROFIT ORDER #{tp_order_id} CREATED!</b>\n\n"
@@ -1364,227 +1571,105 @@ Example: /bet 1/50/up
             return False
 
     def cmd_price(self):
-        """Show current BNB price using V3 0.05% pool (exact copy from mv5.py)"""
+        """Show current BNB price from the shared per-block price oracle"""
         try:
-            from web3 import Web3
-            from mv5 import web3, quoter_v2_contract, chainlink_contract, WBNB, USDT_CONTRACT
+            price_oracle = self.context.price_oracle
 
-            one_bnb_wei = int(1 * 1e18)
-
-            params = {
-                'tokenIn': Web3.to_checksum_address(WBNB),
-                'tokenOut': Web3.to_checksum_address(USDT_CONTRACT),
-                'amountIn': one_bnb_wei,
-                'fee': 500,  # 0.05% fee pool
-                'sqrtPriceLimitX96': 0
-            }
+            info = price_oracle.get_price_info()
+            usdt_out = info['v3_price']
+            chainlink_price = info['chainlink_price']
 
-            result = quoter_v2_contract.functions.quoteExactInputSingle(params).call()
-            usdt_out = result[0] / 1e18
+            if not usdt_out and not chainlink_price:
+                self.send_message("❌ All price sources failed!")
+                return
 
-            # Also get Chainlink for comparison
-            try:
-                chainlink_data = chainlink_contract.functions.latestRoundData().call()
-                chainlink_price = chainlink_data[1] / 1e8
-                diff = usdt_out - chainlink_price
-                diff_pct = (diff / chainlink_price) * 100
-            except:
-                chainlink_price = None
-                diff = 0
-                diff_pct = 0
+            if not usdt_out:
+                message = (
+                    f"⚠️ <b>BNB/USD PRICE (Chainlink Fallback)</b>\n\n"
+                    f"💵 ${chainlink_price:.2f}\n"
+                    f"⏰ {datetime.now().strftime('%H:%M:%S')}"
+                )
+                self.send_message(message)
+                return
 
             # Build message
             message = "💎 <b>BNB/USD PRICE</b>\n\n"
             message += f"🥞 V3 0.05% Pool:  ${usdt_out:.2f}\n"
 
             if chainlink_price:
+                diff = usdt_out - chainlink_price
+                diff_pct = (diff / chainlink_price) * 100
                 message += f"📊 Chainlink: ${chainlink_price:.2f}\n"
                 message += f"📈 Difference: ${diff:+.2f} ({diff_pct:+.3f}%)\n"
 
             message += f"\n✅ Using V3 price:  ${usdt_out:.2f}\n"
+            message += f"🧱 Block: {info['block_number']}\n"
+            if info['stale']:
+                message += "⚠️ Price is stale\n"
             message += f"⏰ {datetime.now().strftime('%H:%M:%S')}"
 
             self.send_message(message)
 
         except Exception as e:
-            # Fallback to Chainlink
-            try:
-                from mv5 import chainlink_contract
-                chainlink_data = chainlink_contract.functions.latestRoundData().call()
-                price = chainlink_data[1] / 1e8
+            self.send_message(f"❌ All price sources failed!\n{str(e)}")
 
-                message = (
-                    f"⚠️ <b>BNB/USD PRICE (Chainlink Fallback)</b>\n\n"
-                    f"💵 ${price:.2f}\n"
-                    f"⏰ {datetime.now().strftime('%H:%M:%S')}"
-                )
-                self.send_message(message)
-            except:
-                self.send_message(f"❌ All price sources failed!\n{str(e)}")
-
-    def _execute_pending_swap(self):
+    def _execute_pending_swap(self, pending_swap=None):
         """Execute the pending swap after confirmation"""
         try:
-            if not self.pending_swap:
+            pending_swap = pending_swap or self.pending_swap
+            if not pending_swap:
                 self.send_message("❌ No pending swap found")
                 return
 
-            swap_type = self.pending_swap['type']
-            amount = self.pending_swap['amount']
-            wallet_address = self.pending_swap['wallet_address']
+            swap_type = pending_swap['type']
+            amount = pending_swap['amount']
+            wallet_address = pending_swap['wallet_address']
 
-            from web3 import Web3
-            from mv5 import (web3, MAIN_PRIVATE_KEY, SMART_ROUTER_ADDRESS,
-                             USDT_CONTRACT, WBNB, smart_router_contract,
-                             quoter_v2_contract, usdt_contract)
+            from mv5 import MAIN_PRIVATE_KEY, SMART_ROUTER_ADDRESS, USDT_CONTRACT, WBNB
+            web3 = self.context.web3
+            swap_router = self.context.swap_router
+            nonce_manager = self.context.nonce_manager
+            allowance_cache = self.context.allowance_cache
 
             self.send_message("⏳ Executing swap...")
 
             if swap_type == 'usdt_to_bnb':
-                # USDT → BNB (WITH AUTO-UNWRAP)
+                # USDT → BNB (native BNB out, unwrapped by the router)
                 usdt_amount = amount
                 usdt_amount_wei = int(usdt_amount * 1e18)
 
-                params_quote = {
-                    'tokenIn': Web3.to_checksum_address(USDT_CONTRACT),
-                    'tokenOut': Web3.to_checksum_address(WBNB),
-                    'amountIn': usdt_amount_wei,
-                    'fee': 500,
-                    'sqrtPriceLimitX96': 0
-                }
-
-                result = quoter_v2_contract.functions.quoteExactInputSingle(params_quote).call()
-                expected_bnb = result[0] / 1e18
-
-                # Check allowance
-                allowance = usdt_contract.functions.allowance(wallet_address, SMART_ROUTER_ADDRESS).call()
+                route = swap_router.best_route(USDT_CONTRACT, WBNB, usdt_amount_wei)
+                expected_bnb = route.amount_out / 1e18
 
-                if allowance < usdt_amount_wei:
-                    self.send_message("🔓 Approving USDT...")
-                    nonce = web3.eth.get_transaction_count(wallet_address)
-
-                    approve_tx = usdt_contract.functions.approve(
-                        SMART_ROUTER_ADDRESS, usdt_amount_wei * 2
-                    ).build_transaction({
-                        'from': wallet_address,
-                        'gas': 100000,
-                        'gasPrice': web3.to_wei('3', 'gwei'),
-                        'nonce': nonce,
-                        'chainId': 56
-                    })
-
-                    signed_tx = web3.eth.account.sign_transaction(approve_tx, MAIN_PRIVATE_KEY)
-                    tx_hash = web3.eth.send_raw_transaction(signed_tx.raw_transaction)
-                    web3.eth.wait_for_transaction_receipt(tx_hash)
-                    self.send_message("✅ Approval confirmed!")
+                # Approve only if the cached allowance ran out; the swap takes the next nonce
+                tx_hash = allowance_cache.ensure(wallet_address, MAIN_PRIVATE_KEY, SMART_ROUTER_ADDRESS, usdt_amount_wei)
+                if tx_hash:
+                    self.send_message(f"✅ Approval sent: {web3.to_hex(tx_hash)}")
 
                 # Execute swap
-                min_bnb_out = int(expected_bnb * 0.9995 * 1e18)
-                nonce = web3.eth.get_transaction_count(wallet_address)
-
-                swap_params = {
-                    'tokenIn': Web3.to_checksum_address(USDT_CONTRACT),
-                    'tokenOut': Web3.to_checksum_address(WBNB),
-                    'fee': 500,
-                    'recipient': wallet_address,
-                    'amountIn': usdt_amount_wei,
-                    'amountOutMinimum': min_bnb_out,
-                    'sqrtPriceLimitX96': 0
+                swap_tx = {
+                    **swap_router.swap_tx(route, wallet_address),
+                    **swap_router.gas_params(route, 'standard'),
+                    'chainId': 56
                 }
+                self.context.gas_oracle.estimate(swap_tx, swap_router.gas_operation(route))
 
-                swap_tx = smart_router_contract.functions.exactInputSingle(swap_params).build_transaction({
-                    'from': wallet_address,
-                    'gas': 300000,
-                    'gasPrice': web3.to_wei('3', 'gwei'),
-                    'nonce': nonce,
-                    'chainId': 56,
-                    'value': 0
-                })
-
-                signed_tx = web3.eth.account.sign_transaction(swap_tx, MAIN_PRIVATE_KEY)
-                tx_hash = web3.eth.send_raw_transaction(signed_tx.raw_transaction)
+                tx_hash = nonce_manager.send_transaction(swap_tx, MAIN_PRIVATE_KEY)
+                allowance_cache.spend(wallet_address, SMART_ROUTER_ADDRESS, usdt_amount_wei, tx_hash)
 
-                self.send_message(f"⏳ Swap TX:  {web3.to_hex(tx_hash)[:16]}...")
+                self.send_message(f"⏳ Swap TX ({route.describe()}):  {web3.to_hex(tx_hash)[:16]}...")
 
-                receipt = web3.eth.wait_for_transaction_receipt(tx_hash)
+                receipt = self.context.tx_pipeline.wait(tx_hash)
 
                 if receipt.status == 1:
-                    # ✅ NOW UNWRAP WBNB → BNB
-                    self.send_message("🔄 Unwrapping WBNB → BNB...")
-
-                    # WBNB contract (withdraw function)
-                    wbnb_abi = [
-                        {
-                            "constant": False,
-                            "inputs": [{"name": "wad", "type": "uint256"}],
-                            "name": "withdraw",
-                            "outputs": [],
-                            "stateMutability": "nonpayable",
-                            "type": "function"
-                        }
-                    ]
-
-                    wbnb_contract = web3.eth.contract(
-                        address=Web3.to_checksum_address(WBNB),
-                        abi=wbnb_abi
-                    )
-
-                    # Get WBNB balance
-                    wbnb_balance_abi = [
-                        {
-                            "constant": True,
-                            "inputs": [{"name": "_owner", "type": "address"}],
-                            "name": "balanceOf",
-                            "outputs": [{"name": "balance", "type": "uint256"}],
-                            "type": "function"
-                        }
-                    ]
-
-                    wbnb_contract_balance = web3.eth.contract(
-                        address=Web3.to_checksum_address(WBNB),
-                        abi=wbnb_balance_abi
+                    # Paid out as native BNB by the router, no separate unwrap
+                    success_msg = (
+                        f"✅ <b>SWAP COMPLETED!</b>\n\n"
+                        f"💱 {usdt_amount:.2f} USDT → {expected_bnb:.6f} BNB\n"
+                        f"🔗 <a href='https://bscscan.com/tx/{web3.to_hex(tx_hash)}'>View TX</a>\n"
+                        f"⏰ {datetime.now().strftime('%H:%M:%S')}"
                     )
-
-                    wbnb_balance = wbnb_contract_balance.functions.balanceOf(wallet_address).call()
-
-                    if wbnb_balance > 0:
-                        nonce = web3.eth.get_transaction_count(wallet_address)
-
-                        unwrap_tx = wbnb_contract.functions.withdraw(wbnb_balance).build_transaction({
-                            'from': wallet_address,
-                            'gas': 50000,
-                            'gasPrice': web3.to_wei('3', 'gwei'),
-                            'nonce': nonce,
-                            'chainId': 56,
-                            'value': 0
-                        })
-
-                        signed_unwrap = web3.eth.account.sign_transaction(unwrap_tx, MAIN_PRIVATE_KEY)
-                        unwrap_hash = web3.eth.send_raw_transaction(signed_unwrap.raw_transaction)
-
-                        unwrap_receipt = web3.eth.wait_for_transaction_receipt(unwrap_hash)
-
-                        if unwrap_receipt.status == 1:
-                            success_msg = (
-                                f"✅ <b>SWAP COMPLETED!</b>\n\n"
-                                f"💱 {usdt_amount:.2f} USDT → {expected_bnb:.6f} BNB\n"
-                                f"🔄 Auto-unwrapped WBNB → BNB\n"
-                                f"🔗 Swap: <a href='https://bscscan.com/tx/{web3.to_hex(tx_hash)}'>View</a>\n"
-                                f"🔗 Unwrap: <a href='https://bscscan.com/tx/{web3.to_hex(unwrap_hash)}'>View</a>\n"
-                                f"⏰ {datetime.now().strftime('%H:%M:%S')}"
-                            )
-                            self.send_message(success_msg)
-                        else:
-                            self.send_message(
-                                "⚠️ Swap succeeded but unwrap failed.  Use /unwrap to convert WBNB manually.")
-                    else:
-                        success_msg = (
-                            f"✅ <b>SWAP COMPLETED!</b>\n\n"
-                            f"💱 {usdt_amount:.2f} USDT → {expected_bnb:.6f} BNB\n"
-                            f"🔗 <a href='https://bscscan.com/tx/{web3.to_hex(tx_hash)}'>View TX</a>\n"
-                            f"⏰ {datetime.now().strftime('%H:%M:%S')}"
-                        )
-                        self.send_message(success_msg)
+                    self.send_message(success_msg)
                 else:
                     self.send_message("❌ Swap failed!")
 
@@ -1593,46 +1678,22 @@ Example: /bet 1/50/up
                 bnb_amount = amount
                 bnb_amount_wei = int(bnb_amount * 1e18)
 
-                params_quote = {
-                    'tokenIn': Web3.to_checksum_address(WBNB),
-                    'tokenOut': Web3.to_checksum_address(USDT_CONTRACT),
-                    'amountIn': bnb_amount_wei,
-                    'fee': 500,
-                    'sqrtPriceLimitX96': 0
-                }
-
-                result = quoter_v2_contract.functions.quoteExactInputSingle(params_quote).call()
-                expected_usdt = result[0] / 1e18
+                route = swap_router.best_route(WBNB, USDT_CONTRACT, bnb_amount_wei)
+                expected_usdt = route.amount_out / 1e18
 
                 # Execute swap
-                min_usdt_out = int(expected_usdt * 0.9995 * 1e18)
-                nonce = web3.eth.get_transaction_count(wallet_address)
-
-                swap_params = {
-                    'tokenIn': Web3.to_checksum_address(WBNB),
-                    'tokenOut': Web3.to_checksum_address(USDT_CONTRACT),
-                    'fee': 500,
-                    'recipient': wallet_address,
-                    'amountIn': bnb_amount_wei,
-                    'amountOutMinimum': min_usdt_out,
-                    'sqrtPriceLimitX96': 0
-                }
-
-                swap_tx = smart_router_contract.functions.exactInputSingle(swap_params).build_transaction({
-                    'from': wallet_address,
-                    'value': bnb_amount_wei,
-                    'gas': 300000,
-                    'gasPrice': web3.to_wei('3', 'gwei'),
-                    'nonce': nonce,
+                swap_tx = {
+                    **swap_router.swap_tx(route, wallet_address),
+                    **swap_router.gas_params(route, 'standard'),
                     'chainId': 56
-                })
+                }
+                self.context.gas_oracle.estimate(swap_tx, swap_router.gas_operation(route))
 
-                signed_tx = web3.eth.account.sign_transaction(swap_tx, MAIN_PRIVATE_KEY)
-                tx_hash = web3.eth.send_raw_transaction(signed_tx.raw_transaction)
+                tx_hash = nonce_manager.send_transaction(swap_tx, MAIN_PRIVATE_KEY)
 
-                self.send_message(f"⏳ TX: {web3.to_hex(tx_hash)[:16]}...")
+                self.send_message(f"⏳ TX ({route.describe()}): {web3.to_hex(tx_hash)[:16]}...")
 
-                receipt = web3.eth.wait_for_transaction_receipt(tx_hash)
+                receipt = self.context.tx_pipeline.wait(tx_hash)
 
                 if receipt.status == 1:
                     success_msg = (
@@ -1676,17 +1737,17 @@ Example: /bet 1/50/up
             is_bnb = (currency == 'bnb')
             
             # Validate address
-            from web3 import Web3
             try:
-                recipient_address = Web3.to_checksum_address(recipient_input)
+                recipient_address = to_checksum_address(recipient_input)
             except: 
                 self.send_message("❌ Invalid address format!")
                 return
             
             # Get balances
-            from mv5 import web3, MAIN_WALLET_ADDRESS, usdt_contract
+            from mv5 import MAIN_WALLET_ADDRESS
+            web3, usdt_contract, nonce_manager = self.context.web3, self.context.usdt_contract, self.context.nonce_manager
             
-            main_address = Web3.to_checksum_address(MAIN_WALLET_ADDRESS)
+            main_address = to_checksum_address(MAIN_WALLET_ADDRESS)
             bnb_balance = web3.eth. get_balance(main_address) / 1e18
             usdt_balance = usdt_contract.functions.balanceOf(main_address).call() / 1e18
             
@@ -1747,23 +1808,18 @@ Example: /bet 1/50/up
             
             if is_bnb: 
                 # Send BNB
-                nonce = web3.eth.get_transaction_count(main_address)
-                
                 tx = {
                     'to':  recipient_address,
                     'value': web3.to_wei(amount, 'ether'),
-                    'gas': 21000,
-                    'gasPrice': web3.to_wei('3', 'gwei'),
-                    'nonce': nonce,
+                    **self.context.gas_oracle.params('transfer', 'standard'),
                     'chainId':  56
                 }
                 
-                signed_tx = web3.eth.account.sign_transaction(tx, MAIN_PRIVATE_KEY)
-                tx_hash = web3.eth.send_raw_transaction(signed_tx.raw_transaction)
+                tx_hash = nonce_manager.send_transaction(tx, MAIN_PRIVATE_KEY)
                 
                 self.send_message(f"⏳ TX:  {web3.to_hex(tx_hash)[:16]}...")
                 
-                receipt = web3.eth. wait_for_transaction_receipt(tx_hash)
+                receipt = self.context.tx_pipeline.wait(tx_hash)
                 
                 if receipt.status == 1:
                     success_msg = (
@@ -1780,25 +1836,22 @@ Example: /bet 1/50/up
             else:
                 # Send USDT
                 amount_wei = int(amount * 1e18)
-                nonce = web3.eth.get_transaction_count(main_address)
-                
+
                 transfer_tx = usdt_contract.functions.transfer(
                     recipient_address,
                     amount_wei
                 ).build_transaction({
                     'from': main_address,
-                    'gas': 100000,
-                    'gasPrice':  web3.to_wei('3', 'gwei'),
-                    'nonce': nonce,
+                    **self.context.gas_oracle.params('token_transfer', 'standard'),
                     'chainId': 56
                 })
-                
-                signed_tx = web3.eth.account.sign_transaction(transfer_tx, MAIN_PRIVATE_KEY)
-                tx_hash = web3.eth.send_raw_transaction(signed_tx. raw_transaction)
+                self.context.gas_oracle.estimate(transfer_tx, 'token_transfer')
+
+                tx_hash = nonce_manager.send_transaction(transfer_tx, MAIN_PRIVATE_KEY)
                 
                 self.send_message(f"⏳ TX: {web3.to_hex(tx_hash)[:16]}...")
                 
-                receipt = web3.eth.wait_for_transaction_receipt(tx_hash)
+                receipt = self.context.tx_pipeline.wait(tx_hash)
                 
                 if receipt.status == 1:
                     success_msg = (
@@ -1820,8 +1873,7 @@ Example: /bet 1/50/up
     def cmd_unwrap(self, args=None):
         """Unwrap WBNB to native BNB from any wallet"""
         try:
-            from web3 import Web3
-            from mv5 import web3, WBNB
+            web3 = self.context.web3
 
             # Check if wallet specified
             if args and len(args) > 0:
@@ -1833,7 +1885,7 @@ Example: /bet 1/50/up
                         return
 
                     wallet = self.wallet_manager.wallets[wallet_idx]
-                    wallet_address = Web3.to_checksum_address(wallet['address'])
+                    wallet_address = to_checksum_address(wallet['address'])
                     private_key = wallet['private_key']
                     wallet_name = wallet['name']
 
@@ -1843,77 +1895,25 @@ Example: /bet 1/50/up
             else:
                 # No wallet specified - check main wallet
                 from mv5 import MAIN_WALLET_ADDRESS, MAIN_PRIVATE_KEY
-                wallet_address = Web3.to_checksum_address(MAIN_WALLET_ADDRESS)
+                wallet_address = to_checksum_address(MAIN_WALLET_ADDRESS)
                 private_key = MAIN_PRIVATE_KEY
                 wallet_name = "Main Wallet"
 
-            # WBNB contract ABIs
-            wbnb_balance_abi = [
-                {
-                    "constant": True,
-                    "inputs": [{"name": "_owner", "type": "address"}],
-                    "name": "balanceOf",
-                    "outputs": [{"name": "balance", "type": "uint256"}],
-                    "type": "function"
-                }
-            ]
-
-            wbnb_withdraw_abi = [
-                {
-                    "constant": False,
-                    "inputs": [{"name": "wad", "type": "uint256"}],
-                    "name": "withdraw",
-                    "outputs": [],
-                    "stateMutability": "nonpayable",
-                    "type": "function"
-                }
-            ]
-
-            # Get WBNB balance
-            wbnb_contract_balance = web3.eth.contract(
-                address=Web3.to_checksum_address(WBNB),
-                abi=wbnb_balance_abi
-            )
+            self.send_message(f"🔄 Unwrapping WBNB from {wallet_name}...")
 
-            wbnb_balance = wbnb_contract_balance.functions.balanceOf(wallet_address).call()
+            wbnb_balance, receipt = self.swap_manager.unwrap_wbnb(wallet_address, private_key)
             wbnb_balance_human = wbnb_balance / 1e18
 
-            if wbnb_balance == 0:
+            if receipt is None:
                 self.send_message(f"✅ No WBNB in {wallet_name}!\n\n💡 Try: /checkwbnb to see all wallets")
                 return
 
-            self.send_message(f"🔄 Unwrapping {wbnb_balance_human:.6f} WBNB from {wallet_name}...")
-
-            # Unwrap WBNB
-            wbnb_contract = web3.eth.contract(
-                address=Web3.to_checksum_address(WBNB),
-                abi=wbnb_withdraw_abi
-            )
-
-            nonce = web3.eth.get_transaction_count(wallet_address)
-
-            unwrap_tx = wbnb_contract.functions.withdraw(wbnb_balance).build_transaction({
-                'from': wallet_address,
-                'gas': 50000,
-                'gasPrice': web3.to_wei('3', 'gwei'),
-                'nonce': nonce,
-                'chainId': 56,
-                'value': 0
-            })
-
-            signed_tx = web3.eth.account.sign_transaction(unwrap_tx, private_key)
-            tx_hash = web3.eth.send_raw_transaction(signed_tx.raw_transaction)
-
-            self.send_message(f"⏳ TX:  {web3.to_hex(tx_hash)[:16]}...")
-
-            receipt = web3.eth.wait_for_transaction_receipt(tx_hash)
-
             if receipt.status == 1:
                 success_msg = (
                     f"✅ <b>UNWRAP COMPLETED!</b>\n\n"
                     f"👤 {wallet_name}\n"
                     f"🔄 {wbnb_balance_human:.6f} WBNB → BNB\n"
-                    f"🔗 <a href='https://bscscan.com/tx/{web3.to_hex(tx_hash)}'>View TX</a>\n"
+                    f"🔗 <a href='https://bscscan.com/tx/{web3.to_hex(receipt.transactionHash)}'>View TX</a>\n"
                     f"⏰ {datetime.now().strftime('%H:%M:%S')}"
                 )
                 self.send_message(success_msg)
@@ -0,0 +1,55 @@
+import json
+import os
+
+import pytest
+
+from atr_engine import BINANCE_KLINES_LIMIT, ATREngine
+
+# Synthetic BNBUSDT 1h klines in Binance's response format (not a recording)
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "atr_fixtures")
+
+
+def load_klines(interval='1h'):
+    with open(os.path.join(FIXTURES_DIR, f"klines_BNBUSDT_{interval}.json"), 'r') as f:
+        rows = json.load(f)
+    return [float(row[2]) for row in rows], [float(row[3]) for row in rows], [float(row[4]) for row in rows]
+
+
+def reference_atr(high, low, close, window):
+    """ta.volatility.AverageTrueRange, transcribed: mean of the first window TRs, then Wilder smoothing"""
+    tr = [high[0] - low[0]] + [
+        max(high[i] - low[i], abs(high[i] - close[i - 1]), abs(low[i] - close[i - 1]))
+        for i in range(1, len(close))
+    ]
+    atr = [0.0] * len(close)
+    atr[window - 1] = sum(tr[:window]) / window
+    for i in range(window, len(close)):
+        atr[i] = (atr[i - 1] * (window - 1) + tr[i]) / window
+    return atr
+
+
+@pytest.mark.parametrize("period", [7, 14, 50])
+def test_matches_reference_atr(period):
+    high, low, close = load_klines()
+    data = ATREngine(fixtures_dir=FIXTURES_DIR).get('1h', period)
+    assert data['atr'] == pytest.approx(reference_atr(high, low, close, period)[-1], rel=1e-9)
+    assert data['current_price'] == close[-1]
+
+
+def test_matches_ta_average_true_range():
+    pd = pytest.importorskip("pandas")
+    ta_volatility = pytest.importorskip("ta.volatility")
+    high, low, close = load_klines()
+    expected = ta_volatility.AverageTrueRange(
+        high=pd.Series(high), low=pd.Series(low), close=pd.Series(close), window=14
+    ).average_true_range().iloc[-1]
+    assert ATREngine(fixtures_dir=FIXTURES_DIR).get('1h', 14)['atr'] == pytest.approx(expected, rel=1e-9)
+
+
+def test_initial_fetch_stays_within_binance_limit():
+    engine = ATREngine(history=1000, fixtures_dir=FIXTURES_DIR)
+    limits = []
+    fetch = engine._fetch
+    engine._fetch = lambda interval, start_time=None, limit=BINANCE_KLINES_LIMIT: limits.append(limit) or fetch(interval, start_time, limit)
+    engine.refresh('1h', force=True)
+    assert limits == [BINANCE_KLINES_LIMIT]
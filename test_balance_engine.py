@@ -0,0 +1,56 @@
+from balance_engine import BalanceEngine
+
+WALLET = "0x" + "11" * 20
+
+
+class FakeMulticall:
+    """aggregate() answering every call from a list, None for a reverted subcall"""
+
+    def __init__(self, results):
+        self.results = results
+
+    def eth_balance(self, address):
+        return ('getEthBalance', address)
+
+    def aggregate(self, calls, block_identifier=None):
+        return 100, self.results[:len(list(calls))]
+
+
+class FakeToken:
+    abi = []
+
+    class functions:
+        @staticmethod
+        def balanceOf(address):
+            return ('balanceOf', address)
+
+
+class FakeWeb3:
+    class eth:
+        @staticmethod
+        def contract(address, abi):
+            return FakeToken()
+
+
+def snapshot(results):
+    engine = BalanceEngine(FakeWeb3(), FakeToken(), "0x" + "22" * 20, multicall=FakeMulticall(results))
+    return engine.snapshot([WALLET])
+
+
+def test_failed_subcall_is_unknown_not_zero():
+    snap = snapshot([None, 5 * 10 ** 18, 0])
+    assert snap.bnb_wei(WALLET) is None
+    assert snap.usdt(WALLET) == 5.0
+    assert snap.wbnb(WALLET) == 0
+    assert not snap.complete(WALLET)
+
+    wallet = {'address': WALLET, 'balance_bnb': 1.5, 'balance_usdt': 0}
+    snap.apply_to(wallet)
+    assert wallet == {'address': WALLET, 'balance_bnb': 1.5, 'balance_usdt': 5.0, 'balance_wbnb': 0}
+
+
+def test_unread_address_is_unknown():
+    snap = snapshot([10 ** 18, 0, 0])
+    assert snap.complete(WALLET)
+    assert snap.bnb(WALLET) == 1.0
+    assert snap.bnb_wei("0x" + "33" * 20) is None
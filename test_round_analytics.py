@@ -0,0 +1,68 @@
+import pytest
+
+from round_analytics import RoundAnalytics, run_lengths
+from round_store import RoundStore
+
+# Two BULL rounds, a missing epoch 103, then BULL again and a BEAR run
+EPOCHS = [100, 101, 102, 104, 105, 106, 107, 108]
+WINNERS = ['BULL', 'BULL', 'BULL', 'BULL', 'BEAR', 'BEAR', 'BULL', 'BULL']
+
+
+@pytest.fixture
+def store(tmp_path):
+    return RoundStore(str(tmp_path / "rounds.bin"))
+
+
+def rounds(epochs, winners):
+    return [{'epoch': e, 'winner': w, 'lock_price': 600.0 + e, 'close_price': 601.0 + e} for e, w in zip(epochs, winners)]
+
+
+def test_run_lengths_breaks_at_missing_epochs(store):
+    store.extend(rounds(EPOCHS, WINNERS))
+    _, starts, lengths = run_lengths(store['winner'], store['epoch'])
+    assert starts.tolist() == [0, 3, 4, 6]
+    assert lengths.tolist() == [3, 1, 2, 2]
+
+
+def test_incremental_matches_rebuild_across_gaps(store):
+    incremental = RoundAnalytics(store, window=4)
+    for r in rounds(EPOCHS, WINNERS):
+        store.append(r)
+        incremental.sync()
+
+    rebuilt = RoundAnalytics(store, window=4)
+    rebuilt.sync()  # more rounds than the window at once: one vectorized rebuild
+
+    for analytics in (incremental, rebuilt):
+        assert analytics.current_streak == ("BULL", 2)
+        assert analytics.longest == {1: 3, -1: 2}
+        assert analytics.window_wins == {1: 2, -1: 2}
+
+
+def test_streak_resets_after_missing_epoch(store):
+    analytics = RoundAnalytics(store, window=24)
+    store.extend(rounds([1, 2], ['BEAR', 'BEAR']))
+    analytics.sync()
+    store.extend(rounds([4], ['BEAR']))
+    analytics.sync()
+    assert analytics.current_streak == ("BEAR", 1)
+
+
+def test_window_summary_counts_epochs_not_rows(store):
+    store.extend(rounds([1, 2, 50, 51], ['BULL', 'BULL', 'BEAR', 'BULL']))
+    analytics = RoundAnalytics(store, window=24)
+    analytics.sync()
+    summary = analytics.window_summary()
+    assert summary['rounds'] == 2
+    assert (summary['bull_wins'], summary['bear_wins']) == (1, 1)
+    assert summary['first_price'] == 650.0
+
+
+def test_report_leaves_out_streaks_cut_by_missing_epochs(store):
+    store.extend(rounds(EPOCHS, WINNERS))
+    report = RoundAnalytics(store).report()
+    # Only the BEAR x2 run is complete: BULL x3 ends at the gap, BULL x1 starts
+    # after it and the last BULL x2 is still running
+    assert report['streaks'] == {'BULL': {}, 'BEAR': {2: 1}}
+    assert report['current_streak'] == ("BULL", 2)
+    assert report['longest'] == {'BULL': 3, 'BEAR': 2}
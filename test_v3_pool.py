@@ -0,0 +1,57 @@
+import json
+import os
+
+import pytest
+
+from v3_pool import (MAX_SQRT_RATIO, MAX_TICK, MIN_SQRT_RATIO, MIN_TICK, PoolSnapshot, get_sqrt_ratio_at_tick,
+                     get_tick_at_sqrt_ratio, verify_fixtures)
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "v3_fixtures.json")
+
+
+def test_tick_math_bounds():
+    assert get_sqrt_ratio_at_tick(MIN_TICK) == MIN_SQRT_RATIO
+    assert get_sqrt_ratio_at_tick(MAX_TICK) == MAX_SQRT_RATIO
+    assert get_sqrt_ratio_at_tick(0) == 2 ** 96
+
+
+@pytest.mark.parametrize("tick", [MIN_TICK, -200000, -1, 0, 1, 50000, MAX_TICK - 1])
+def test_tick_round_trip(tick):
+    assert get_tick_at_sqrt_ratio(get_sqrt_ratio_at_tick(tick)) == tick
+
+
+def test_matches_recorded_quoter():
+    if not os.path.exists(FIXTURES):
+        pytest.skip("no v3_fixtures.json - record one with: python v3_pool.py --record v3_fixtures.json")
+    with open(FIXTURES, 'r') as f:
+        data = json.load(f)
+
+    # Both directions, and sizes large enough to cross initialized ticks
+    assert len({quote['token_in'] for quote in data['quotes']}) == 2
+    assert max(quote.get('ticks_crossed', 0) for quote in data['quotes']) > 0
+    assert verify_fixtures(FIXTURES)
+
+
+def write_fixture(path, amounts):
+    """Fixture over a small synthetic snapshot; amount_out comes from the local math itself,
+    so this only exercises verify_fixtures' accounting, not parity with QuoterV2"""
+    liquidity = 10 ** 24
+    snapshot = PoolSnapshot(1, '0x' + '1' * 40, '0x' + '2' * 40, 500, 10, get_sqrt_ratio_at_tick(0), 0, liquidity,
+                            {-1: 1 << 246, 0: 1 << 10}, {-100: -liquidity // 2, 100: liquidity // 2})
+    quotes = []
+    for amount_in in amounts:
+        amount_out = snapshot.quote_exact_input(snapshot.token0, amount_in) if amount_in < 10 ** 25 else 0
+        quotes.append({'token_in': snapshot.token0, 'amount_in': str(amount_in), 'amount_out': str(amount_out)})
+    with open(path, 'w') as f:
+        json.dump({'snapshot': snapshot.to_dict(), 'quotes': quotes}, f)
+    return str(path)
+
+
+def test_verify_fixtures_needs_checked_quotes(tmp_path):
+    assert verify_fixtures(write_fixture(tmp_path / "fixture.json", [10 ** 18, 10 ** 23]))
+    assert not verify_fixtures(write_fixture(tmp_path / "empty.json", []))
+
+
+def test_verify_fixtures_fails_on_quotes_beyond_the_snapshot(tmp_path):
+    # 1e26 runs past the loaded bitmap words
+    assert not verify_fixtures(write_fixture(tmp_path / "fixture.json", [10 ** 18, 10 ** 26]))
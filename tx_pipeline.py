@@ -0,0 +1,168 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from web3 import Web3
+from web3.datastructures import AttributeDict
+from web3.exceptions import TimeExhausted, TransactionNotFound
+
+
+class TxPipeline:
+    """
+    One place that sends transactions and watches them get mined.
+
+    submit() signs and broadcasts through the NonceManager; submit() and
+    track() return a Future that resolves to the receipt (or raises
+    TimeExhausted after `timeout` seconds); future.resolved_at is when the
+    receipt was seen. A single tracker thread checks
+    the block number every `poll_interval` seconds and, once per new block,
+    asks for the receipts of every in-flight tx in one JSON-RPC batch.
+
+    Futures are resolved on a small callback pool, not on the tracker
+    thread, so done-callbacks (notifications, order updates, unwrap
+    follow-ups) may send and even wait on further transactions.
+    """
+
+    def __init__(self, web3, nonce_manager, poll_interval=0.5, timeout=180, callback_workers=8):
+        self.web3 = web3
+        self.nonce_manager = nonce_manager
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+
+        self.in_flight = {}  # tx hash (hex) -> (future, label, deadline)
+        self.condition = threading.Condition()
+        self.callbacks = ThreadPoolExecutor(max_workers=callback_workers, thread_name_prefix="tx-callback")
+        self.thread = None
+        self.last_block = None
+        self.batch_supported = True  # False once the provider says it can't batch
+        self.batch_retry_at = 0  # after any other batch error, poll one by one until then
+        self.batch_cooldown = 60
+
+    # === Public API ===
+
+    def submit(self, tx, private_key, label=None, timeout=None):
+        """Sign + send tx (nonce filled in if missing); Future of its receipt. Send errors raise here."""
+        tx_hash = self.nonce_manager.send_transaction(tx, private_key)
+        return self.track(tx_hash, label, timeout)
+
+    def track(self, tx_hash, label=None, timeout=None):
+        """Future of the receipt of an already broadcast tx (same Future if it is tracked already)"""
+        tx_hash = tx_hash.lower() if isinstance(tx_hash, str) else Web3.to_hex(tx_hash)
+        with self.condition:
+            if tx_hash in self.in_flight:
+                return self.in_flight[tx_hash][0]
+            future = Future()
+            future.tx_hash = tx_hash
+            future.label = label
+            self.in_flight[tx_hash] = (future, label, time.time() + (timeout or self.timeout))
+            self._ensure_thread()
+            self.condition.notify()
+        return future
+
+    def wait(self, tx_hash, timeout=None):
+        """Blocking receipt, drop-in for web3.eth.wait_for_transaction_receipt"""
+        return self.track(tx_hash, timeout=timeout).result()
+
+    @property
+    def pending(self):
+        with self.condition:
+            return len(self.in_flight)
+
+    # === Tracker thread ===
+
+    def _ensure_thread(self):
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self._run, name="tx-pipeline", daemon=True)
+            self.thread.start()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while not self.in_flight:
+                    self.condition.wait()
+            try:
+                self._poll()
+            except Exception as e:
+                print(f"⚠️ TX pipeline poll error: {e}")
+            time.sleep(self.poll_interval)
+
+    def _poll(self):
+        block_number = self.web3.eth.block_number
+        with self.condition:
+            hashes = list(self.in_flight)
+            # Newly added txs are checked right away, the rest once per block
+            fresh = [h for h in hashes if not getattr(self.in_flight[h][0], 'checked', False)]
+        if block_number == self.last_block:
+            hashes = fresh
+        if not hashes:
+            return
+
+        receipts = self._fetch_receipts(hashes)
+        self.last_block = block_number
+
+        now = time.time()
+        with self.condition:
+            for tx_hash in hashes:
+                entry = self.in_flight.get(tx_hash)
+                if entry is None:
+                    continue
+                future, label, deadline = entry
+                future.checked = True
+                receipt = receipts.get(tx_hash)
+                if receipt is not None:
+                    future.resolved_at = now
+                    del self.in_flight[tx_hash]
+                    self.callbacks.submit(self._resolve, future, receipt, None)
+                elif now > deadline:
+                    del self.in_flight[tx_hash]
+                    error = TimeExhausted(f"{label or tx_hash} was not mined in time")
+                    self.callbacks.submit(self._resolve, future, None, error)
+
+    @staticmethod
+    def _resolve(future, receipt, error):
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(receipt)
+
+    def _fetch_receipts(self, hashes):
+        """{tx hash: receipt} for the mined ones: one JSON-RPC batch, else one call each"""
+        if self.batch_supported and time.time() >= self.batch_retry_at:
+            try:
+                responses = self.web3.provider.make_batch_request(
+                    [("eth_getTransactionReceipt", [tx_hash]) for tx_hash in hashes]
+                )
+                if isinstance(responses, list):
+                    return self._format_batch(hashes, responses)
+                raise ValueError(responses.get('error') if isinstance(responses, dict) else responses)
+            except (AttributeError, NotImplementedError) as e:
+                print(f"⚠️ Provider can't batch ({e}), polling receipts one by one")
+                self.batch_supported = False
+            except Exception as e:
+                if 'batch' in str(e).lower():
+                    print(f"⚠️ Node rejects batch requests ({e}), polling receipts one by one")
+                    self.batch_supported = False
+                else:
+                    # Timeouts and the like: try batching again after the cooldown
+                    print(f"⚠️ Batch receipts failed ({e}), polling one by one for {self.batch_cooldown}s")
+                    self.batch_retry_at = time.time() + self.batch_cooldown
+
+        receipts = {}
+        for tx_hash in hashes:
+            try:
+                receipts[tx_hash] = self.web3.eth.get_transaction_receipt(tx_hash)
+            except TransactionNotFound:
+                pass
+        return receipts
+
+    def _format_batch(self, hashes, responses):
+        from web3._utils.method_formatters import receipt_formatter
+
+        receipts = {}
+        for tx_hash, response in zip(hashes, responses):
+            result = response.get('result') if isinstance(response, dict) else None
+            if result:
+                receipts[tx_hash] = AttributeDict.recursive(receipt_formatter(result))
+        return receipts
@@ -0,0 +1,568 @@
+"""
+Exact-input quotes for a PancakeSwap V3 (Uniswap V3 math) pool, computed
+in-process from a per-block snapshot of slot0, liquidity, the tick bitmap
+words around the current price and their initialized ticks.
+
+The math is a straight port of TickMath, SqrtPriceMath, SwapMath and
+TickBitmap with Python integers and should match QuoterV2 to the wei;
+test_v3_pool.py replays recorded QuoterV2 results (v3_fixtures.json) to
+check it. Until then swaps take their amountOutMinimum from QuoterV2.
+
+    python v3_pool.py --record v3_fixtures.json    # snapshot + QuoterV2 results at one block (needs RPC)
+    python v3_pool.py --verify v3_fixtures.json    # replay the snapshot offline and compare
+"""
+import json
+import threading
+import time
+
+from eth_utils import to_checksum_address
+
+PANCAKE_V3_FACTORY = "0x0BFbCF9fa4f9C56B0F40a671Ad40E0805A091865"
+
+MIN_TICK = -887272
+MAX_TICK = 887272
+MIN_SQRT_RATIO = 4295128739
+MAX_SQRT_RATIO = 1461446703485210103287273052203988822378723970342
+Q96 = 1 << 96
+MAX_UINT160 = (1 << 160) - 1
+MAX_UINT256 = (1 << 256) - 1
+
+FACTORY_ABI = [
+    {
+        "inputs": [
+            {"internalType": "address", "name": "tokenA", "type": "address"},
+            {"internalType": "address", "name": "tokenB", "type": "address"},
+            {"internalType": "uint24", "name": "fee", "type": "uint24"}
+        ],
+        "name": "getPool",
+        "outputs": [{"internalType": "address", "name": "", "type": "address"}],
+        "stateMutability": "view",
+        "type": "function"
+    }
+]
+
+POOL_ABI = [
+    {
+        "inputs": [],
+        "name": "slot0",
+        "outputs": [
+            {"internalType": "uint160", "name": "sqrtPriceX96", "type": "uint160"},
+            {"internalType": "int24", "name": "tick", "type": "int24"},
+            {"internalType": "uint16", "name": "observationIndex", "type": "uint16"},
+            {"internalType": "uint16", "name": "observationCardinality", "type": "uint16"},
+            {"internalType": "uint16", "name": "observationCardinalityNext", "type": "uint16"},
+            {"internalType": "uint32", "name": "feeProtocol", "type": "uint32"},
+            {"internalType": "bool", "name": "unlocked", "type": "bool"}
+        ],
+        "stateMutability": "view",
+        "type": "function"
+    },
+    {
+        "inputs": [],
+        "name": "liquidity",
+        "outputs": [{"internalType": "uint128", "name": "", "type": "uint128"}],
+        "stateMutability": "view",
+        "type": "function"
+    },
+    {
+        "inputs": [{"internalType": "int16", "name": "", "type": "int16"}],
+        "name": "tickBitmap",
+        "outputs": [{"internalType": "uint256", "name": "", "type": "uint256"}],
+        "stateMutability": "view",
+        "type": "function"
+    },
+    {
+        "inputs": [{"internalType": "int24", "name": "", "type": "int24"}],
+        "name": "ticks",
+        "outputs": [
+            {"internalType": "uint128", "name": "liquidityGross", "type": "uint128"},
+            {"internalType": "int128", "name": "liquidityNet", "type": "int128"},
+            {"internalType": "uint256", "name": "feeGrowthOutside0X128", "type": "uint256"},
+            {"internalType": "uint256", "name": "feeGrowthOutside1X128", "type": "uint256"},
+            {"internalType": "int56", "name": "tickCumulativeOutside", "type": "int56"},
+            {"internalType": "uint160", "name": "secondsPerLiquidityOutsideX128", "type": "uint160"},
+            {"internalType": "uint32", "name": "secondsOutside", "type": "uint32"},
+            {"internalType": "bool", "name": "initialized", "type": "bool"}
+        ],
+        "stateMutability": "view",
+        "type": "function"
+    },
+    {
+        "inputs": [],
+        "name": "token0",
+        "outputs": [{"internalType": "address", "name": "", "type": "address"}],
+        "stateMutability": "view",
+        "type": "function"
+    },
+    {
+        "inputs": [],
+        "name": "token1",
+        "outputs": [{"internalType": "address", "name": "", "type": "address"}],
+        "stateMutability": "view",
+        "type": "function"
+    },
+    {
+        "inputs": [],
+        "name": "fee",
+        "outputs": [{"internalType": "uint24", "name": "", "type": "uint24"}],
+        "stateMutability": "view",
+        "type": "function"
+    },
+    {
+        "inputs": [],
+        "name": "tickSpacing",
+        "outputs": [{"internalType": "int24", "name": "", "type": "int24"}],
+        "stateMutability": "view",
+        "type": "function"
+    }
+]
+
+
+# === FullMath / UnsafeMath ===
+
+def mul_div(a, b, denominator):
+    return a * b // denominator
+
+
+def mul_div_rounding_up(a, b, denominator):
+    return -(-a * b // denominator)
+
+
+def div_rounding_up(a, b):
+    return -(-a // b)
+
+
+# === TickMath ===
+
+_TICK_RATIOS = (
+    (0x2, 0xfff97272373d413259a46990580e213a),
+    (0x4, 0xfff2e50f5f656932ef12357cf3c7fdcc),
+    (0x8, 0xffe5caca7e10e4e61c3624eaa0941cd0),
+    (0x10, 0xffcb9843d60f6159c9db58835c926644),
+    (0x20, 0xff973b41fa98c081472e6896dfb254c0),
+    (0x40, 0xff2ea16466c96a3843ec78b326b52861),
+    (0x80, 0xfe5dee046a99a2a811c461f1969c3053),
+    (0x100, 0xfcbe86c7900a88aedcffc83b479aa3a4),
+    (0x200, 0xf987a7253ac413176f2b074cf7815e54),
+    (0x400, 0xf3392b0822b70005940c7a398e4b70f3),
+    (0x800, 0xe7159475a2c29b7443b29c7fa6e889d9),
+    (0x1000, 0xd097f3bdfd2022b8845ad8f792aa5825),
+    (0x2000, 0xa9f746462d870fdf8a65dc1f90e061e5),
+    (0x4000, 0x70d869a156d2a1b890bb3df62baf32f7),
+    (0x8000, 0x31be135f97d08fd981231505542fcfa6),
+    (0x10000, 0x9aa508b5b7a84e1c677de54f3e99bc9),
+    (0x20000, 0x5d6af8dedb81196699c329225ee604),
+    (0x40000, 0x2216e584f5fa1ea926041bedfe98),
+    (0x80000, 0x48a170391f7dc42444e8fa2),
+)
+
+
+def get_sqrt_ratio_at_tick(tick):
+    abs_tick = abs(tick)
+    if abs_tick > MAX_TICK:
+        raise ValueError(f"tick {tick} out of range")
+
+    ratio = 0xfffcb933bd6fad37aa2d162d1a594001 if abs_tick & 0x1 else 0x100000000000000000000000000000000
+    for bit, factor in _TICK_RATIOS:
+        if abs_tick & bit:
+            ratio = (ratio * factor) >> 128
+    if tick > 0:
+        ratio = MAX_UINT256 // ratio
+
+    return (ratio >> 32) + (0 if ratio % (1 << 32) == 0 else 1)
+
+
+def get_tick_at_sqrt_ratio(sqrt_price_x96):
+    """Greatest tick whose sqrt ratio is <= sqrt_price_x96"""
+    if not MIN_SQRT_RATIO <= sqrt_price_x96 < MAX_SQRT_RATIO:
+        raise ValueError("sqrt price out of range")
+    low, high = MIN_TICK, MAX_TICK
+    while low < high:
+        mid = (low + high + 1) // 2
+        if get_sqrt_ratio_at_tick(mid) <= sqrt_price_x96:
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+# === SqrtPriceMath ===
+
+def get_next_sqrt_price_from_amount0_rounding_up(sqrt_price_x96, liquidity, amount, add):
+    if amount == 0:
+        return sqrt_price_x96
+    numerator1 = liquidity << 96
+
+    if add:
+        product = amount * sqrt_price_x96
+        if product <= MAX_UINT256:
+            denominator = numerator1 + product
+            if denominator <= MAX_UINT256:
+                return mul_div_rounding_up(numerator1, sqrt_price_x96, denominator)
+        return div_rounding_up(numerator1, numerator1 // sqrt_price_x96 + amount)
+
+    product = amount * sqrt_price_x96
+    if product > MAX_UINT256 or numerator1 <= product:
+        raise ValueError("price underflow")
+    return mul_div_rounding_up(numerator1, sqrt_price_x96, numerator1 - product)
+
+
+def get_next_sqrt_price_from_amount1_rounding_down(sqrt_price_x96, liquidity, amount, add):
+    if add:
+        quotient = (amount << 96) // liquidity if amount <= MAX_UINT160 else mul_div(amount, Q96, liquidity)
+        return sqrt_price_x96 + quotient
+
+    quotient = div_rounding_up(amount << 96, liquidity) if amount <= MAX_UINT160 else mul_div_rounding_up(amount, Q96, liquidity)
+    if sqrt_price_x96 <= quotient:
+        raise ValueError("price underflow")
+    return sqrt_price_x96 - quotient
+
+
+def get_next_sqrt_price_from_input(sqrt_price_x96, liquidity, amount_in, zero_for_one):
+    if zero_for_one:
+        return get_next_sqrt_price_from_amount0_rounding_up(sqrt_price_x96, liquidity, amount_in, True)
+    return get_next_sqrt_price_from_amount1_rounding_down(sqrt_price_x96, liquidity, amount_in, True)
+
+
+def get_amount0_delta(sqrt_a, sqrt_b, liquidity, round_up):
+    if sqrt_a > sqrt_b:
+        sqrt_a, sqrt_b = sqrt_b, sqrt_a
+    numerator1 = liquidity << 96
+    numerator2 = sqrt_b - sqrt_a
+    if round_up:
+        return div_rounding_up(mul_div_rounding_up(numerator1, numerator2, sqrt_b), sqrt_a)
+    return mul_div(numerator1, numerator2, sqrt_b) // sqrt_a
+
+
+def get_amount1_delta(sqrt_a, sqrt_b, liquidity, round_up):
+    if sqrt_a > sqrt_b:
+        sqrt_a, sqrt_b = sqrt_b, sqrt_a
+    if round_up:
+        return mul_div_rounding_up(liquidity, sqrt_b - sqrt_a, Q96)
+    return mul_div(liquidity, sqrt_b - sqrt_a, Q96)
+
+
+# === SwapMath (exact input) ===
+
+def compute_swap_step(sqrt_current, sqrt_target, liquidity, amount_remaining, fee_pips):
+    """(sqrt price after, amount in, amount out, fee amount) of one exact-input step"""
+    zero_for_one = sqrt_current >= sqrt_target
+
+    amount_remaining_less_fee = mul_div(amount_remaining, 1000000 - fee_pips, 1000000)
+    if zero_for_one:
+        amount_in = get_amount0_delta(sqrt_target, sqrt_current, liquidity, True)
+    else:
+        amount_in = get_amount1_delta(sqrt_current, sqrt_target, liquidity, True)
+
+    if amount_remaining_less_fee >= amount_in:
+        sqrt_next = sqrt_target
+    else:
+        sqrt_next = get_next_sqrt_price_from_input(sqrt_current, liquidity, amount_remaining_less_fee, zero_for_one)
+
+    reached_target = sqrt_next == sqrt_target
+    if zero_for_one:
+        if not reached_target:
+            amount_in = get_amount0_delta(sqrt_next, sqrt_current, liquidity, True)
+        amount_out = get_amount1_delta(sqrt_next, sqrt_current, liquidity, False)
+    else:
+        if not reached_target:
+            amount_in = get_amount1_delta(sqrt_current, sqrt_next, liquidity, True)
+        amount_out = get_amount0_delta(sqrt_current, sqrt_next, liquidity, False)
+
+    if not reached_target:
+        fee_amount = amount_remaining - amount_in
+    else:
+        fee_amount = mul_div_rounding_up(amount_in, fee_pips, 1000000 - fee_pips)
+    return sqrt_next, amount_in, amount_out, fee_amount
+
+
+class TickOutOfRange(Exception):
+    """The swap would leave the tick bitmap words loaded in the snapshot"""
+
+
+class PoolSnapshot:
+    """Pool state at one block: enough to run swap() for sizes that stay within the loaded words"""
+
+    def __init__(self, block_number, token0, token1, fee, tick_spacing, sqrt_price_x96, tick, liquidity,
+                 bitmap, liquidity_net):
+        self.block_number = block_number
+        self.token0 = to_checksum_address(token0)
+        self.token1 = to_checksum_address(token1)
+        self.fee = fee
+        self.tick_spacing = tick_spacing
+        self.sqrt_price_x96 = sqrt_price_x96
+        self.tick = tick
+        self.liquidity = liquidity
+        self.bitmap = bitmap  # word position -> uint256
+        self.liquidity_net = liquidity_net  # initialized tick -> liquidityNet
+
+    def next_initialized_tick(self, tick, lte):
+        """TickBitmap.nextInitializedTickWithinOneWord"""
+        compressed = tick // self.tick_spacing
+        if not lte:
+            compressed += 1
+        word_pos, bit_pos = compressed >> 8, compressed % 256
+        if word_pos not in self.bitmap:
+            raise TickOutOfRange(f"tick bitmap word {word_pos} not loaded")
+        word = self.bitmap[word_pos]
+
+        if lte:
+            masked = word & ((1 << bit_pos) - 1 + (1 << bit_pos))
+            if masked:
+                return (compressed - (bit_pos - (masked.bit_length() - 1))) * self.tick_spacing, True
+            return (compressed - bit_pos) * self.tick_spacing, False
+
+        masked = word & ~((1 << bit_pos) - 1) & MAX_UINT256
+        if masked:
+            lowest = (masked & -masked).bit_length() - 1
+            return (compressed + (lowest - bit_pos)) * self.tick_spacing, True
+        return (compressed + (255 - bit_pos)) * self.tick_spacing, False
+
+    def swap_exact_input(self, zero_for_one, amount_in):
+        """UniswapV3Pool.swap with no price limit (as QuoterV2 with sqrtPriceLimitX96 = 0): amount out"""
+        sqrt_price_limit = MIN_SQRT_RATIO + 1 if zero_for_one else MAX_SQRT_RATIO - 1
+        remaining = amount_in
+        amount_out = 0
+        sqrt_price = self.sqrt_price_x96
+        tick = self.tick
+        liquidity = self.liquidity
+
+        while remaining != 0 and sqrt_price != sqrt_price_limit:
+            sqrt_start = sqrt_price
+            tick_next, initialized = self.next_initialized_tick(tick, zero_for_one)
+            tick_next = min(max(tick_next, MIN_TICK), MAX_TICK)
+            sqrt_next = get_sqrt_ratio_at_tick(tick_next)
+
+            if (sqrt_next < sqrt_price_limit) if zero_for_one else (sqrt_next > sqrt_price_limit):
+                target = sqrt_price_limit
+            else:
+                target = sqrt_next
+            sqrt_price, step_in, step_out, step_fee = compute_swap_step(
+                sqrt_price, target, liquidity, remaining, self.fee
+            )
+            remaining -= step_in + step_fee
+            amount_out += step_out
+
+            if sqrt_price == sqrt_next:
+                if initialized:
+                    if tick_next not in self.liquidity_net:
+                        raise TickOutOfRange(f"tick {tick_next} not loaded")
+                    liquidity_net = self.liquidity_net[tick_next]
+                    liquidity += -liquidity_net if zero_for_one else liquidity_net
+                tick = tick_next - 1 if zero_for_one else tick_next
+            elif sqrt_price != sqrt_start:
+                tick = get_tick_at_sqrt_ratio(sqrt_price)
+
+        return amount_out
+
+    def quote_exact_input(self, token_in, amount_in):
+        """amountOut for amount_in of token_in (wei), like QuoterV2.quoteExactInputSingle"""
+        token_in = to_checksum_address(token_in)
+        if token_in not in (self.token0, self.token1):
+            raise ValueError(f"{token_in} is not in this pool")
+        return self.swap_exact_input(token_in == self.token0, amount_in)
+
+    def to_dict(self):
+        return {
+            'block_number': self.block_number,
+            'token0': self.token0,
+            'token1': self.token1,
+            'fee': self.fee,
+            'tick_spacing': self.tick_spacing,
+            'sqrt_price_x96': str(self.sqrt_price_x96),
+            'tick': self.tick,
+            'liquidity': str(self.liquidity),
+            'bitmap': {str(word): str(value) for word, value in self.bitmap.items()},
+            'liquidity_net': {str(tick): str(net) for tick, net in self.liquidity_net.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            data['block_number'], data['token0'], data['token1'], data['fee'], data['tick_spacing'],
+            int(data['sqrt_price_x96']), data['tick'], int(data['liquidity']),
+            {int(word): int(value) for word, value in data['bitmap'].items()},
+            {int(tick): int(net) for tick, net in data['liquidity_net'].items()},
+        )
+
+
+class V3Pool:
+    """
+    Per-block snapshots of one V3 pool: slot0, liquidity and the tick bitmap
+    words within `words` of the current one in one Multicall3 eth_call, then
+    liquidityNet of the initialized ticks in them, both pinned to the block.
+    Quotes in between are pure Python.
+    """
+
+    def __init__(self, web3, multicall, token_a, token_b, fee=500, pool_address=None, words=2,
+                 factory_address=PANCAKE_V3_FACTORY):
+        self.web3 = web3
+        self.multicall = multicall
+        self.token_a = to_checksum_address(token_a)
+        self.token_b = to_checksum_address(token_b)
+        self.fee = fee
+        self.words = words
+        self.factory_address = factory_address
+        self.pool_address = to_checksum_address(pool_address) if pool_address else None
+        self.contract = None
+        self.static = None  # (token0, token1, fee, tick_spacing)
+        self.snapshot = None
+        self.lock = threading.RLock()
+
+    def _pool(self):
+        if self.contract is None:
+            if self.pool_address is None:
+                factory = self.web3.eth.contract(address=to_checksum_address(self.factory_address), abi=FACTORY_ABI)
+                self.pool_address = factory.functions.getPool(self.token_a, self.token_b, self.fee).call()
+            self.contract = self.web3.eth.contract(address=self.pool_address, abi=POOL_ABI)
+        return self.contract
+
+    def _word_range(self, tick, tick_spacing):
+        center = (tick // tick_spacing) >> 8
+        return list(range(center - self.words, center + self.words + 1))
+
+    def refresh(self, block_number, extra_calls=()):
+        """
+        Snapshot the pool at block_number (no-op if already there).
+        extra_calls ride along in the first batch; returns (snapshot, extra results).
+        """
+        with self.lock:
+            extra_calls = list(extra_calls)
+            if self.snapshot and self.snapshot.block_number == block_number:
+                if not extra_calls:
+                    return self.snapshot, []
+                return self.snapshot, self.multicall.aggregate(extra_calls, block_identifier=block_number)[1]
+
+            pool = self._pool().functions
+            calls = [pool.slot0(), pool.liquidity()]
+            guessed = []
+            if self.static is None:
+                calls += [pool.token0(), pool.token1(), pool.fee(), pool.tickSpacing()]
+            elif self.snapshot is not None:
+                # Bitmap words around the last tick: usually still the right ones
+                guessed = self._word_range(self.snapshot.tick, self.static[3])
+                calls += [pool.tickBitmap(pos) for pos in guessed]
+            _, results = self.multicall.aggregate(calls + extra_calls, block_identifier=block_number)
+            extra = results[len(calls):]
+            slot0, liquidity = results[0], results[1]
+            if slot0 is None or liquidity is None:
+                raise RuntimeError(f"slot0/liquidity read failed at block {block_number}")
+
+            if self.static is None:
+                self.static = tuple(results[2:6])
+            bitmap = dict(zip(guessed, results[2:len(calls)]))
+            token0, token1, fee, tick_spacing = self.static
+
+            tick = slot0[1]
+            word_positions = self._word_range(tick, tick_spacing)
+            missing = [pos for pos in word_positions if pos not in bitmap]
+            if missing:
+                _, words = self.multicall.aggregate((pool.tickBitmap(pos) for pos in missing),
+                                                    block_identifier=block_number)
+                bitmap.update(zip(missing, words))
+            bitmap = {pos: bitmap[pos] for pos in word_positions}
+            if None in bitmap.values():
+                raise RuntimeError(f"tickBitmap read failed at block {block_number}")
+
+            initialized = []
+            for pos, word in bitmap.items():
+                while word:
+                    bit = (word & -word).bit_length() - 1
+                    initialized.append(((pos << 8) + bit) * tick_spacing)
+                    word &= word - 1
+            _, tick_data = self.multicall.aggregate((pool.ticks(t) for t in initialized),
+                                                    block_identifier=block_number)
+            liquidity_net = {t: data[1] for t, data in zip(initialized, tick_data) if data is not None}
+
+            self.snapshot = PoolSnapshot(block_number, token0, token1, fee, tick_spacing, slot0[0], tick,
+                                         liquidity, bitmap, liquidity_net)
+            return self.snapshot, extra
+
+    def quote_exact_input(self, token_in, amount_in, block_number):
+        """Local QuoterV2 amountOut at block_number. Raises TickOutOfRange for sizes beyond the snapshot."""
+        return self.refresh(block_number)[0].quote_exact_input(token_in, amount_in)
+
+
+def record_fixtures(path, pool, quoter_contract, sizes):
+    """
+    Snapshot the pool and ask QuoterV2 for every size in both directions, all
+    at one block. Sizes that run past the snapshot's words are left out: a
+    fixture only holds quotes the local math is expected to reproduce.
+    """
+    block_number = pool.web3.eth.block_number
+    snapshot, _ = pool.refresh(block_number)
+
+    quotes = []
+    for token_in, token_out in ((snapshot.token0, snapshot.token1), (snapshot.token1, snapshot.token0)):
+        for amount_in in sizes:
+            try:
+                snapshot.quote_exact_input(token_in, amount_in)
+            except TickOutOfRange:
+                continue
+            result = quoter_contract.functions.quoteExactInputSingle({
+                'tokenIn': token_in,
+                'tokenOut': token_out,
+                'amountIn': amount_in,
+                'fee': snapshot.fee,
+                'sqrtPriceLimitX96': 0
+            }).call(block_identifier=block_number)
+            quotes.append({'token_in': token_in, 'amount_in': str(amount_in), 'amount_out': str(result[0]),
+                           'ticks_crossed': result[2]})
+
+    with open(path, 'w') as f:
+        json.dump({'snapshot': snapshot.to_dict(), 'quotes': quotes}, f, indent=1)
+    print(f"💾 Recorded {len(quotes)} QuoterV2 results at block {block_number} → {path}")
+    if not any(quote['ticks_crossed'] for quote in quotes):
+        print("⚠️ No recorded quote crosses an initialized tick, record larger sizes")
+
+
+def verify_fixtures(path):
+    """
+    Replay recorded QuoterV2 results against the local math. True only if
+    at least one quote was checked and every quote matched to the wei; a
+    quote beyond the snapshot counts as a failure.
+    """
+    with open(path, 'r') as f:
+        data = json.load(f)
+    snapshot = PoolSnapshot.from_dict(data['snapshot'])
+
+    mismatches = 0
+    skipped = 0
+    started = time.perf_counter()
+    for quote in data['quotes']:
+        amount_in, expected = int(quote['amount_in']), int(quote['amount_out'])
+        try:
+            local = snapshot.quote_exact_input(quote['token_in'], amount_in)
+        except TickOutOfRange:
+            skipped += 1
+            continue
+        if local != expected:
+            mismatches += 1
+            print(f"❌ {quote['token_in'][:8]} in {amount_in}: local {local} != quoter {expected}")
+    elapsed = time.perf_counter() - started
+
+    checked = len(data['quotes']) - skipped
+    emoji = "✅" if checked and not skipped and not mismatches else "❌"
+    print(f"{emoji} {checked - mismatches}/{checked} quotes match QuoterV2 at block {snapshot.block_number} "
+          f"({skipped} beyond the snapshot) | {elapsed / max(len(data['quotes']), 1) * 1e6:.1f} µs/quote")
+    return checked > 0 and skipped == 0 and mismatches == 0
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Local V3 quotes for the USDT/WBNB 0.05% pool")
+    parser.add_argument("--record", help="Record a snapshot + QuoterV2 results into this file (needs RPC)")
+    parser.add_argument("--verify", help="Check the local math against a recorded fixture file")
+    args = parser.parse_args()
+
+    if args.verify:
+        sys.exit(0 if verify_fixtures(args.verify) else 1)
+    elif args.record:
+        from mv5 import ctx
+
+        sizes = [10 ** exp * mult for exp in range(15, 24) for mult in (1, 3)]
+        record_fixtures(args.record, ctx.v3_pool, ctx.quoter_v2_contract, sizes)
+    else:
+        parser.print_help()
@@ -0,0 +1,159 @@
+"""
+Local WebSocket stand-in for a BSC node, for testing the viewer's streaming
+mode without an RPC provider:
+
+    python ws_stub_node.py --port 8546
+    python combiviewer.py --ws ws://127.0.0.1:8546   (or python live_stream.py)
+
+Answers eth_subscribe for newHeads and logs, emits a block every
+--block-time seconds with a few random BetBull/BetBear logs, and a
+LockRound/EndRound pair every --round-seconds.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import time
+
+from websockets.asyncio.server import serve
+from websockets.exceptions import ConnectionClosed
+
+from bet_stream import BET_BULL_TOPIC, BET_BEAR_TOPIC
+from live_stream import LOCK_ROUND_TOPIC, END_ROUND_TOPIC
+
+CONTRACT_ADDRESS = "0x18B2A687610328590Bc8F2e5fEdDe3b582A49cdA"
+
+
+def _hex(value):
+    return hex(value)
+
+
+def _word(value, signed=False):
+    return "0x" + value.to_bytes(32, 'big', signed=signed).hex()
+
+
+class StubNode:
+    def __init__(self, block_time=0.75, round_seconds=30, start_block=40_000_000, start_epoch=300_000):
+        self.block_time = block_time
+        self.round_seconds = round_seconds
+        self.block_number = start_block
+        self.epoch = start_epoch
+        self.price = 600 * 10**8
+        self.subscriptions = {}  # subscription id -> (connection, kind)
+        self.ids = itertools.count(1)
+
+    async def handle(self, connection):
+        try:
+            async for raw in connection:
+                request = json.loads(raw)
+                response = {"jsonrpc": "2.0", "id": request.get("id")}
+                try:
+                    response["result"] = self.call(connection, request["method"], request.get("params") or [])
+                except KeyError:
+                    response["error"] = {"code": -32601, "message": f"method {request['method']} not supported"}
+                await connection.send(json.dumps(response))
+        except ConnectionClosed:
+            pass
+        finally:
+            for sub_id in [s for s, (c, _) in self.subscriptions.items() if c is connection]:
+                del self.subscriptions[sub_id]
+
+    def call(self, connection, method, params):
+        if method == "eth_chainId":
+            return _hex(56)
+        if method == "net_version":
+            return "56"
+        if method == "eth_blockNumber":
+            return _hex(self.block_number)
+        if method == "eth_subscribe":
+            sub_id = _hex(next(self.ids))
+            self.subscriptions[sub_id] = (connection, params[0])
+            return sub_id
+        if method == "eth_unsubscribe":
+            return self.subscriptions.pop(params[0], None) is not None
+        raise KeyError(method)
+
+    def _log(self, topics, data, log_index):
+        return {
+            "address": CONTRACT_ADDRESS,
+            "topics": topics,
+            "data": data,
+            "blockNumber": _hex(self.block_number),
+            "blockHash": "0x" + os.urandom(32).hex(),
+            "transactionHash": "0x" + os.urandom(32).hex(),
+            "transactionIndex": _hex(log_index),
+            "logIndex": _hex(log_index),
+            "removed": False
+        }
+
+    def _block_logs(self, round_over):
+        logs = []
+        epoch_topic = _word(self.epoch)
+        for _ in range(random.randint(0, 3)):
+            side = BET_BULL_TOPIC if random.random() < 0.5 else BET_BEAR_TOPIC
+            sender = "0x" + bytes(12).hex() + os.urandom(20).hex()
+            amount = int(random.expovariate(1 / 0.15) * 10**18)
+            logs.append(self._log(["0x" + side.hex(), sender, epoch_topic], _word(amount), len(logs)))
+
+        if round_over:
+            self.price += random.randint(-50, 50) * 10**6
+            round_id = _word(self.block_number)
+            logs.append(self._log(["0x" + END_ROUND_TOPIC.hex(), _word(self.epoch - 1), round_id],
+                                  _word(self.price, signed=True), len(logs)))
+            logs.append(self._log(["0x" + LOCK_ROUND_TOPIC.hex(), epoch_topic, round_id],
+                                  _word(self.price, signed=True), len(logs)))
+            self.epoch += 1
+        return logs
+
+    async def produce(self):
+        round_started = time.time()
+        while True:
+            await asyncio.sleep(self.block_time)
+            self.block_number += 1
+            round_over = time.time() - round_started >= self.round_seconds
+            if round_over:
+                round_started = time.time()
+
+            head = {
+                "number": _hex(self.block_number),
+                "hash": "0x" + os.urandom(32).hex(),
+                "parentHash": "0x" + os.urandom(32).hex(),
+                "timestamp": _hex(int(time.time())),
+                "miner": CONTRACT_ADDRESS,
+                "extraData": "0x",
+                "gasLimit": _hex(140_000_000),
+                "gasUsed": "0x0",
+                "baseFeePerGas": "0x0",
+                "difficulty": "0x2"
+            }
+            logs = self._block_logs(round_over)
+
+            for sub_id, (connection, kind) in list(self.subscriptions.items()):
+                payloads = [head] if kind == "newHeads" else logs if kind == "logs" else []
+                for result in payloads:
+                    message = {"jsonrpc": "2.0", "method": "eth_subscription",
+                               "params": {"subscription": sub_id, "result": result}}
+                    try:
+                        await connection.send(json.dumps(message))
+                    except Exception:
+                        self.subscriptions.pop(sub_id, None)
+                        break
+
+
+async def main(args):
+    node = StubNode(block_time=args.block_time, round_seconds=args.round_seconds)
+    async with serve(node.handle, args.host, args.port):
+        print(f"🧪 Stub node on ws://{args.host}:{args.port} "
+              f"(block every {args.block_time}s, round every {args.round_seconds}s)")
+        await node.produce()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local WebSocket stand-in node")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8546)
+    parser.add_argument("--block-time", type=float, default=0.75)
+    parser.add_argument("--round-seconds", type=float, default=30)
+    asyncio.run(main(parser.parse_args()))